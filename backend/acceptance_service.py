@@ -5,6 +5,7 @@ import stats_db as stats
 from admin_auth import AdminActor, record_audit
 from archive_storage import ArchiveStorage, accepted_object_key
 from import_json_to_db import import_editor_match
+from match_detail_snapshots import save_match_detail_snapshot
 from match_upload import (
     AdditionCapture,
     find_duplicate_source,
@@ -194,6 +195,7 @@ def accept_match(
         session.flush()
         source_file_id = match.source_file_id
         detail = stats.get_match_detail(match.match_id, session=session)
+        save_match_detail_snapshot(session, match.match_id, detail)
         additions = capture.stop()
         log_rows = record_addition_logs(session, additions, match.match_id)
         serialized_logs = [serialize_addition_log(log) for log in log_rows]
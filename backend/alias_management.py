@@ -1,3 +1,5 @@
+from entity_search import search_entity_ids
+from match_detail_snapshots import invalidate_match_detail_snapshots
 from models import (
     Division,
     Player,
@@ -5,6 +7,7 @@ from models import (
     PlayerFriendCode,
     PlayerSeasonEntry,
     Race,
+    RacePlayerResult,
     Season,
     Team,
     TeamAlias,
@@ -12,6 +15,8 @@ from models import (
     Track,
     TrackAlias,
 )
+from player_display_names import refresh_player_display_names
+from player_track_rollups import refresh_player_track_rollups
 from sqlalchemy import func, or_, select, update
 
 ENTITY_TYPES = {"players", "teams", "tracks"}
@@ -75,28 +80,16 @@ def list_entities(session, entity_type, query="", limit=200, league_code=None):
         statement = statement.where(func.lower(Track.league_code) == normalized_league)
     normalized_query = str(query or "").strip().casefold()
     if normalized_query:
-        pattern = f"%{normalized_query}%"
-        if entity_type == "players":
-            predicate = or_(
-                func.lower(func.coalesce(model.canonical_name, "")).like(pattern),
-                func.lower(func.coalesce(model.primary_friend_code, "")).like(pattern),
-                func.bool_or(func.lower(func.coalesce(alias_model.alias_value, "")).like(pattern)),
-            )
-        elif entity_type == "teams":
-            predicate = or_(
-                func.lower(model.canonical_name).like(pattern),
-                func.lower(model.canonical_tag).like(pattern),
-                func.bool_or(func.lower(func.coalesce(alias_model.alias_value, "")).like(pattern)),
-            )
-        else:
-            predicate = or_(
-                func.lower(model.canonical_name).like(pattern),
-                func.bool_or(func.lower(func.coalesce(alias_model.alias_value, "")).like(pattern)),
-            )
-        statement = statement.having(predicate)
-    rows = session.execute(
-        statement.order_by(func.lower(_sort_column(entity_type, model))).limit(limit)
-    )
+        ranked_ids = search_entity_ids(
+            session, entity_type, normalized_query, limit, league_code=normalized_league
+        )
+        rows = session.execute(statement.where(identity.in_(ranked_ids))).all()
+        positions = {entity_id: position for position, entity_id in enumerate(ranked_ids)}
+        rows.sort(key=lambda row: positions[getattr(row[0], identity.key)])
+    else:
+        rows = session.execute(
+            statement.order_by(func.lower(_sort_column(entity_type, model))).limit(limit)
+        )
     return [
         {
             "id": getattr(entity, identity.key),
@@ -267,6 +260,7 @@ def update_player_canonical_name(session, player_id, payload):
     previous_name = player.canonical_name
     player.canonical_name = canonical_name
     session.flush()
+    invalidate_match_detail_snapshots(session, player_ids=[player_id])
     return get_entity(session, "players", player_id), previous_name
 
 
@@ -327,6 +321,7 @@ def update_track_canonical_name(session, track_id, payload):
         update(Race).where(Race.track_id == track_id).values(track_name_raw=canonical_name)
     )
     session.flush()
+    invalidate_match_detail_snapshots(session, track_ids=[track_id])
     return get_entity(session, "tracks", track_id), {
         "previous_name": previous_name,
         "races_updated": race_result.rowcount,
@@ -395,11 +390,21 @@ def merge_track(session, source_track_id, payload):
         target_alias_values.add(normalized_value)
         aliases_moved += 1
 
+    affected_player_ids = set(
+        session.scalars(
+            select(RacePlayerResult.player_id)
+            .join(Race, Race.race_id == RacePlayerResult.race_id)
+            .where(Race.track_id == source_track_id)
+            .distinct()
+        )
+    )
     race_result = session.execute(
         update(Race)
         .where(Race.track_id == source_track_id)
         .values(track_id=target_track_id, track_name_raw=target.canonical_name)
     )
+    refresh_player_track_rollups(session, affected_player_ids)
+    invalidate_match_detail_snapshots(session, track_ids=[target_track_id])
     for alias in source_aliases:
         session.delete(alias)
     session.flush()
@@ -478,6 +483,8 @@ def add_alias(session, entity_type, entity_id, payload):
     alias = alias_model(**values)
     session.add(alias)
     session.flush()
+    if entity_type == "players" and refresh_player_display_names(session, [entity_id]):
+        invalidate_match_detail_snapshots(session, player_ids=[entity_id])
     return get_entity(session, entity_type, detail["id"]), alias
 
 
@@ -498,4 +505,6 @@ def delete_alias(session, entity_type, entity_id, alias_id):
     }
     session.delete(alias)
     session.flush()
+    if entity_type == "players" and refresh_player_display_names(session, [entity_id]):
+        invalidate_match_detail_snapshots(session, player_ids=[entity_id])
     return get_entity(session, entity_type, detail["id"]), deleted
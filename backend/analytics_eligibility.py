@@ -2,18 +2,34 @@ import json
 from functools import lru_cache
 from pathlib import Path
 
+from data_version import RESULTS_DATA_VERSION, current_data_version
+from database import session_pins
+from engine_cache import EngineCache
 from models import Match, Race, SourceFile
-from sqlalchemy import select
+from sqlalchemy import Integer, all_, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
 
 DEFAULT_EXCLUSION_PATH = (
     Path(__file__).resolve().parent / "data" / "analytics_excluded_race_blocks.json"
 )
 RACES_PER_BLOCK = 4
+SESSION_DATA_VERSION = "analytics_data_version"
+SESSION_RESULTS_VERSION = "analytics_results_version"
+MAX_CACHED_EXCLUSIONS = 4
+
+# Excluded race IDs per data version and load of the exclusion file.
+_excluded_race_cache = EngineCache(MAX_CACHED_EXCLUSIONS)
 
 
-@lru_cache(maxsize=1)
 def _load_default_exclusions():
-    return _load_exclusions(DEFAULT_EXCLUSION_PATH)
+    """Return the reviewed exclusions, parsing the file again only after it changes."""
+    stat = DEFAULT_EXCLUSION_PATH.stat()
+    return _load_exclusions_version(DEFAULT_EXCLUSION_PATH, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=1)
+def _load_exclusions_version(path, _mtime_ns, _size):
+    return _load_exclusions(path)
 
 
 def _load_exclusions(path):
@@ -46,9 +62,48 @@ def _load_exclusions(path):
     return tuple(normalized)
 
 
+def analytics_data_version(session):
+    """Return the archive data version, read once per session until the session writes.
+
+    Every write path bumps it, so it alone keys the caches built from analytics data.
+    """
+    pins = session_pins(session)
+    version = pins.get(SESSION_DATA_VERSION)
+    if version is None:
+        version = pins[SESSION_DATA_VERSION] = current_data_version(session)
+    return version
+
+
+def analytics_results_version(session):
+    """Return the race results version, pinned like analytics_data_version."""
+    pins = session_pins(session)
+    version = pins.get(SESSION_RESULTS_VERSION)
+    if version is None:
+        version = pins[SESSION_RESULTS_VERSION] = current_data_version(
+            session, RESULTS_DATA_VERSION
+        )
+    return version
+
+
 def analytics_excluded_race_ids(session, exclusions=None):
     """Return reviewed legacy races that must not feed race-derived analytics."""
-    entries = tuple(exclusions) if exclusions is not None else _load_default_exclusions()
+    if exclusions is not None:
+        return _compute_excluded_race_ids(session, tuple(exclusions))
+
+    entries = _load_default_exclusions()
+    if not entries:
+        return frozenset()
+    # The loaded entries are a new tuple whenever the exclusion file changes, and each
+    # cached value holds its tuple so the id in the key cannot be reused meanwhile.
+    _entries, race_ids = _excluded_race_cache.get_or_build(
+        session,
+        (analytics_data_version(session), id(entries)),
+        lambda: (entries, frozenset(_compute_excluded_race_ids(session, entries))),
+    )
+    return race_ids
+
+
+def _compute_excluded_race_ids(session, entries):
     if not entries:
         return set()
     entries_by_source = {}
@@ -79,4 +134,7 @@ def analytics_excluded_race_ids(session, exclusions=None):
 
 def apply_analytics_race_filter(statement, session, race_id_column=Race.race_id):
     excluded_ids = analytics_excluded_race_ids(session)
-    return statement.where(race_id_column.not_in(excluded_ids)) if excluded_ids else statement
+    if not excluded_ids:
+        return statement
+    # One array parameter keeps the statement text (and its compiled-cache key) constant.
+    return statement.where(race_id_column != all_(literal(sorted(excluded_ids), ARRAY(Integer))))
@@ -7,8 +7,8 @@ import uuid
 import dashboard_stats as dashboards
 import database_health as database_health_service
 import stats_db as stats
-from database import app_environment
-from extensions import cache
+from database import app_environment, close_request_session
+from extensions import cache, cache_config
 from flask import Flask, g, request
 from flask_compress import Compress
 from flask_cors import CORS
@@ -26,8 +26,18 @@ def create_app(config=None):
     application = Flask(__name__)
     application.config.from_mapping(
         JSON_SORT_KEYS=False,
-        CACHE_TYPE="simple",
-        CACHE_DEFAULT_TIMEOUT=3600,
+        **cache_config(),
+        RESPONSE_CACHE_ENABLED=os.environ.get(
+            "RESPONSE_CACHE_ENABLED", "false" if app_environment() == "test" else "true"
+        )
+        .strip()
+        .lower()
+        == "true",
+        RESPONSE_CACHE_SALT=os.environ.get("K_REVISION", ""),
+        DATA_VERSION_TTL_SECONDS=float(os.environ.get("DATA_VERSION_TTL_SECONDS", "2")),
+        DATA_VERSION_SHARED_TTL_SECONDS=int(
+            os.environ.get("DATA_VERSION_SHARED_TTL_SECONDS", "60")
+        ),
     )
     if config:
         application.config.update(config)
@@ -41,6 +51,7 @@ def create_app(config=None):
     application.register_blueprint(access_api)
     application.register_blueprint(reviews_api)
     application.register_blueprint(operations_api)
+    application.teardown_appcontext(close_request_session)
 
     @application.before_request
     def start_request():
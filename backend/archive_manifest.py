@@ -0,0 +1,100 @@
+"""Persisted archive file hashes so reconciliation only re-reads files that changed."""
+
+import hashlib
+
+from models import ArchiveManifestEntry, utc_now
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+JSON_ARCHIVE_LOCATION = "json"
+MANIFEST_WRITE_BATCH_SIZE = 1000
+
+
+def storage_location(provider: str) -> str:
+    return f"storage:{provider}"
+
+
+class ArchiveManifest:
+    """Hash lookups keyed by (location, path) and trusted while size and stamp are unchanged.
+
+    The stamp is a file's mtime in nanoseconds or a storage object's generation. With
+    full_verify every file is re-read and its manifest row rewritten.
+    """
+
+    def __init__(self, session, full_verify: bool = False):
+        self.session = session
+        self.full_verify = full_verify
+        self.entries = {
+            (row.location, row.path): (row.size, row.stamp, row.sha256)
+            for row in session.execute(
+                select(
+                    ArchiveManifestEntry.location,
+                    ArchiveManifestEntry.path,
+                    ArchiveManifestEntry.size,
+                    ArchiveManifestEntry.stamp,
+                    ArchiveManifestEntry.sha256,
+                )
+            )
+        }
+        self.seen = set()
+        self.changed = {}
+        self.hashed = 0
+
+    def sha256(self, location: str, path: str, size: int, stamp: str, read) -> str:
+        """Return the file's hash, calling read() for its bytes only when the manifest is stale.
+
+        Callers take size and stamp before reading, so a file rewritten mid-read keeps an
+        outdated stamp and is hashed again on the next run.
+        """
+        key = (location, path)
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if not self.full_verify and entry is not None and entry[:2] == (size, stamp):
+            return entry[2]
+        digest = hashlib.sha256(read()).hexdigest()
+        self.hashed += 1
+        self.entries[key] = (size, stamp, digest)
+        self.changed[key] = (size, stamp, digest)
+        return digest
+
+    def save(self, prune_locations=()) -> None:
+        """Upsert rehashed rows and drop unseen rows in locations that were fully scanned."""
+        verified_at = utc_now()
+        changed = list(self.changed.items())
+        for start in range(0, len(changed), MANIFEST_WRITE_BATCH_SIZE):
+            statement = insert(ArchiveManifestEntry).values(
+                [
+                    {
+                        "location": location,
+                        "path": path,
+                        "size": size,
+                        "stamp": stamp,
+                        "sha256": digest,
+                        "verified_at": verified_at,
+                    }
+                    for (location, path), (size, stamp, digest) in changed[
+                        start : start + MANIFEST_WRITE_BATCH_SIZE
+                    ]
+                ]
+            )
+            self.session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[ArchiveManifestEntry.location, ArchiveManifestEntry.path],
+                    set_={
+                        "size": statement.excluded.size,
+                        "stamp": statement.excluded.stamp,
+                        "sha256": statement.excluded.sha256,
+                        "verified_at": statement.excluded.verified_at,
+                    },
+                )
+            )
+        self.changed = {}
+        stale = [key for key in self.entries if key[0] in prune_locations and key not in self.seen]
+        if stale:
+            self.session.execute(
+                delete(ArchiveManifestEntry).where(
+                    tuple_(ArchiveManifestEntry.location, ArchiveManifestEntry.path).in_(stale)
+                )
+            )
+            for key in stale:
+                del self.entries[key]
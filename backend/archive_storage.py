@@ -20,6 +20,13 @@ class StoredObject:
     sha256: str
 
 
+@dataclass(frozen=True)
+class ObjectStat:
+    key: str
+    generation: str
+    size: int
+
+
 def _safe_key(key: str) -> str:
     path = PurePosixPath(key)
     if not key or path.is_absolute() or ".." in path.parts:
@@ -50,6 +57,12 @@ class ArchiveStorage(ABC):
     def read(self, key: str) -> bytes:
         raise NotImplementedError
 
+    @abstractmethod
+    def list_objects(self, prefix: str) -> dict[str, ObjectStat]:
+        """Return the size and change stamp of every object under the prefix directory,
+        keyed by object key, without downloading them."""
+        raise NotImplementedError
+
     @abstractmethod
     def delete(self, key: str) -> None:
         raise NotImplementedError
@@ -110,6 +123,15 @@ class LocalArchiveStorage(ArchiveStorage):
     def read(self, key: str) -> bytes:
         return self._path(key).read_bytes()
 
+    def list_objects(self, prefix: str) -> dict[str, ObjectStat]:
+        objects = {}
+        for path in self._path(prefix).rglob("*"):
+            if path.is_file():
+                key = path.relative_to(self.root).as_posix()
+                result = path.stat()
+                objects[key] = ObjectStat(key, str(result.st_mtime_ns), result.st_size)
+        return objects
+
     def delete(self, key: str) -> None:
         self._path(key).unlink(missing_ok=True)
 
@@ -177,6 +199,13 @@ class GcsArchiveStorage(ArchiveStorage):
     def read(self, key: str) -> bytes:
         return self.bucket.blob(_safe_key(key)).download_as_bytes()
 
+    def list_objects(self, prefix: str) -> dict[str, ObjectStat]:
+        # One paged listing instead of a metadata request per object.
+        return {
+            blob.name: ObjectStat(blob.name, str(blob.generation or ""), blob.size or 0)
+            for blob in self.bucket.list_blobs(prefix=f"{_safe_key(prefix)}/")
+        }
+
     def delete(self, key: str) -> None:
         from google.api_core.exceptions import NotFound
 
@@ -0,0 +1,489 @@
+"""Bulk archive import with in-memory identity resolution and batched row writes.
+
+import_json_to_db looks up every player, team and track occurrence with its own query
+and flushes match rows one at a time. A full archive rebuild instead preloads those
+catalogs once, resolves each match against them, and writes races, results and
+penalties as multi-row inserts. Both importers build their rows with the same
+import_json_to_db helpers, so the rows are the same.
+"""
+
+from pathlib import Path
+from typing import Any
+
+from database import get_session_factory
+from import_json_to_db import (
+    ParsedArchiveFile,
+    PlayerIdentities,
+    WrittenResults,
+    add_match,
+    add_player_aliases,
+    build_match_rows,
+    display_player_name,
+    get_or_create_division,
+    get_or_create_player_entry,
+    get_or_create_season,
+    get_or_create_team,
+    get_or_create_team_entry,
+    get_or_create_track,
+    load_archive_team_aliases,
+    load_player_identities,
+    match_table_ref_rows,
+    parse_archive_files,
+    preferred_json_files,
+    print_summary,
+    refresh_written_results,
+    resolve_match_label,
+    resolve_match_teams,
+    with_owner_ids,
+)
+from models import (
+    Division,
+    Match,
+    MatchPlayer,
+    MatchTableRef,
+    MatchTeam,
+    Penalty,
+    Player,
+    PlayerAlias,
+    PlayerFriendCode,
+    PlayerSeasonEntry,
+    Race,
+    RacePlayerResult,
+    RaceTeamResult,
+    Season,
+    SourceFile,
+    Team,
+    TeamLeagueIdentity,
+    TeamSeasonEntry,
+    Track,
+    TrackAlias,
+)
+from sqlalchemy import insert, select
+
+
+class ImportCatalog:
+    """Existing catalog rows keyed the way the importer looks them up.
+
+    Players are resolved and created here; aliases and season entries are maps handed to
+    the shared helpers in place of their lookup queries. Rare misses (seasons, teams,
+    tracks) fall through to the row-by-row helpers so creation rules stay in one place.
+    """
+
+    def __init__(self, session, identities: PlayerIdentities):
+        self.session = session
+        self.identities = identities
+        self.seasons = {
+            (season.league_code, season.season_code): season
+            for season in session.scalars(select(Season))
+        }
+        self.divisions = {
+            (division.season_id, division.division_code): division
+            for division in session.scalars(select(Division))
+        }
+
+        self.teams = {team.team_id: team for team in session.scalars(select(Team))}
+        self.team_identities = {}
+        self.team_identity_keys = set()
+        for identity in session.scalars(
+            select(TeamLeagueIdentity).order_by(TeamLeagueIdentity.team_league_identity_id)
+        ):
+            self._remember_team_identity(
+                self.teams[identity.team_id], identity.league_code, identity.tag
+            )
+        self.team_entries = {}
+        self.team_entries_by_tag = {}
+        for entry in session.scalars(
+            select(TeamSeasonEntry).order_by(TeamSeasonEntry.team_season_entry_id)
+        ):
+            self._remember_team_entry(entry)
+
+        self.tracks = {}
+        self.track_aliases = set()
+        tracks = {track.track_id: track for track in session.scalars(select(Track))}
+        for track in tracks.values():
+            self._remember_track(track, track.canonical_name, is_alias=False)
+        for alias in session.scalars(select(TrackAlias)):
+            self._remember_track(tracks[alias.track_id], alias.alias_value)
+
+        players = {player.player_id: player for player in session.scalars(select(Player))}
+        self.friend_codes = {
+            row.friend_code: row for row in session.scalars(select(PlayerFriendCode))
+        }
+        self.players_by_code = {
+            friend_code: players[row.player_id] for friend_code, row in self.friend_codes.items()
+        }
+        self.pending_friend_codes = []
+        self.player_aliases = {
+            (alias.player_id, alias.alias_type, alias.alias_value): alias
+            for alias in session.scalars(select(PlayerAlias))
+        }
+        self.player_entries = {
+            (entry.player_id, entry.team_season_entry_id): entry
+            for entry in session.scalars(select(PlayerSeasonEntry))
+        }
+
+        self.source_paths = set(session.scalars(select(SourceFile.source_path)))
+        self.source_hashes = set(session.scalars(select(SourceFile.file_sha256)))
+        self.written = WrittenResults()
+
+    def _remember_team_identity(self, team, league_code, tag):
+        key = (league_code.casefold(), tag.casefold())
+        self.team_identities.setdefault(key, team)
+        self.team_identity_keys.add((team.team_id, *key))
+
+    def _remember_team_entry(self, entry):
+        self.team_entries.setdefault((entry.team_id, entry.season_id, entry.division_id), entry)
+        self.team_entries_by_tag.setdefault(
+            (entry.season_id, entry.division_id, entry.clan_tag), entry
+        )
+
+    def _remember_track(self, track, name, is_alias=True):
+        # Lookups prefer the lowest track_id, matching find_track_by_name's ordering.
+        normalized_name = name.casefold()
+        key = (track.league_code.casefold(), normalized_name)
+        current = self.tracks.get(key)
+        if current is None or track.track_id < current.track_id:
+            self.tracks[key] = track
+        if is_alias:
+            self.track_aliases.add((track.track_id, normalized_name))
+
+    def season(self, league_code: str, season_code: str) -> Season:
+        season = self.seasons.get((league_code, season_code))
+        if season is None:
+            season = get_or_create_season(self.session, league_code, season_code)
+            self.seasons[(league_code, season_code)] = season
+        return season
+
+    def division(self, season: Season, division_code: str) -> Division:
+        key = (season.season_id, division_code)
+        division = self.divisions.get(key)
+        if division is None:
+            division = get_or_create_division(self.session, season, division_code)
+            self.divisions[key] = division
+        return division
+
+    def team(
+        self,
+        league_code: str,
+        canonical_tag: str,
+        display_name: str | None,
+        linked_team_id: int | None,
+    ) -> Team:
+        team = self.teams.get(linked_team_id) if linked_team_id is not None else None
+        if team is None:
+            team = self.team_identities.get((league_code.casefold(), canonical_tag.casefold()))
+        if (
+            team is None
+            or (team.team_id, league_code.casefold(), canonical_tag.casefold())
+            not in self.team_identity_keys
+        ):
+            team = get_or_create_team(
+                self.session,
+                league_code,
+                canonical_tag,
+                display_name,
+                linked_team_id=linked_team_id,
+            )
+            self.teams[team.team_id] = team
+            self._remember_team_identity(team, league_code, canonical_tag)
+            return team
+        if display_name and team.canonical_name == team.canonical_tag:
+            team.canonical_name = display_name
+        return team
+
+    def team_entry(
+        self,
+        team: Team,
+        season: Season,
+        division: Division,
+        canonical_tag: str,
+        display_name: str,
+        hex_color: str | None,
+    ) -> TeamSeasonEntry:
+        entry = self.team_entries.get(
+            (team.team_id, season.season_id, division.division_id)
+        ) or self.team_entries_by_tag.get((season.season_id, division.division_id, canonical_tag))
+        if entry is None:
+            entry = get_or_create_team_entry(
+                self.session, team, season, division, canonical_tag, display_name, hex_color
+            )
+            self._remember_team_entry(entry)
+        elif hex_color and not entry.hex_color:
+            entry.hex_color = hex_color
+        return entry
+
+    def track(self, league_code: str, track_name: str) -> Track:
+        track = self.tracks.get((league_code.casefold(), track_name.strip().casefold()))
+        if track is None or (track.track_id, track_name.casefold()) not in self.track_aliases:
+            track = get_or_create_track(self.session, league_code, track_name)
+            self.session.flush()
+            self._remember_track(track, track.canonical_name, is_alias=False)
+            self._remember_track(track, track_name)
+        return track
+
+    def player(self, friend_code: str, player_data: dict[str, Any]) -> Player:
+        """Resolve a friend code like get_or_create_player; new players stay pending."""
+        identities = self.identities
+        canonical_friend_code = identities.friend_code_to_canonical.get(friend_code, friend_code)
+        player = self.players_by_code.get(friend_code)
+        if player is not None:
+            if not player.primary_friend_code:
+                player.primary_friend_code = canonical_friend_code
+            return player
+
+        identity_friend_codes = identities.canonical_to_friend_codes.get(
+            canonical_friend_code,
+            {canonical_friend_code, friend_code},
+        )
+        player = next(
+            (
+                self.players_by_code[code]
+                for code in sorted(identity_friend_codes)
+                if code in self.players_by_code
+            ),
+            None,
+        )
+        if player is not None:
+            if canonical_friend_code != player.primary_friend_code:
+                player.primary_friend_code = canonical_friend_code
+            canonical_name = identities.canonical_names.get(canonical_friend_code)
+            if canonical_name:
+                player.canonical_name = canonical_name
+        else:
+            player = Player(
+                canonical_name=identities.canonical_names.get(canonical_friend_code)
+                or display_player_name(player_data),
+                primary_friend_code=canonical_friend_code,
+            )
+            self.session.add(player)
+        self.players_by_code[friend_code] = player
+        self.pending_friend_codes.append(friend_code)
+        return player
+
+    def add_pending_friend_codes(self):
+        """Attach friend codes resolved since the last call; players must be flushed."""
+        for friend_code in self.pending_friend_codes:
+            row = PlayerFriendCode(
+                player_id=self.players_by_code[friend_code].player_id, friend_code=friend_code
+            )
+            self.session.add(row)
+            self.friend_codes[friend_code] = row
+        self.pending_friend_codes.clear()
+
+    def mark_friend_code_seen(self, friend_code: str, match_id: int):
+        row = self.friend_codes[friend_code]
+        if not row.first_seen_match_id:
+            row.first_seen_match_id = match_id
+        row.last_seen_match_id = match_id
+
+
+def _insert_rows(session, model, rows):
+    if rows:
+        session.execute(insert(model), rows)
+
+
+def _insert_returning_ids(session, model, id_column, rows):
+    if not rows:
+        return []
+    return session.scalars(
+        insert(model).returning(id_column, sort_by_parameter_order=True), rows
+    ).all()
+
+
+def bulk_import_match(
+    session,
+    catalog: ImportCatalog,
+    source_file: SourceFile,
+    season: Season,
+    division: Division,
+    match_data: dict[str, Any],
+    path: Path,
+    match_index: int,
+    aliases: dict[tuple[str, str, str, str, str], dict[str, str]],
+    league_code: str,
+    season_code: str,
+    division_code: str,
+) -> Match:
+    teams = match_data.get("teams") or {}
+    tracks = match_data.get("tracks") or []
+    match_label = resolve_match_label(match_data, path, match_index)
+
+    def resolve_team(canonical_tag, display_name, team_id, hex_color):
+        team = catalog.team(league_code, canonical_tag, display_name, team_id)
+        team_entry = catalog.team_entry(
+            team, season, division, canonical_tag, display_name, hex_color
+        )
+        return team, team_entry
+
+    resolved_teams, team_review_notes = resolve_match_teams(
+        teams, aliases, league_code, season_code, division_code, match_label, resolve_team
+    )
+    track_ids = [catalog.track(league_code, track_name).track_id for track_name in tracks]
+    match = add_match(
+        session,
+        source_file,
+        season,
+        division,
+        match_data,
+        path,
+        match_index,
+        match_label,
+        resolved_teams,
+        team_review_notes,
+    )
+    players = {
+        friend_code: catalog.player(friend_code, player_data)
+        for team_data in teams.values()
+        for friend_code, player_data in (team_data.get("players") or {}).items()
+    }
+    # One flush writes the match and every new player of the match together.
+    session.flush()
+    catalog.add_pending_friend_codes()
+
+    _insert_rows(session, MatchTableRef, match_table_ref_rows(match.match_id, match_data))
+    race_ids = _insert_returning_ids(
+        session,
+        Race,
+        Race.race_id,
+        [
+            {
+                "match_id": match.match_id,
+                "race_number": race_number,
+                "track_id": track_id,
+                "track_name_raw": track_name,
+            }
+            for race_number, (track_id, track_name) in enumerate(
+                zip(track_ids, tracks, strict=True), start=1
+            )
+        ],
+    )
+
+    def resolve_player(friend_code, player_data, team_entry):
+        player = players[friend_code]
+        add_player_aliases(
+            session, player, player_data, match.match_id, known_aliases=catalog.player_aliases
+        )
+        player_entry = get_or_create_player_entry(
+            session,
+            player,
+            team_entry,
+            season,
+            division,
+            player_data,
+            match.match_id,
+            known_entries=catalog.player_entries,
+        )
+        catalog.mark_friend_code_seen(friend_code, match.match_id)
+        return player, player_entry
+
+    rows = build_match_rows(
+        match.match_id, teams, resolved_teams, dict(enumerate(race_ids, start=1)), resolve_player
+    )
+    # Aliases, season entries and friend-code sightings are written in one flush.
+    session.flush()
+    match_team_ids = _insert_returning_ids(
+        session, MatchTeam, MatchTeam.match_team_id, rows.match_teams
+    )
+    match_player_ids = _insert_returning_ids(
+        session,
+        MatchPlayer,
+        MatchPlayer.match_player_id,
+        [
+            {
+                **row,
+                "match_team_id": match_team_ids[team_position],
+                "player_season_entry_id": player_entry.player_season_entry_id,
+            }
+            for team_position, player_entry, row in rows.match_players
+        ],
+    )
+    for model, owned_rows in (
+        (Penalty, rows.penalties),
+        (RaceTeamResult, rows.race_team_results),
+        (RacePlayerResult, rows.race_player_results),
+    ):
+        _insert_rows(session, model, with_owner_ids(owned_rows, match_team_ids, match_player_ids))
+
+    catalog.written.race_ids.update(race_ids)
+    catalog.written.player_ids.update(player.player_id for player in players.values())
+    return match
+
+
+def bulk_import_file(
+    session,
+    catalog: ImportCatalog,
+    aliases: dict[tuple[str, str, str, str, str], dict[str, str]],
+    json_root: Path,
+    parsed: ParsedArchiveFile,
+) -> tuple[int, int]:
+    path = parsed.path
+    relative_parts = path.relative_to(json_root).parts
+    if len(relative_parts) < 4:
+        return 0, 0
+
+    league_code, season_code, division_code = relative_parts[:3]
+    season = catalog.season(league_code, season_code)
+    division = catalog.division(season, division_code)
+    file_hash = parsed.file_sha256
+    source_path = (Path("JSON") / Path(*relative_parts)).as_posix()
+    if source_path in catalog.source_paths or file_hash in catalog.source_hashes:
+        return 0, 1
+
+    if parsed.error:
+        raise ValueError(f"{source_path}: {parsed.error}")
+    json_shape, matches = parsed.json_shape, parsed.matches
+    if not matches:
+        return 0, 0
+
+    source_file = SourceFile(
+        season_id=season.season_id,
+        division_id=division.division_id,
+        source_path=source_path,
+        source_filename=path.name,
+        file_sha256=file_hash,
+        json_shape=json_shape,
+        storage_provider="local",
+        storage_object_key=source_path,
+        archive_status="complete",
+    )
+    session.add(source_file)
+    session.flush()
+    catalog.source_paths.add(source_path)
+    catalog.source_hashes.add(file_hash)
+
+    for match_index, match_data in enumerate(matches):
+        bulk_import_match(
+            session,
+            catalog,
+            source_file,
+            season,
+            division,
+            match_data,
+            path,
+            match_index,
+            aliases,
+            league_code,
+            season_code,
+            division_code,
+        )
+    return len(matches), 0
+
+
+def bulk_import_json_tree(database_target: str | None, json_root: Path, workers: int = 1) -> int:
+    SessionLocal = get_session_factory(database_target)
+    imported_matches = 0
+    skipped_files = 0
+    identities = load_player_identities()
+    parsed_files = parse_archive_files(preferred_json_files(json_root), workers)
+    with SessionLocal() as session:
+        aliases = load_archive_team_aliases(session)
+        catalog = ImportCatalog(session, identities)
+        for parsed in parsed_files:
+            imported, skipped = bulk_import_file(session, catalog, aliases, json_root, parsed)
+            imported_matches += imported
+            skipped_files += skipped
+        # Derived tables are refreshed once for the whole run instead of once per match.
+        refresh_written_results(session, catalog.written)
+        session.commit()
+        print_summary(session, imported_matches, skipped_files)
+    return imported_matches
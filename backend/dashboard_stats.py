@@ -4,6 +4,8 @@ from player_dashboard_stats import (
     DashboardError,
     DashboardNotFound,
     DashboardScope,
+    get_player_dashboard,
+    get_player_leaderboard,
     get_player_overview,
     get_player_performance,
     get_player_tracks,
@@ -23,6 +25,8 @@ __all__ = [
     "DashboardScope",
     "_bulk_bagger_counterpart_summaries",
     "bagger_counterpart_summary",
+    "get_player_dashboard",
+    "get_player_leaderboard",
     "get_player_overview",
     "get_player_performance",
     "get_player_tracks",
@@ -0,0 +1,100 @@
+"""Public data version used to key and invalidate cached analytics responses."""
+
+import threading
+import time
+
+from extensions import cache
+from flask import current_app, has_app_context
+from models import DataVersion
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+ARCHIVE_DATA_VERSION = "archive"
+# Advanced only by writes to race results, so alias or logo edits keep race caches warm.
+RESULTS_DATA_VERSION = "race_results"
+SHARED_VERSION_KEY = "public-data-version"
+
+_cached_version = {"value": None, "expires_at": 0.0}
+_cached_version_lock = threading.Lock()
+
+
+def current_data_version(session, name=ARCHIVE_DATA_VERSION):
+    """Read the committed-or-pending version visible to this session (0 before any bump)."""
+    return session.scalar(select(DataVersion.version).where(DataVersion.name == name)) or 0
+
+
+def forget_cached_data_version():
+    with _cached_version_lock:
+        _cached_version["value"] = None
+        _cached_version["expires_at"] = 0.0
+
+
+def publish_data_version(version):
+    """Drop this process's copy and publish version as the shared one.
+
+    Publishing, not deleting, keeps a reader that fetched the old version before the
+    commit from writing it back after: readers only fill a missing key.
+    """
+    forget_cached_data_version()
+    if not has_app_context() or not current_app.config.get("CACHE_SHARED"):
+        return
+    shared = cache.get(SHARED_VERSION_KEY)
+    # A transaction that committed a later bump first keeps its version.
+    if shared is None or shared < version:
+        cache.set(
+            SHARED_VERSION_KEY,
+            version,
+            timeout=current_app.config.get("DATA_VERSION_SHARED_TTL_SECONDS"),
+        )
+
+
+def _advance_version(session, name):
+    return session.execute(
+        insert(DataVersion)
+        .values(name=name, version=1)
+        .on_conflict_do_update(
+            index_elements=[DataVersion.name],
+            set_={"version": DataVersion.version + 1, "updated_at": func.now()},
+        )
+        .returning(DataVersion.version)
+    ).scalar_one()
+
+
+def bump_data_version(session, results=False):
+    """Advance the version inside the caller's transaction; caches expire once it commits.
+
+    Pass results=True when race results, their roles, or their tracks changed; that also
+    advances the results version the race-level caches key on.
+    """
+    if results:
+        _advance_version(session, RESULTS_DATA_VERSION)
+    version = _advance_version(session, ARCHIVE_DATA_VERSION)
+    event.listen(session, "after_commit", lambda _session: publish_data_version(version), once=True)
+    return version
+
+
+def cached_data_version(session_factory, ttl_seconds, shared_ttl_seconds=None):
+    """Return the data version, re-reading it at most once per ttl_seconds in this process.
+
+    With a shared cache backend the version is also published there, so a fleet of
+    workers reads the database about once per shared_ttl_seconds instead of once per
+    process per ttl_seconds.
+    """
+    now = time.monotonic()
+    with _cached_version_lock:
+        if _cached_version["value"] is not None and now < _cached_version["expires_at"]:
+            return _cached_version["value"]
+    version = cache.get(SHARED_VERSION_KEY) if shared_ttl_seconds else None
+    if version is None:
+        with session_factory() as session:
+            version = current_data_version(session)
+        # add() only fills a missing key, so a version published by a commit that
+        # landed after the read above is never overwritten with this older one.
+        if shared_ttl_seconds and not cache.add(
+            SHARED_VERSION_KEY, version, timeout=shared_ttl_seconds
+        ):
+            version = max(version, cache.get(SHARED_VERSION_KEY) or version)
+    with _cached_version_lock:
+        _cached_version["value"] = version
+        _cached_version["expires_at"] = now + ttl_seconds
+    return version
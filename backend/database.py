@@ -1,15 +1,31 @@
 import os
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
-from sqlalchemy import create_engine
+from flask import g, has_app_context
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine import make_url
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 BASE_DIR = Path(__file__).resolve().parent
 
 Base = declarative_base()
 VALID_APP_ENVIRONMENTS = {"local", "test", "staging", "production"}
 
+REQUEST_SESSIONS = "db_sessions"
+REQUEST_SESSION_KEY = "request_scoped"
+SESSION_PINS = "pinned"
+SESSION_WROTE = "wrote"
+
+# One engine and session factory per database URL for the whole process.
+_shared_engines = {}
+_session_factories = {}
+_shared_engine_lock = threading.Lock()
+
 
 def app_environment() -> str:
     environment = os.environ.get("APP_ENV", "local").strip().lower()
@@ -37,20 +53,195 @@ def database_url(database_target: str | None = None) -> str:
     return configured_url
 
 
+class MeasuredQueuePool(QueuePool):
+    """Queue pool that records how long callers wait to check a connection out."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+        self._checkout_stats_lock = threading.Lock()
+
+    def _do_get(self):
+        started = time.monotonic()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.monotonic() - started
+            with self._checkout_stats_lock:
+                stats = self.checkout_stats
+                stats["timeouts" if timed_out else "checkouts"] += 1
+                stats["wait_seconds_total"] += waited
+                stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+
+    def recreate(self):
+        # dispose() and pre-ping recovery swap in a fresh pool; keep the running totals.
+        pool = super().recreate()
+        pool.checkout_stats = self.checkout_stats
+        pool._checkout_stats_lock = self._checkout_stats_lock
+        return pool
+
+
+def session_pins(session):
+    """Return the values this session reads once and reuses until the data may change."""
+    return session.info.setdefault(SESSION_PINS, {})
+
+
+@event.listens_for(Session, "after_flush")
+def forget_session_pins(session, _flush_context=None):
+    # A session that wrote reads its pinned values again, against its own new data.
+    session.info.pop(SESSION_PINS, None)
+    session.info[SESSION_WROTE] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_session_writes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(SESSION_WROTE, None)
+
+
+def has_uncommitted_writes(session):
+    """Return whether the session flushed writes that its transaction has not yet ended."""
+    return bool(session.info.get(SESSION_WROTE))
+
+
+class RequestSession(Session):
+    """Session that, when it is the request's shared session, outlives each `with` block."""
+
+    def __exit__(self, type_, value, traceback):
+        if not self.info.get(REQUEST_SESSION_KEY):
+            return super().__exit__(type_, value, traceback)
+        # End the read transaction so the connection goes back to the pool between blocks
+        # instead of idling in transaction until teardown. Committing keeps the loaded
+        # objects usable; unflushed changes are discarded, as closing a session would.
+        if self.in_transaction():
+            if type_ is None and not (self.new or self.dirty or self.deleted):
+                self.commit()
+            else:
+                self.rollback()
+        return None
+
+    def begin(self, nested=False):
+        # An explicit transaction owner starts from a clean slate, not from the read
+        # transaction a previous caller in the same request left open.
+        if self.info.get(REQUEST_SESSION_KEY) and not nested and self.in_transaction():
+            self.rollback()
+        return super().begin(nested=nested)
+
+
+class RequestScopedSessionFactory(sessionmaker):
+    """Session factory whose calls inside a Flask app context share one session.
+
+    The session is closed by close_request_session when the app context tears down.
+    begin() and calls with keyword overrides always open a separate session, so write
+    transactions keep their own connection and commit independently of the reads.
+    """
+
+    def __call__(self, **local_kw):
+        if local_kw or not has_app_context():
+            return super().__call__(**local_kw)
+        sessions = g.setdefault(REQUEST_SESSIONS, {})
+        session = sessions.get(id(self))
+        if session is None:
+            session = super().__call__(info={REQUEST_SESSION_KEY: True})
+            sessions[id(self)] = session
+        return session
+
+    @contextmanager
+    def begin(self):
+        with super().__call__() as session, session.begin():
+            yield session
+        # Later reads in the request must not serve rows this write just replaced.
+        shared = g.get(REQUEST_SESSIONS, {}).get(id(self)) if has_app_context() else None
+        if shared is not None:
+            shared.expire_all()
+            forget_session_pins(shared)
+
+
 def get_engine(database_target: str | None = None):
+    """Create a new engine; long-lived code shares one through shared_engine instead."""
     url = database_url(database_target)
     return create_engine(
         url,
         future=True,
+        poolclass=MeasuredQueuePool,
         pool_pre_ping=True,
-        pool_size=int(os.environ.get("DB_POOL_SIZE", "3")),
+        # Each gunicorn thread holds one connection for its request, so by default the
+        # pool keeps one per thread and overflow only covers separate write sessions.
+        pool_size=int(os.environ.get("DB_POOL_SIZE") or os.environ.get("GUNICORN_THREADS", "8")),
         max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", "2")),
         pool_recycle=int(os.environ.get("DB_POOL_RECYCLE_SECONDS", "1800")),
         connect_args={"application_name": os.environ.get("DB_APPLICATION_NAME", "ctc-stats-api")},
     )
 
 
+def shared_engine(database_target: str | None = None):
+    """Return the process-wide engine for the target, creating it on first use."""
+    url = database_url(database_target)
+    with _shared_engine_lock:
+        engine = _shared_engines.get(url)
+        if engine is None:
+            engine = _shared_engines[url] = get_engine(url)
+        return engine
+
+
 def get_session_factory(database_target: str | None = None):
-    return sessionmaker(
-        bind=get_engine(database_target), autoflush=False, expire_on_commit=False, future=True
-    )
+    """Return the process-wide session factory for the target, bound to its shared engine."""
+    url = database_url(database_target)
+    with _shared_engine_lock:
+        factory = _session_factories.get(url)
+    if factory is None:
+        engine = shared_engine(url)
+        with _shared_engine_lock:
+            factory = _session_factories.setdefault(
+                url,
+                RequestScopedSessionFactory(
+                    bind=engine,
+                    class_=RequestSession,
+                    autoflush=False,
+                    expire_on_commit=False,
+                    future=True,
+                ),
+            )
+    return factory
+
+
+def close_request_session(_error=None):
+    """Close the sessions shared by the ending app context and return their connections."""
+    for session in g.pop(REQUEST_SESSIONS, {}).values():
+        session.close()
+
+
+def pool_metrics():
+    """Return connection pool usage and checkout waits for every shared engine."""
+    with _shared_engine_lock:
+        engines = list(_shared_engines.values())
+    metrics = []
+    for engine in engines:
+        pool = engine.pool
+        stats = dict(getattr(pool, "checkout_stats", {}))
+        checkouts = stats.get("checkouts", 0) + stats.get("timeouts", 0)
+        metrics.append(
+            {
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": stats.get("checkouts", 0),
+                "checkout_timeouts": stats.get("timeouts", 0),
+                "checkout_wait_ms_avg": (
+                    round(stats["wait_seconds_total"] * 1000 / checkouts, 3) if checkouts else 0.0
+                ),
+                "checkout_wait_ms_max": round(stats.get("wait_seconds_max", 0.0) * 1000, 3),
+            }
+        )
+    return metrics
@@ -0,0 +1,64 @@
+"""In-process caches of values built from the database, kept per engine.
+
+Keys usually include analytics_data_version, so a write makes the old entries
+unreachable and they age out of the LRU.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+
+from database import has_uncommitted_writes
+
+
+class EngineCache:
+    """An LRU of built values for each engine, most recently used last.
+
+    A missing value is built by one caller at a time: concurrent requests for the same
+    key wait for that build instead of each running their own.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = weakref.WeakKeyDictionary()
+        self._builds = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _cached(self, engine, key):
+        cached = self._entries.setdefault(engine, OrderedDict())
+        if key in cached:
+            cached.move_to_end(key)
+            return True, cached[key]
+        return False, None
+
+    def get_or_build(self, session, key, build):
+        """Return the value cached for key on the session's engine, building it if missing.
+
+        A session with uncommitted writes sees rows no other session can, so it builds its
+        own value and neither reads nor fills the cache.
+        """
+        if has_uncommitted_writes(session):
+            return build()
+        engine = session.get_bind()
+        with self._lock:
+            found, value = self._cached(engine, key)
+            if found:
+                return value
+            build_lock = self._builds.setdefault(engine, {}).setdefault(key, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                found, value = self._cached(engine, key)
+            if found:
+                return value
+            try:
+                value = build()
+                with self._lock:
+                    cached = self._entries.setdefault(engine, OrderedDict())
+                    cached[key] = value
+                    while len(cached) > self.max_entries:
+                        cached.popitem(last=False)
+            finally:
+                with self._lock:
+                    self._builds.get(engine, {}).pop(key, None)
+        return value
@@ -0,0 +1,211 @@
+"""Ranked, typo-tolerant name search for players, teams, and tracks.
+
+Names and aliases are matched by substring or by trigram similarity and ranked exact,
+prefix, substring, then by similarity. With pg_trgm installed the database does the
+matching through the GIN indexes from migration 20261017_0016; otherwise an in-process
+trigram index built once per data version answers instead.
+"""
+
+import re
+import threading
+import time
+import weakref
+from collections import defaultdict
+from dataclasses import dataclass
+
+from analytics_eligibility import analytics_data_version
+from engine_cache import EngineCache
+from models import Player, PlayerAlias, Team, TeamAlias, Track, TrackAlias
+from sqlalchemy import case, func, select, text, union_all
+
+# (entity id column, searchable text column) per entity type.
+SEARCH_SOURCES = {
+    "players": (
+        (Player.player_id, Player.canonical_name),
+        (Player.player_id, Player.primary_friend_code),
+        (PlayerAlias.player_id, PlayerAlias.alias_value),
+    ),
+    "teams": (
+        (Team.team_id, Team.canonical_name),
+        (Team.team_id, Team.canonical_tag),
+        (TeamAlias.team_id, TeamAlias.alias_value),
+    ),
+    "tracks": (
+        (Track.track_id, Track.canonical_name),
+        (TrackAlias.track_id, TrackAlias.alias_value),
+    ),
+}
+# pg_trgm's default similarity threshold, so both paths accept the same typos.
+SIMILARITY_THRESHOLD = 0.3
+# Longer queries are cut so their trigram sets, and so the search cost, stay bounded.
+MAX_QUERY_LENGTH = 64
+MAX_CACHED_INDEXES = 16
+TRIGRAM_CHECK_SECONDS = 300
+
+_WORD = re.compile(r"[^\W_]+")
+
+# Whether pg_trgm is installed and when that was checked, per engine.
+_trigram_support = weakref.WeakKeyDictionary()
+_trigram_support_lock = threading.Lock()
+_index_cache = EngineCache(MAX_CACHED_INDEXES)
+
+
+def search_entity_ids(session, entity_type, query, limit, league_code=None):
+    """Return up to limit entity ids whose names or aliases match query, best match first.
+
+    league_code restricts track searches to one league.
+    """
+    query = str(query or "").strip().casefold()[:MAX_QUERY_LENGTH]
+    if not query or limit <= 0:
+        return []
+    league_code = str(league_code or "").strip().casefold() or None
+    if _trigram_available(session):
+        return _database_search(session, entity_type, query, limit, league_code)
+    return _trigram_index(session, entity_type).search(query, limit, league_code)
+
+
+def _trigram_available(session):
+    engine = session.get_bind()
+    now = time.monotonic()
+    with _trigram_support_lock:
+        available, checked_at = _trigram_support.get(engine, (None, 0.0))
+    # Rechecked now and then, so a worker started before the pg_trgm migration moves over.
+    if available is None or now - checked_at >= TRIGRAM_CHECK_SECONDS:
+        available = bool(
+            session.scalar(text("SELECT COUNT(*) FROM pg_extension WHERE extname = 'pg_trgm'"))
+        )
+        with _trigram_support_lock:
+            _trigram_support[engine] = (available, now)
+    return available
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _database_search(session, entity_type, query, limit, league_code):
+    escaped = _escape_like(query)
+    branches = []
+    for identity, column in SEARCH_SOURCES[entity_type]:
+        term = func.lower(column)
+        rank = case(
+            (term == query, 3.0),
+            (term.like(f"{escaped}%", escape="\\"), 2.0),
+            (term.like(f"%{escaped}%", escape="\\"), 1.0),
+            else_=0.0,
+        ) + func.similarity(term, query)
+        branches.append(
+            select(identity.label("entity_id"), rank.label("rank")).where(
+                term.like(f"%{escaped}%", escape="\\") | term.op("%")(query)
+            )
+        )
+    matches = union_all(*branches).subquery()
+    statement = select(matches.c.entity_id).group_by(matches.c.entity_id)
+    if league_code and entity_type == "tracks":
+        statement = statement.where(
+            matches.c.entity_id.in_(
+                select(Track.track_id).where(func.lower(Track.league_code) == league_code)
+            )
+        )
+    return list(
+        session.scalars(
+            statement.order_by(func.max(matches.c.rank).desc(), matches.c.entity_id).limit(limit)
+        )
+    )
+
+
+def _word_trigrams(value):
+    """Trigrams the way pg_trgm extracts them: per word, padded two spaces left, one right."""
+    trigrams = set()
+    for word in _WORD.findall(value):
+        padded = f"  {word} "
+        trigrams.update(padded[index : index + 3] for index in range(len(padded) - 2))
+    return frozenset(trigrams)
+
+
+def _substring_trigrams(value):
+    return {value[index : index + 3] for index in range(len(value) - 2)}
+
+
+def _similarity(left, right):
+    if not left or not right:
+        return 0.0
+    shared = len(left & right)
+    return shared / (len(left) + len(right) - shared)
+
+
+@dataclass(frozen=True)
+class TrigramIndex:
+    """Lowercased names and aliases with trigram postings pointing at term positions."""
+
+    terms: tuple[tuple[int, str, frozenset], ...]
+    postings: dict
+    leagues: dict
+
+    @classmethod
+    def build(cls, rows, leagues=None):
+        terms = []
+        postings = defaultdict(set)
+        for entity_id, value in rows:
+            term = str(value or "").strip().casefold()
+            if not term:
+                continue
+            trigrams = _word_trigrams(term)
+            for trigram in trigrams | _substring_trigrams(term):
+                postings[trigram].add(len(terms))
+            terms.append((entity_id, term, trigrams))
+        return cls(
+            terms=tuple(terms),
+            postings={trigram: frozenset(positions) for trigram, positions in postings.items()},
+            leagues=dict(leagues or {}),
+        )
+
+    def _candidates(self, query, query_trigrams):
+        if len(query) < 3:
+            # Too short to share a trigram with every term that contains it.
+            return range(len(self.terms))
+        positions = set()
+        for trigram in query_trigrams | _substring_trigrams(query):
+            positions.update(self.postings.get(trigram, ()))
+        return positions
+
+    def search(self, query, limit, league_code=None):
+        query_trigrams = _word_trigrams(query)
+        best = {}
+        for position in self._candidates(query, query_trigrams):
+            entity_id, term, trigrams = self.terms[position]
+            if league_code and self.leagues.get(entity_id) != league_code:
+                continue
+            similarity = _similarity(trigrams, query_trigrams)
+            if term == query:
+                rank = 3.0 + similarity
+            elif term.startswith(query):
+                rank = 2.0 + similarity
+            elif query in term:
+                rank = 1.0 + similarity
+            elif similarity >= SIMILARITY_THRESHOLD:
+                rank = similarity
+            else:
+                continue
+            if rank > best.get(entity_id, -1.0):
+                best[entity_id] = rank
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        return [entity_id for entity_id, _rank in ranked[:limit]]
+
+
+def _build_trigram_index(session, entity_type):
+    rows = []
+    for identity, column in SEARCH_SOURCES[entity_type]:
+        rows.extend(session.execute(select(identity, column).where(column.is_not(None))))
+    leagues = None
+    if entity_type == "tracks":
+        leagues = session.execute(select(Track.track_id, func.lower(Track.league_code))).all()
+    return TrigramIndex.build(rows, leagues)
+
+
+def _trigram_index(session, entity_type):
+    """Return the in-process index for entity_type, building it at most once per data version."""
+    key = (entity_type, analytics_data_version(session))
+    return _index_cache.get_or_build(
+        session, key, lambda: _build_trigram_index(session, entity_type)
+    )
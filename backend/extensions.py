@@ -1,3 +1,37 @@
+import os
+import tempfile
+from pathlib import Path
+
 from flask_caching import Cache
 
+CACHE_PROVIDERS = {
+    "simple": "SimpleCache",
+    "filesystem": "FileSystemCache",
+    "redis": "RedisCache",
+}
+
 cache = Cache(config={"CACHE_TYPE": "simple", "CACHE_DEFAULT_TIMEOUT": 3600})
+
+
+def cache_config() -> dict:
+    """Select the response cache backend; filesystem and redis are shared across processes."""
+    provider = os.environ.get("CACHE_PROVIDER", "simple").strip().lower()
+    if provider not in CACHE_PROVIDERS:
+        raise RuntimeError("CACHE_PROVIDER must be simple, filesystem, or redis.")
+    config = {
+        "CACHE_TYPE": CACHE_PROVIDERS[provider],
+        "CACHE_DEFAULT_TIMEOUT": int(os.environ.get("CACHE_DEFAULT_TIMEOUT_SECONDS", "3600")),
+        "CACHE_THRESHOLD": int(os.environ.get("CACHE_THRESHOLD", "2000")),
+        "CACHE_SHARED": provider != "simple",
+    }
+    if provider == "filesystem":
+        config["CACHE_DIR"] = os.environ.get("CACHE_DIR") or str(
+            Path(tempfile.gettempdir()) / "ctc-stats-cache"
+        )
+    if provider == "redis":
+        redis_url = os.environ.get("CACHE_REDIS_URL", "").strip()
+        if not redis_url:
+            raise RuntimeError("CACHE_PROVIDER=redis requires CACHE_REDIS_URL.")
+        config["CACHE_REDIS_URL"] = redis_url
+        config["CACHE_KEY_PREFIX"] = os.environ.get("CACHE_KEY_PREFIX", "ctc-stats:")
+    return config
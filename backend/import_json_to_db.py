@@ -1,15 +1,25 @@
 import argparse
 import csv
 import hashlib
+import itertools
 import json
 import math
+import os
 import re
 import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+from data_version import bump_data_version
 from database import BASE_DIR, get_session_factory
+from match_detail_snapshots import (
+    clear_match_detail_snapshots,
+    invalidate_match_detail_snapshots,
+)
+from match_upload import validate_committable_match
 from models import (
     Division,
     DivisionPlayoffConfig,
@@ -34,6 +44,9 @@ from models import (
     Track,
     TrackAlias,
 )
+from player_display_names import refresh_player_display_names
+from player_role_analytics import refresh_race_classifications
+from player_track_rollups import rebuild_player_track_rollups, refresh_player_track_rollups
 from playoff_service import (
     match_type,
     playoff_format_new_entry,
@@ -41,12 +54,15 @@ from playoff_service import (
     validate_competition_metadata,
     validate_playoff_against_existing,
 )
+from race_team_totals import refresh_race_team_totals
 from sqlalchemy import func, or_, select, update
 
 JSON_ROOT = BASE_DIR / "JSON"
 HISTORICAL_TEAM_CORRECTIONS_PATH = BASE_DIR / "data" / "team_aliases.csv"
 PLAYER_IDENTITY_PATH = BASE_DIR / "data" / "player_identities.csv"
 WEEK_RE = re.compile(r"\bW(\d+)\b", re.IGNORECASE)
+# Files each worker may have parsed or queued ahead of the database writer.
+PARSE_AHEAD_PER_WORKER = 8
 
 
 @dataclass
@@ -101,6 +117,50 @@ def is_missing_player_placeholder(player_data: dict[str, Any]) -> bool:
     )
 
 
+def resolve_match_label(
+    match_data: dict[str, Any], path: Path, match_index: int, override: str | None = None
+) -> str:
+    return (
+        override
+        or str(match_data.get("match_label") or "").strip()
+        or (path.stem if match_index == 0 else f"{path.stem} #{match_index + 1}")
+    )
+
+
+def team_missing_results(team_data: dict[str, Any]) -> list[tuple[Any, int, str]]:
+    """Return (race_number, score, reason) awards for players absent from a team's table."""
+    explicit_missing_results = team_data.get("missing_player_results") or []
+    if explicit_missing_results:
+        missing_results = explicit_missing_results
+    else:
+        missing_results = [
+            {"race_number": index, "score": score, "reason": "unknown"}
+            for index, score in enumerate(team_data.get("missing_player_scores") or [], start=1)
+            if score is not None
+        ]
+    output = []
+    for missing_result in missing_results:
+        score = missing_result.get("score")
+        if not isinstance(score, (int, float)):
+            continue
+        reason = missing_result.get("reason")
+        if reason not in {"short_roster", "unreplaced_disconnect", "unknown"}:
+            reason = "unknown"
+        output.append((missing_result.get("race_number"), int(score), reason))
+    return output
+
+
+def placeholder_score(player_data: dict[str, Any], placeholder: bool) -> int:
+    return sum(
+        score
+        for score, position in zip(
+            player_data.get("race_scores") or [],
+            player_data.get("race_positions") or [],
+        )
+        if placeholder and isinstance(score, (int, float)) and position is None
+    )
+
+
 def load_historical_team_corrections(
     path: Path = HISTORICAL_TEAM_CORRECTIONS_PATH,
 ) -> dict[tuple[str, str, str, str, str], dict[str, Any]]:
@@ -478,30 +538,43 @@ def get_or_create_player(
     return player
 
 
-def add_player_aliases(session, player: Player, player_data: dict[str, Any], match_id: int):
+def add_player_aliases(
+    session,
+    player: Player,
+    player_data: dict[str, Any],
+    match_id: int,
+    known_aliases: dict[tuple[int, str, str], PlayerAlias] | None = None,
+):
+    """Record the player's names from this match; known_aliases, when given, replaces the
+    lookup query and receives the new aliases."""
     for alias_type in ("lounge_name", "mii_name", "table_name"):
         alias_value = player_data.get(alias_type)
         if not alias_value:
             continue
-        alias = session.scalar(
-            select(PlayerAlias).where(
-                PlayerAlias.player_id == player.player_id,
-                PlayerAlias.alias_type == alias_type,
-                PlayerAlias.alias_value == alias_value,
+        key = (player.player_id, alias_type, alias_value)
+        if known_aliases is None:
+            alias = session.scalar(
+                select(PlayerAlias).where(
+                    PlayerAlias.player_id == player.player_id,
+                    PlayerAlias.alias_type == alias_type,
+                    PlayerAlias.alias_value == alias_value,
+                )
             )
-        )
+        else:
+            alias = known_aliases.get(key)
         if alias:
             alias.last_seen_match_id = match_id
             continue
-        session.add(
-            PlayerAlias(
-                player_id=player.player_id,
-                alias_type=alias_type,
-                alias_value=alias_value,
-                first_seen_match_id=match_id,
-                last_seen_match_id=match_id,
-            )
+        alias = PlayerAlias(
+            player_id=player.player_id,
+            alias_type=alias_type,
+            alias_value=alias_value,
+            first_seen_match_id=match_id,
+            last_seen_match_id=match_id,
         )
+        session.add(alias)
+        if known_aliases is not None:
+            known_aliases[key] = alias
 
 
 def get_or_create_player_entry(
@@ -512,13 +585,20 @@ def get_or_create_player_entry(
     division: Division,
     player_data: dict[str, Any],
     match_id: int,
+    known_entries: dict[tuple[int, int], PlayerSeasonEntry] | None = None,
 ) -> PlayerSeasonEntry:
-    entry = session.scalar(
-        select(PlayerSeasonEntry).where(
-            PlayerSeasonEntry.player_id == player.player_id,
-            PlayerSeasonEntry.team_season_entry_id == team_entry.team_season_entry_id,
+    """Find or add the player's entry on the team; known_entries, when given, replaces the
+    lookup query and receives a new entry, which is then left for the caller to flush."""
+    key = (player.player_id, team_entry.team_season_entry_id)
+    if known_entries is None:
+        entry = session.scalar(
+            select(PlayerSeasonEntry).where(
+                PlayerSeasonEntry.player_id == player.player_id,
+                PlayerSeasonEntry.team_season_entry_id == team_entry.team_season_entry_id,
+            )
         )
-    )
+    else:
+        entry = known_entries.get(key)
     if entry:
         entry.last_seen_match_id = match_id
         lounge_name = player_data.get("lounge_name") or player_data.get("table_name")
@@ -542,7 +622,10 @@ def get_or_create_player_entry(
         last_seen_match_id=match_id,
     )
     session.add(entry)
-    session.flush()
+    if known_entries is None:
+        session.flush()
+    else:
+        known_entries[key] = entry
     return entry
 
 
@@ -634,7 +717,13 @@ def backfill_inferred_roles(session) -> int:
         )
         .values(role="runner", role_source="inferred")
     )
-    return (bagger_result.rowcount or 0) + (runner_result.rowcount or 0)
+    updated = (bagger_result.rowcount or 0) + (runner_result.rowcount or 0)
+    if updated:
+        # Roles show in every match detail payload, and the rewrite can touch any match.
+        clear_match_detail_snapshots(session)
+        rebuild_player_track_rollups(session)
+        bump_data_version(session, results=True)
+    return updated
 
 
 def normalize_match_objects(data: Any) -> tuple[str, list[dict[str, Any]]]:
@@ -648,71 +737,156 @@ def normalize_match_objects(data: Any) -> tuple[str, list[dict[str, Any]]]:
     return "unknown", []
 
 
-def import_match(
-    session,
-    source_file: SourceFile,
-    season: Season,
-    division: Division,
-    match_data: dict[str, Any],
-    path: Path,
-    match_index: int,
+@dataclass(frozen=True)
+class ParsedArchiveFile:
+    path: Path
+    file_sha256: str
+    json_shape: str = "unknown"
+    matches: tuple[dict[str, Any], ...] = ()
+    error: str | None = None
+
+
+def validate_archived_match(match_data: dict[str, Any]) -> None:
+    """Apply acceptance checks to editor-produced files; legacy exports carry no metadata."""
+    if match_data.get("league"):
+        validate_committable_match(match_data)
+    elif match_type(match_data) == "playoff":
+        validate_competition_metadata(match_data)
+
+
+def parse_archive_file(path: Path) -> ParsedArchiveFile:
+    """Hash, decode, normalize and validate one archive file without touching the database."""
+    file_hash = sha256_file(path)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        json_shape, matches = normalize_match_objects(data)
+        for match_data in matches:
+            validate_archived_match(match_data)
+    except ValueError as error:
+        return ParsedArchiveFile(path, file_hash, error=str(error))
+    return ParsedArchiveFile(path, file_hash, json_shape, tuple(matches))
+
+
+def parse_archive_files(paths, workers: int = 1):
+    """Return an iterator of parsed archive files in input order, parsing up to `workers`
+    at once and at most PARSE_AHEAD_PER_WORKER files per worker ahead of the reader.
+
+    The workers start here, so call this before opening database connections; they then
+    never inherit them. Closing the iterator early cancels the files not yet started.
+    """
+    paths = list(paths)
+    if workers <= 1 or len(paths) < 2:
+        return map(parse_archive_file, paths)
+    remaining = iter(paths)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque(
+            executor.submit(parse_archive_file, path)
+            for path in itertools.islice(remaining, workers * PARSE_AHEAD_PER_WORKER)
+        )
+    except BaseException:
+        executor.shutdown(cancel_futures=True)
+        raise
+    return _collect_parsed_files(executor, pending, remaining)
+
+
+def _collect_parsed_files(executor, pending, remaining):
+    try:
+        while pending:
+            parsed = pending.popleft().result()
+            for path in itertools.islice(remaining, 1):
+                pending.append(executor.submit(parse_archive_file, path))
+            yield parsed
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+@dataclass
+class MatchRows:
+    """Column values for one match's teams, players, penalties and race results.
+
+    Rows belonging to a match team or match player name it by its position in match_teams
+    or match_players, since those ids only exist once the rows are written.
+    """
+
+    match_teams: list[dict[str, Any]] = field(default_factory=list)
+    match_players: list[tuple[int, PlayerSeasonEntry, dict[str, Any]]] = field(default_factory=list)
+    penalties: list[tuple[int, int | None, dict[str, Any]]] = field(default_factory=list)
+    race_team_results: list[tuple[int, int | None, dict[str, Any]]] = field(default_factory=list)
+    race_player_results: list[tuple[int, int | None, dict[str, Any]]] = field(default_factory=list)
+
+
+def with_owner_ids(rows, match_team_ids, match_player_ids=()) -> list[dict[str, Any]]:
+    """Replace the positions in MatchRows entries with the written match team and player ids."""
+    output = []
+    for team_position, player_position, row in rows:
+        values = {**row, "match_team_id": match_team_ids[team_position]}
+        if player_position is not None:
+            values["match_player_id"] = match_player_ids[player_position]
+        output.append(values)
+    return output
+
+
+def resolve_match_teams(
+    teams: dict[str, Any],
     aliases: dict[tuple[str, str, str, str, str], dict[str, str]],
-    identities: PlayerIdentities,
     league_code: str,
     season_code: str,
     division_code: str,
-    match_label_override: str | None = None,
-    week_number_override: int | None = None,
-    player_identity_links: dict[str, int] | None = None,
-    team_identity_links: dict[str, int] | None = None,
-):
-    teams = match_data.get("teams") or {}
-    tracks = match_data.get("tracks") or []
-    match_label = (
-        match_label_override
-        or str(match_data.get("match_label") or "").strip()
-        or (path.stem if match_index == 0 else f"{path.stem} #{match_index + 1}")
-    )
-    review_notes = []
-    if match_data.get("races_played") != len(tracks):
-        review_notes.append(
-            f"races_played={match_data.get('races_played')} but tracks length={len(tracks)}."
-        )
+    match_label: str,
+    resolve_team,
+) -> tuple[dict[str, tuple[dict[str, Any], Team, TeamSeasonEntry]], list[str]]:
+    """Resolve each raw team key through the archive aliases.
 
-    resolved_team_keys = []
+    resolve_team(canonical_tag, display_name, team_id, hex_color) returns the team and its
+    season entry. Returns (alias, team, team_entry) by raw team key, and review notes.
+    """
     resolved_teams = {}
-    team_identity_links = team_identity_links or {}
+    review_notes = []
     for raw_team_key, team_data in teams.items():
         alias = resolve_team_alias(
             aliases, league_code, season_code, division_code, match_label, raw_team_key
         )
         canonical_tag = alias["canonical_tag"]
-        display_name = alias["display_name"] or canonical_tag
-        resolved_team_keys.append(canonical_tag)
-        team = get_or_create_team(
-            session,
-            league_code,
+        team, team_entry = resolve_team(
             canonical_tag,
-            display_name,
-            linked_team_id=alias.get("team_id")
-            or team_identity_links.get(canonical_tag.casefold()),
-        )
-        team_entry = get_or_create_team_entry(
-            session,
-            team,
-            season,
-            division,
-            canonical_tag,
-            display_name,
+            alias["display_name"] or canonical_tag,
+            alias.get("team_id"),
             team_data.get("hex_color"),
         )
         resolved_teams[raw_team_key] = (alias, team, team_entry)
         if alias.get("note"):
             review_notes.append(f"Team alias applied: {raw_team_key} -> {alias['canonical_tag']}.")
-    if len(set(resolved_team_keys)) != 2:
+    resolved_team_count = len({alias["canonical_tag"] for alias, _, _ in resolved_teams.values()})
+    if resolved_team_count != 2:
+        review_notes.append(
+            f"Expected 2 resolved teams, found {resolved_team_count} from {len(teams)} raw team objects."
+        )
+    return resolved_teams, review_notes
+
+
+def add_match(
+    session,
+    source_file: SourceFile,
+    season: Season,
+    division: Division,
+    match_data: dict[str, Any],
+    path: Path,
+    match_index: int,
+    match_label: str,
+    resolved_teams: dict[str, tuple[dict[str, Any], Team, TeamSeasonEntry]],
+    team_review_notes: list[str],
+    week_number_override: int | None = None,
+) -> Match:
+    """Add the match row, placing a playoff match in its series; the caller flushes it."""
+    tracks = match_data.get("tracks") or []
+    review_notes = []
+    if match_data.get("races_played") != len(tracks):
         review_notes.append(
-            f"Expected 2 resolved teams, found {len(set(resolved_team_keys))} from {len(teams)} raw team objects."
+            f"races_played={match_data.get('races_played')} but tracks length={len(tracks)}."
         )
+    review_notes.extend(team_review_notes)
+    resolved_team_count = len({alias["canonical_tag"] for alias, _, _ in resolved_teams.values()})
 
     kind = match_type(match_data)
     week_number = (
@@ -728,7 +902,7 @@ def import_match(
             season.season_id,
             division,
             match_data,
-            [resolved_teams[key][1].team_id for key in teams],
+            [team.team_id for _, team, _ in resolved_teams.values()],
         )
         week_number = None
         series_match_number = playoff_metadata["series_match_number"]
@@ -753,201 +927,330 @@ def import_match(
         races_played=match_data.get("races_played") or len(tracks),
         raw_json=json.dumps(match_data, ensure_ascii=False, separators=(",", ":")),
         import_status="needs_review"
-        if len(set(resolved_team_keys)) != 2 or match_data.get("races_played") != len(tracks)
+        if resolved_team_count != 2 or match_data.get("races_played") != len(tracks)
         else "imported",
         review_notes=" ".join(review_notes) if review_notes else None,
     )
     session.add(match)
-    session.flush()
+    return match
 
-    for ref_order, ref_value in enumerate(match_data.get("rxx") or [], start=1):
-        session.add(
-            MatchTableRef(match_id=match.match_id, ref_value=ref_value, ref_order=ref_order)
-        )
 
-    race_by_number = {}
-    for race_number, track_name in enumerate(tracks, start=1):
-        track = get_or_create_track(session, league_code, track_name)
-        race = Race(
-            match_id=match.match_id,
-            race_number=race_number,
-            track_id=track.track_id,
-            track_name_raw=track_name,
-        )
-        session.add(race)
-        session.flush()
-        race_by_number[race_number] = race
+def match_table_ref_rows(match_id: int, match_data: dict[str, Any]) -> list[dict[str, Any]]:
+    return [
+        {"match_id": match_id, "ref_value": ref_value, "ref_order": ref_order}
+        for ref_order, ref_value in enumerate(match_data.get("rxx") or [], start=1)
+    ]
 
-    match_team_by_canonical_tag = {}
+
+def missing_player_result(race_id: int, score: int, reason: str = "unknown") -> dict[str, Any]:
+    return {
+        "race_id": race_id,
+        "score": score,
+        "result_type": "missing_player",
+        "reason": reason,
+    }
+
+
+def build_match_rows(
+    match_id: int,
+    teams: dict[str, Any],
+    resolved_teams: dict[str, tuple[dict[str, Any], Team, TeamSeasonEntry]],
+    race_ids: dict[int, int],
+    resolve_player,
+) -> MatchRows:
+    """Build the rows of a match's teams and players.
+
+    Raw teams resolving to one canonical tag share a match team. race_ids maps race numbers
+    to written races; resolve_player(friend_code, player_data, team_entry) returns the
+    player and season entry, recording the player's aliases and sighting on the way.
+    """
+    rows = MatchRows()
+    team_positions = {}
     for raw_team_key, team_data in teams.items():
-        alias, team, team_entry = resolved_teams[raw_team_key]
+        alias, _team, team_entry = resolved_teams[raw_team_key]
         canonical_tag = alias["canonical_tag"]
-        match_team = match_team_by_canonical_tag.get(canonical_tag)
-        if match_team:
+        team_position = team_positions.get(canonical_tag)
+        if team_position is not None:
+            match_team = rows.match_teams[team_position]
             if raw_team_key != canonical_tag:
-                match_team.raw_team_key = f"{match_team.raw_team_key}|{raw_team_key}"
-            match_team.raw_total_score += team_data.get("total_score") or 0
-            match_team.team_penalty_points += team_data.get("penalties") or 0
-            match_team.final_score = (match_team.final_score or 0) + (
+                match_team["raw_team_key"] = f"{match_team['raw_team_key']}|{raw_team_key}"
+            match_team["raw_total_score"] += team_data.get("total_score") or 0
+            match_team["team_penalty_points"] += team_data.get("penalties") or 0
+            match_team["final_score"] = (match_team["final_score"] or 0) + (
                 team_data.get("total_score") or 0
             )
         else:
-            match_team = MatchTeam(
-                match_id=match.match_id,
-                team_season_entry_id=team_entry.team_season_entry_id,
-                raw_team_key=raw_team_key,
-                table_tag_str=team_data.get("table_tag_str"),
-                hex_color=team_data.get("hex_color"),
-                raw_total_score=team_data.get("total_score") or 0,
-                team_penalty_points=team_data.get("penalties") or 0,
-                table_penalty_str=team_data.get("table_penalty_str"),
-                final_score=team_data.get("total_score"),
+            team_position = len(rows.match_teams)
+            team_positions[canonical_tag] = team_position
+            rows.match_teams.append(
+                {
+                    "match_id": match_id,
+                    "team_season_entry_id": team_entry.team_season_entry_id,
+                    "raw_team_key": raw_team_key,
+                    "table_tag_str": team_data.get("table_tag_str"),
+                    "hex_color": team_data.get("hex_color"),
+                    "raw_total_score": team_data.get("total_score") or 0,
+                    "team_penalty_points": team_data.get("penalties") or 0,
+                    "table_penalty_str": team_data.get("table_penalty_str"),
+                    "final_score": team_data.get("total_score"),
+                }
             )
-            session.add(match_team)
-            session.flush()
-            match_team_by_canonical_tag[canonical_tag] = match_team
 
         if team_data.get("penalties") or team_data.get("table_penalty_str"):
-            session.add(
-                Penalty(
-                    match_id=match.match_id,
-                    match_team_id=match_team.match_team_id,
-                    penalty_scope="team",
-                    penalty_points=team_data.get("penalties") or 0,
-                    raw_penalty_text=team_data.get("table_penalty_str"),
-                    source_field="team.penalties",
+            rows.penalties.append(
+                (
+                    team_position,
+                    None,
+                    {
+                        "match_id": match_id,
+                        "match_player_id": None,
+                        "penalty_scope": "team",
+                        "penalty_points": team_data.get("penalties") or 0,
+                        "raw_penalty_text": team_data.get("table_penalty_str"),
+                        "source_field": "team.penalties",
+                    },
                 )
             )
 
-        explicit_missing_results = team_data.get("missing_player_results") or []
-        if explicit_missing_results:
-            missing_results = explicit_missing_results
-        else:
-            missing_results = [
-                {"race_number": index, "score": score, "reason": "unknown"}
-                for index, score in enumerate(team_data.get("missing_player_scores") or [], start=1)
-                if score is not None
-            ]
         recorded_missing_races = set()
-        for missing_result in missing_results:
-            race = race_by_number.get(missing_result.get("race_number"))
-            score = missing_result.get("score")
-            if race is None or not isinstance(score, (int, float)):
+        for race_number, score, reason in team_missing_results(team_data):
+            race_id = race_ids.get(race_number)
+            if race_id is None:
                 continue
-            reason = missing_result.get("reason")
-            if reason not in {"short_roster", "unreplaced_disconnect", "unknown"}:
-                reason = "unknown"
-            session.add(
-                RaceTeamResult(
-                    race_id=race.race_id,
-                    match_team_id=match_team.match_team_id,
-                    score=int(score),
-                    result_type="missing_player",
-                    reason=reason,
-                )
+            rows.race_team_results.append(
+                (team_position, None, missing_player_result(race_id, score, reason))
             )
-            recorded_missing_races.add(race.race_number)
+            recorded_missing_races.add(race_number)
 
         for friend_code, player_data in (team_data.get("players") or {}).items():
             placeholder = is_missing_player_placeholder(player_data)
-            placeholder_score_total = sum(
-                score
-                for score, position in zip(
-                    player_data.get("race_scores") or [],
-                    player_data.get("race_positions") or [],
+            player, player_entry = resolve_player(friend_code, player_data, team_entry)
+            player_position = len(rows.match_players)
+            rows.match_players.append(
+                (
+                    team_position,
+                    player_entry,
+                    {
+                        "player_id": player.player_id,
+                        "friend_code_raw": friend_code,
+                        "lounge_name_raw": player_data.get("lounge_name"),
+                        "mii_name_raw": player_data.get("mii_name"),
+                        "table_name_raw": player_data.get("table_name"),
+                        "tag_raw": player_data.get("tag"),
+                        "flag": player_data.get("flag"),
+                        "table_str": player_data.get("table_str"),
+                        "raw_total_score": (player_data.get("total_score") or 0)
+                        - placeholder_score(player_data, placeholder),
+                        "player_penalty_points": player_data.get("penalties") or 0,
+                        "had_penalties": bool(player_data.get("had_penalties")),
+                        "subbed_out": bool(player_data.get("subbed_out")),
+                        "gp_scores_json": json.dumps(
+                            player_data.get("gp_scores") or [], ensure_ascii=False
+                        ),
+                    },
                 )
-                if placeholder and isinstance(score, (int, float)) and position is None
-            )
-            player = get_or_create_player(
-                session,
-                friend_code,
-                player_data,
-                identities,
-                player_identity_links,
-            )
-            add_player_aliases(session, player, player_data, match.match_id)
-            player_entry = get_or_create_player_entry(
-                session, player, team_entry, season, division, player_data, match.match_id
-            )
-            match_player = MatchPlayer(
-                match_team_id=match_team.match_team_id,
-                player_id=player.player_id,
-                player_season_entry_id=player_entry.player_season_entry_id,
-                friend_code_raw=friend_code,
-                lounge_name_raw=player_data.get("lounge_name"),
-                mii_name_raw=player_data.get("mii_name"),
-                table_name_raw=player_data.get("table_name"),
-                tag_raw=player_data.get("tag"),
-                flag=player_data.get("flag"),
-                table_str=player_data.get("table_str"),
-                raw_total_score=(player_data.get("total_score") or 0) - placeholder_score_total,
-                player_penalty_points=player_data.get("penalties") or 0,
-                had_penalties=bool(player_data.get("had_penalties")),
-                subbed_out=bool(player_data.get("subbed_out")),
-                gp_scores_json=json.dumps(player_data.get("gp_scores") or [], ensure_ascii=False),
-            )
-            session.add(match_player)
-            session.flush()
-
-            friend_code_row = session.scalar(
-                select(PlayerFriendCode).where(PlayerFriendCode.friend_code == friend_code)
             )
-            if friend_code_row:
-                if not friend_code_row.first_seen_match_id:
-                    friend_code_row.first_seen_match_id = match.match_id
-                friend_code_row.last_seen_match_id = match.match_id
-
             if player_data.get("had_penalties") or player_data.get("penalties"):
-                session.add(
-                    Penalty(
-                        match_id=match.match_id,
-                        match_team_id=match_team.match_team_id,
-                        match_player_id=match_player.match_player_id,
-                        penalty_scope="player",
-                        penalty_points=player_data.get("penalties") or 0,
-                        raw_penalty_text=None,
-                        source_field="player.penalties",
+                rows.penalties.append(
+                    (
+                        team_position,
+                        player_position,
+                        {
+                            "match_id": match_id,
+                            "penalty_scope": "player",
+                            "penalty_points": player_data.get("penalties") or 0,
+                            "raw_penalty_text": None,
+                            "source_field": "player.penalties",
+                        },
                     )
                 )
 
             race_scores = player_data.get("race_scores") or []
             race_positions = player_data.get("race_positions") or []
             race_roles = player_data.get("race_roles") or []
-            for race_number, race in race_by_number.items():
+            for race_number, race_id in race_ids.items():
                 idx = race_number - 1
                 score = race_scores[idx] if idx < len(race_scores) else None
                 position = race_positions[idx] if idx < len(race_positions) else None
                 if placeholder and isinstance(score, (int, float)) and position is None:
                     if race_number not in recorded_missing_races:
-                        session.add(
-                            RaceTeamResult(
-                                race_id=race.race_id,
-                                match_team_id=match_team.match_team_id,
-                                score=int(score),
-                                result_type="missing_player",
-                                reason="unknown",
-                            )
+                        rows.race_team_results.append(
+                            (team_position, None, missing_player_result(race_id, int(score)))
                         )
                         recorded_missing_races.add(race_number)
                     score = None
                 explicit_role = race_roles[idx] if idx < len(race_roles) else None
                 role, role_source = resolve_role(explicit_role, position)
-                session.add(
-                    RacePlayerResult(
-                        race_id=race.race_id,
-                        match_player_id=match_player.match_player_id,
-                        player_id=player.player_id,
-                        match_team_id=match_team.match_team_id,
-                        team_season_entry_id=team_entry.team_season_entry_id,
-                        score=score,
-                        position=position,
-                        role=role,
-                        role_source=role_source,
-                        is_subbed_out_result=bool(player_data.get("subbed_out"))
-                        and (score is None or position is None),
+                rows.race_player_results.append(
+                    (
+                        team_position,
+                        player_position,
+                        {
+                            "race_id": race_id,
+                            "player_id": player.player_id,
+                            "team_season_entry_id": team_entry.team_season_entry_id,
+                            "score": score,
+                            "position": position,
+                            "role": role,
+                            "role_source": role_source,
+                            "is_subbed_out_result": bool(player_data.get("subbed_out"))
+                            and (score is None or position is None),
+                        },
                     )
                 )
+    return rows
+
+
+def write_match_rows(session, rows: MatchRows):
+    match_teams = [MatchTeam(**row) for row in rows.match_teams]
+    session.add_all(match_teams)
+    session.flush()
+    match_team_ids = [match_team.match_team_id for match_team in match_teams]
+    match_players = [
+        MatchPlayer(
+            **row,
+            match_team_id=match_team_ids[team_position],
+            player_season_entry_id=player_entry.player_season_entry_id,
+        )
+        for team_position, player_entry, row in rows.match_players
+    ]
+    session.add_all(match_players)
+    session.flush()
+    match_player_ids = [match_player.match_player_id for match_player in match_players]
+    for model, owned_rows in (
+        (Penalty, rows.penalties),
+        (RaceTeamResult, rows.race_team_results),
+        (RacePlayerResult, rows.race_player_results),
+    ):
+        session.add_all(
+            model(**row) for row in with_owner_ids(owned_rows, match_team_ids, match_player_ids)
+        )
+
+
+@dataclass
+class WrittenResults:
+    """Races and players an import wrote, whose derived rows are refreshed together."""
+
+    race_ids: set[int] = field(default_factory=set)
+    player_ids: set[int] = field(default_factory=set)
+
+
+def refresh_written_results(session, written: WrittenResults):
+    """Refresh classifications, team totals, rollups and display names once for the
+    written races and players, then advance the data version."""
+    if not written.race_ids and not written.player_ids:
+        return
+    refresh_race_classifications(session, written.race_ids)
+    refresh_race_team_totals(session, written.race_ids)
+    refresh_player_track_rollups(session, written.player_ids)
+    renamed_player_ids = refresh_player_display_names(session, written.player_ids)
+    # New aliases can change how these players are named in their earlier matches.
+    invalidate_match_detail_snapshots(session, player_ids=renamed_player_ids)
+    bump_data_version(session, results=True)
+
+
+def import_match(
+    session,
+    source_file: SourceFile,
+    season: Season,
+    division: Division,
+    match_data: dict[str, Any],
+    path: Path,
+    match_index: int,
+    aliases: dict[tuple[str, str, str, str, str], dict[str, str]],
+    identities: PlayerIdentities,
+    league_code: str,
+    season_code: str,
+    division_code: str,
+    match_label_override: str | None = None,
+    week_number_override: int | None = None,
+    player_identity_links: dict[str, int] | None = None,
+    team_identity_links: dict[str, int] | None = None,
+    written: WrittenResults | None = None,
+):
+    """Import one match. Derived rows are refreshed now, or, given written, left to the
+    caller's refresh_written_results over everything the run wrote."""
+    teams = match_data.get("teams") or {}
+    tracks = match_data.get("tracks") or []
+    match_label = resolve_match_label(match_data, path, match_index, match_label_override)
+    team_identity_links = team_identity_links or {}
 
+    def resolve_team(canonical_tag, display_name, team_id, hex_color):
+        team = get_or_create_team(
+            session,
+            league_code,
+            canonical_tag,
+            display_name,
+            linked_team_id=team_id or team_identity_links.get(canonical_tag.casefold()),
+        )
+        team_entry = get_or_create_team_entry(
+            session, team, season, division, canonical_tag, display_name, hex_color
+        )
+        return team, team_entry
+
+    resolved_teams, team_review_notes = resolve_match_teams(
+        teams, aliases, league_code, season_code, division_code, match_label, resolve_team
+    )
+    match = add_match(
+        session,
+        source_file,
+        season,
+        division,
+        match_data,
+        path,
+        match_index,
+        match_label,
+        resolved_teams,
+        team_review_notes,
+        week_number_override,
+    )
+    session.flush()
+
+    session.add_all(
+        MatchTableRef(**row) for row in match_table_ref_rows(match.match_id, match_data)
+    )
+
+    race_ids = {}
+    for race_number, track_name in enumerate(tracks, start=1):
+        track = get_or_create_track(session, league_code, track_name)
+        race = Race(
+            match_id=match.match_id,
+            race_number=race_number,
+            track_id=track.track_id,
+            track_name_raw=track_name,
+        )
+        session.add(race)
+        session.flush()
+        race_ids[race_number] = race.race_id
+
+    def resolve_player(friend_code, player_data, team_entry):
+        player = get_or_create_player(
+            session, friend_code, player_data, identities, player_identity_links
+        )
+        add_player_aliases(session, player, player_data, match.match_id)
+        player_entry = get_or_create_player_entry(
+            session, player, team_entry, season, division, player_data, match.match_id
+        )
+        friend_code_row = session.scalar(
+            select(PlayerFriendCode).where(PlayerFriendCode.friend_code == friend_code)
+        )
+        if friend_code_row:
+            if not friend_code_row.first_seen_match_id:
+                friend_code_row.first_seen_match_id = match.match_id
+            friend_code_row.last_seen_match_id = match.match_id
+        return player, player_entry
+
+    rows = build_match_rows(match.match_id, teams, resolved_teams, race_ids, resolve_player)
+    write_match_rows(session, rows)
+
+    match_written = WrittenResults(
+        set(race_ids.values()), {row["player_id"] for _, _, row in rows.match_players}
+    )
+    if written is None:
+        refresh_written_results(session, match_written)
+    else:
+        written.race_ids |= match_written.race_ids
+        written.player_ids |= match_written.player_ids
     return match
 
 
@@ -1411,6 +1714,8 @@ def import_file(
     aliases: dict[tuple[str, str, str, str, str], dict[str, str]],
     identities: PlayerIdentities,
     json_root: Path = JSON_ROOT,
+    parsed: ParsedArchiveFile | None = None,
+    written: WrittenResults | None = None,
 ) -> tuple[int, int]:
     relative_parts = path.relative_to(json_root).parts
     if len(relative_parts) < 4:
@@ -1419,7 +1724,8 @@ def import_file(
     league_code, season_code, division_code = relative_parts[:3]
     season = get_or_create_season(session, league_code, season_code)
     division = get_or_create_division(session, season, division_code)
-    file_hash = sha256_file(path)
+    parsed = parsed or parse_archive_file(path)
+    file_hash = parsed.file_sha256
     source_path = (Path("JSON") / Path(*relative_parts)).as_posix()
 
     existing_source = session.scalar(
@@ -1429,8 +1735,9 @@ def import_file(
     if existing_source or existing_hash:
         return 0, 1
 
-    data = json.loads(path.read_text(encoding="utf-8"))
-    json_shape, matches = normalize_match_objects(data)
+    if parsed.error:
+        raise ValueError(f"{source_path}: {parsed.error}")
+    json_shape, matches = parsed.json_shape, parsed.matches
     if not matches:
         return 0, 0
 
@@ -1462,6 +1769,7 @@ def import_file(
             league_code,
             season_code,
             division_code,
+            written=written,
         )
     return len(matches), 0
 
@@ -1492,20 +1800,37 @@ def print_summary(session, imported_matches: int, skipped_files: int):
         print(f"{model.__tablename__}: {table_count(session, model)}")
 
 
-def import_json_tree(database_target: str | None, json_root: Path):
+def import_json_tree(
+    database_target: str | None, json_root: Path, bulk: bool = False, workers: int = 1
+):
+    if bulk:
+        from bulk_import import bulk_import_json_tree
+
+        return bulk_import_json_tree(database_target, json_root, workers=workers)
+
     SessionLocal = get_session_factory(database_target)
     imported_matches = 0
     skipped_files = 0
     identities = load_player_identities()
+    parsed_files = parse_archive_files(preferred_json_files(json_root), workers)
+    written = WrittenResults()
     with SessionLocal() as session:
         aliases = load_archive_team_aliases(session)
-        for path in preferred_json_files(json_root):
+        for parsed in parsed_files:
             with session.begin_nested():
                 imported, skipped = import_file(
-                    session, path, aliases, identities, json_root=json_root
+                    session,
+                    parsed.path,
+                    aliases,
+                    identities,
+                    json_root=json_root,
+                    parsed=parsed,
+                    written=written,
                 )
                 imported_matches += imported
                 skipped_files += skipped
+        # Derived tables are refreshed once for the whole run instead of once per match.
+        refresh_written_results(session, written)
         session.commit()
         print_summary(session, imported_matches, skipped_files)
     return imported_matches
@@ -1522,8 +1847,19 @@ def main():
     parser.add_argument(
         "--json-root", type=Path, default=JSON_ROOT, help="Root JSON archive directory."
     )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Resolve identities in memory and batch row writes; intended for full rebuilds.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes that hash, parse and validate files ahead of the database writer.",
+    )
     args = parser.parse_args()
-    import_json_tree(args.database_url, args.json_root)
+    import_json_tree(args.database_url, args.json_root, bulk=args.bulk, workers=args.workers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+"""Scope-wide player leaderboards computed in one pass and cached per results version."""
+
+from dataclasses import dataclass
+
+from analytics_eligibility import analytics_excluded_race_ids, analytics_results_version
+from engine_cache import EngineCache
+from match_sets import normalize_match_set
+from player_role_analytics import normalize_role, summarize_role_totals
+from race_facts import (
+    group_rows,
+    group_totals,
+    qualified_groups,
+    race_facts,
+    role_totals_by_group,
+)
+
+MAX_CACHED_LEADERBOARDS = 256
+
+_leaderboard_cache = EngineCache(MAX_CACHED_LEADERBOARDS)
+
+
+@dataclass(frozen=True)
+class LeaderboardEntry:
+    player_id: int
+    rank: int
+    value: float
+    metrics: dict
+
+
+@dataclass(frozen=True)
+class Leaderboard:
+    role: str
+    minimum_races: int
+    metric: str
+    entries: tuple[LeaderboardEntry, ...]
+    by_player: dict
+
+    @property
+    def population(self):
+        return len(self.entries)
+
+    def entry_for(self, player_id):
+        return self.by_player.get(player_id)
+
+
+def leaderboard_metric(role):
+    return "12_race_pace" if role == "runner" else "bagger_points_per_race"
+
+
+def _build_leaderboard(session, season_id, division_id, role, min_races, team_id, match_set):
+    facts = race_facts(session)
+    rows = facts.scope_rows(season_id, division_id, match_set, team_id=team_id)
+    player_ids, groups = group_rows(facts, rows)
+    totals = role_totals_by_group(facts, rows, groups, len(player_ids), role)
+
+    multiplier = 12 if role == "runner" else 1
+    ranked = []
+    for group in qualified_groups(totals, min_races):
+        metrics = summarize_role_totals(group_totals(totals, group), role)
+        value = metrics["total_points"] / metrics["scored_races"] * multiplier
+        ranked.append((value, metrics, int(player_ids[group])))
+    ranked.sort(key=lambda item: (-item[0], -item[1]["races"], item[2]))
+
+    entries = []
+    rank = 0
+    previous_value = None
+    for position, (value, metrics, player_id) in enumerate(ranked, start=1):
+        # Competition ranking: equal values share the rank of the first player holding it.
+        if value != previous_value:
+            rank = position
+            previous_value = value
+        entries.append(LeaderboardEntry(player_id, rank, value, metrics))
+    return Leaderboard(
+        role=role,
+        minimum_races=min_races,
+        metric=leaderboard_metric(role),
+        entries=tuple(entries),
+        by_player={entry.player_id: entry for entry in entries},
+    )
+
+
+def scope_leaderboard(
+    session, season_id, division_id, role="runner", min_races=12, team_id=None, match_set="regular"
+):
+    """Return the full ranking for a season/division scope, building it at most once per
+    results version."""
+    role = normalize_role(role)
+    match_set = normalize_match_set(match_set)
+    key = (
+        season_id,
+        division_id,
+        role,
+        min_races,
+        team_id,
+        match_set,
+        analytics_results_version(session),
+        analytics_excluded_race_ids(session),
+    )
+    return _leaderboard_cache.get_or_build(
+        session,
+        key,
+        lambda: _build_leaderboard(
+            session, season_id, division_id, role, min_races, team_id, match_set
+        ),
+    )
@@ -0,0 +1,71 @@
+"""Persisted match detail payloads written at acceptance and served by the public API."""
+
+import json
+
+from models import MatchDetailSnapshot, MatchPlayer, MatchTeam, Race, utc_now
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+
+def load_match_detail_snapshot(session, match_id):
+    payload = session.scalar(
+        select(MatchDetailSnapshot.payload_json).where(MatchDetailSnapshot.match_id == match_id)
+    )
+    return json.loads(payload) if payload is not None else None
+
+
+def save_match_detail_snapshot(session, match_id, detail):
+    """Store a rendered detail payload inside the caller's transaction."""
+    payload = json.dumps(detail, ensure_ascii=False, separators=(",", ":"))
+    values = {
+        "payload_json": payload,
+        "rendered_at": utc_now(),
+    }
+    statement = insert(MatchDetailSnapshot).values(match_id=match_id, **values)
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[MatchDetailSnapshot.match_id],
+            set_={name: statement.excluded[name] for name in values},
+        )
+    )
+
+
+def clear_match_detail_snapshots(session):
+    """Drop every snapshot, for bulk rewrites that can change any match's payload."""
+    return session.execute(delete(MatchDetailSnapshot)).rowcount
+
+
+def invalidate_match_detail_snapshots(
+    session, *, player_ids=(), track_ids=(), team_season_entry_ids=()
+):
+    """Drop snapshots of every match that renders one of the given players, tracks, or
+    team entries; they are rebuilt on their next read."""
+    player_ids = list(player_ids)
+    track_ids = list(track_ids)
+    team_season_entry_ids = list(team_season_entry_ids)
+    conditions = []
+    if player_ids:
+        conditions.append(
+            MatchDetailSnapshot.match_id.in_(
+                select(MatchTeam.match_id)
+                .join(MatchPlayer, MatchPlayer.match_team_id == MatchTeam.match_team_id)
+                .where(MatchPlayer.player_id.in_(player_ids))
+            )
+        )
+    if track_ids:
+        conditions.append(
+            MatchDetailSnapshot.match_id.in_(
+                select(Race.match_id).where(Race.track_id.in_(track_ids))
+            )
+        )
+    if team_season_entry_ids:
+        conditions.append(
+            MatchDetailSnapshot.match_id.in_(
+                select(MatchTeam.match_id).where(
+                    MatchTeam.team_season_entry_id.in_(team_season_entry_ids)
+                )
+            )
+        )
+    if not conditions:
+        return 0
+    return session.execute(delete(MatchDetailSnapshot).where(or_(*conditions))).rowcount
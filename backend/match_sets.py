@@ -22,3 +22,12 @@ def apply_match_set(statement, match_set: str | None):
     if normalized == "playoffs":
         return statement.where(Match.match_type == "playoff")
     return statement
+
+
+def match_types_for(match_set: str | None) -> tuple[str, ...]:
+    normalized = normalize_match_set(match_set)
+    if normalized == "regular":
+        return ("regular",)
+    if normalized == "playoffs":
+        return ("playoff",)
+    return ("regular", "playoff")
@@ -485,11 +485,32 @@ def find_match_conflict(session, match_data: dict[str, Any]) -> Match | None:
     return None
 
 
-def reconcile_archive(session, root: Path | None = None) -> dict[str, list[dict[str, str]]]:
+def reconcile_archive(
+    session, root: Path | None = None, full_verify: bool = False
+) -> dict[str, list[dict[str, str]]]:
+    """Compare source_files with the archive, re-hashing only files whose size or stamp changed.
+
+    Hashes are kept in archive_manifest_entries inside the caller's transaction; pass
+    full_verify to re-read every file regardless of the manifest.
+    """
+    from archive_manifest import JSON_ARCHIVE_LOCATION, ArchiveManifest, storage_location
     from archive_storage import get_archive_storage
 
     root = (root or json_root()).resolve()
     storage = get_archive_storage()
+    storage_key = storage_location(storage.provider)
+    manifest = ArchiveManifest(session, full_verify=full_verify)
+    stored_objects = None
+
+    def archive_hash(path: Path, stat) -> str:
+        return manifest.sha256(
+            JSON_ARCHIVE_LOCATION,
+            path.relative_to(root).as_posix(),
+            stat.st_size,
+            str(stat.st_mtime_ns),
+            path.read_bytes,
+        )
+
     missing_files = []
     hash_mismatches = []
     known_paths = set()
@@ -498,16 +519,24 @@ def reconcile_archive(session, root: Path | None = None) -> dict[str, list[dict[
         if source.source_path.startswith("preview/"):
             continue
         if source.storage_object_key and source.storage_object_key.startswith("accepted/"):
+            key = source.storage_object_key
+            if stored_objects is None:
+                stored_objects = storage.list_objects("accepted")
+            stat = stored_objects.get(key)
+            if stat is None:
+                missing_files.append({"source_path": key})
+                continue
             try:
-                content = storage.read(source.storage_object_key)
+                actual_hash = manifest.sha256(
+                    storage_key, key, stat.size, stat.generation, lambda: storage.read(key)
+                )
             except Exception:
-                missing_files.append({"source_path": source.storage_object_key})
+                missing_files.append({"source_path": key})
                 continue
-            actual_hash = hashlib.sha256(content).hexdigest()
             if actual_hash != source.file_sha256:
                 hash_mismatches.append(
                     {
-                        "source_path": source.storage_object_key,
+                        "source_path": key,
                         "database": source.file_sha256,
                         "actual": actual_hash,
                     }
@@ -523,7 +552,7 @@ def reconcile_archive(session, root: Path | None = None) -> dict[str, list[dict[
         if not path.exists():
             missing_files.append({"source_path": source.source_path})
             continue
-        actual_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+        actual_hash = archive_hash(path, path.stat())
         if actual_hash != source.file_sha256:
             hash_mismatches.append(
                 {
@@ -546,8 +575,9 @@ def reconcile_archive(session, root: Path | None = None) -> dict[str, list[dict[
         for path in archive_files
         if path.resolve() not in known_paths
         and not (path.suffix.lower() == ".txt" and path.with_suffix("").resolve() in json_stems)
-        and hashlib.sha256(path.read_bytes()).hexdigest() not in known_hashes
+        and archive_hash(path, path.stat()) not in known_hashes
     ]
+    manifest.save(prune_locations=(JSON_ARCHIVE_LOCATION, storage_key))
     return {
         "missing_files": missing_files,
         "hash_mismatches": hash_mismatches,
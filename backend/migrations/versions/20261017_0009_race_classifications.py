@@ -0,0 +1,70 @@
+"""Persist confirmed-5v5 race classification.
+
+Revision ID: 20261017_0009
+Revises: 20260809_0008
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261017_0009"
+down_revision: str | None = "20260809_0008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "race_classifications",
+        sa.Column("race_id", sa.Integer(), nullable=False),
+        sa.Column("is_confirmed_5v5", sa.Boolean(), nullable=False),
+        sa.Column("result_count", sa.Integer(), nullable=False),
+        sa.Column("classified_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["race_id"], ["races.race_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("race_id"),
+    )
+    op.execute(
+        """
+        WITH team_counts AS (
+            SELECT race_id,
+                   match_team_id,
+                   count(*) AS result_count,
+                   count(DISTINCT player_id) AS player_count
+              FROM race_player_results
+             GROUP BY race_id, match_team_id
+        ),
+        race_counts AS (
+            SELECT race_id,
+                   count(*) AS result_count,
+                   count(DISTINCT player_id) AS player_count
+              FROM race_player_results
+             GROUP BY race_id
+        )
+        INSERT INTO race_classifications
+            (race_id, is_confirmed_5v5, result_count, classified_at)
+        SELECT r.race_id,
+               COALESCE(
+                   rc.result_count = 10
+                   AND rc.player_count = 10
+                   AND (SELECT count(*) FROM team_counts tc WHERE tc.race_id = r.race_id) = 2
+                   AND NOT EXISTS (
+                       SELECT 1
+                         FROM team_counts tc
+                        WHERE tc.race_id = r.race_id
+                          AND (tc.result_count <> 5 OR tc.player_count <> 5)
+                   ),
+                   false
+               ),
+               COALESCE(rc.result_count, 0),
+               CURRENT_TIMESTAMP
+          FROM races r
+          LEFT JOIN race_counts rc ON rc.race_id = r.race_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("race_classifications")
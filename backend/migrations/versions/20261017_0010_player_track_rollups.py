@@ -0,0 +1,73 @@
+"""Add pre-summed player track rollups.
+
+Revision ID: 20261017_0010
+Revises: 20261017_0009
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261017_0010"
+down_revision: str | None = "20261017_0009"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Role classification lives in the application, so existing results are rolled up
+    # by scripts/rebuild_player_track_rollups.py after the upgrade. Players without
+    # rollup rows are served from the live result query meanwhile.
+    op.create_table(
+        "player_track_rollups",
+        sa.Column("player_id", sa.Integer(), nullable=False),
+        sa.Column("track_id", sa.Integer(), nullable=False),
+        sa.Column("season_id", sa.Integer(), nullable=False),
+        sa.Column("division_id", sa.Integer(), nullable=False),
+        sa.Column("team_id", sa.Integer(), nullable=False),
+        sa.Column("match_type", sa.Text(), nullable=False),
+        sa.Column("role", sa.Text(), nullable=False),
+        sa.Column("role_source", sa.Text(), nullable=False),
+        sa.Column("races", sa.Integer(), nullable=False),
+        sa.Column("scored_races", sa.Integer(), nullable=False),
+        sa.Column("total_points", sa.Integer(), nullable=False),
+        sa.Column("excluded_score_rows", sa.Integer(), nullable=False),
+        sa.Column("placement_sum", sa.Integer(), nullable=False),
+        sa.Column("placement_count", sa.Integer(), nullable=False),
+        sa.Column("wins", sa.Integer(), nullable=False),
+        sa.Column("podiums", sa.Integer(), nullable=False),
+        sa.Column("bag_points", sa.Integer(), nullable=False),
+        sa.Column("zero_points", sa.Integer(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.CheckConstraint(
+            "match_type IN ('regular', 'playoff')", name="ck_player_track_rollup_type"
+        ),
+        sa.CheckConstraint(
+            "role IN ('runner', 'bagger', 'unknown')", name="ck_player_track_rollup_role"
+        ),
+        sa.CheckConstraint(
+            "role_source IN ('explicit', 'inferred', 'unknown')",
+            name="ck_player_track_rollup_source",
+        ),
+        sa.ForeignKeyConstraint(["division_id"], ["divisions.division_id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["player_id"], ["players.player_id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["season_id"], ["seasons.season_id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["team_id"], ["teams.team_id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["track_id"], ["tracks.track_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint(
+            "player_id",
+            "track_id",
+            "season_id",
+            "division_id",
+            "team_id",
+            "match_type",
+            "role",
+            "role_source",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("player_track_rollups")
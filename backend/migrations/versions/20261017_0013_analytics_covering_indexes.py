@@ -0,0 +1,91 @@
+"""Add covering indexes for the analytics read paths.
+
+Revision ID: 20261017_0013
+Revises: 20261017_0012
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261017_0013"
+down_revision: str | None = "20261017_0012"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (name, table, key columns, included columns), matching the Index entries in models.py.
+INDEXES = (
+    ("ix_matches_scope", "matches", ["season_id", "division_id", "match_type"], ["match_id"]),
+    (
+        "ix_match_teams_match_id",
+        "match_teams",
+        ["match_id"],
+        ["match_team_id", "team_season_entry_id"],
+    ),
+    (
+        "ix_match_teams_team_season_entry_id",
+        "match_teams",
+        ["team_season_entry_id"],
+        ["match_team_id", "match_id"],
+    ),
+    ("ix_races_track_id", "races", ["track_id"], ["race_id", "match_id"]),
+    (
+        "ix_race_player_results_player_id",
+        "race_player_results",
+        ["player_id"],
+        ["race_id", "match_team_id", "score", "position", "role", "role_source"],
+    ),
+    (
+        "ix_race_player_results_race_team",
+        "race_player_results",
+        ["race_id", "match_team_id"],
+        ["player_id", "score", "position", "role", "role_source"],
+    ),
+    (
+        "ix_race_player_results_match_team_id",
+        "race_player_results",
+        ["match_team_id"],
+        ["race_id", "player_id", "score"],
+    ),
+)
+
+
+def upgrade() -> None:
+    # Built concurrently so imports and public reads keep running during the upgrade.
+    with op.get_context().autocommit_block():
+        # An interrupted concurrent build leaves an INVALID index behind that IF NOT
+        # EXISTS would keep; drop those so a rerun builds them again.
+        invalid = (
+            op.get_bind()
+            .scalars(
+                sa.text(
+                    "SELECT index_class.relname FROM pg_index"
+                    " JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid"
+                    " WHERE NOT pg_index.indisvalid"
+                    " AND index_class.relnamespace = CAST(current_schema() AS regnamespace)"
+                    " AND index_class.relname = ANY(:names)"
+                ),
+                {"names": [name for name, *_ in INDEXES]},
+            )
+            .all()
+        )
+        for name, table, _columns, _include in INDEXES:
+            if name in invalid:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+        for name, table, columns, include in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_include=include,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _include in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
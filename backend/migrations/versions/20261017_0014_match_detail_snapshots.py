@@ -0,0 +1,32 @@
+"""Add persisted match detail snapshots.
+
+Revision ID: 20261017_0014
+Revises: 20261017_0013
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261017_0014"
+down_revision: str | None = "20261017_0013"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Existing matches are rendered on their first public read.
+    op.create_table(
+        "match_detail_snapshots",
+        sa.Column("match_id", sa.Integer(), nullable=False),
+        sa.Column("payload_json", sa.Text(), nullable=False),
+        sa.Column("rendered_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["match_id"], ["matches.match_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("match_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("match_detail_snapshots")
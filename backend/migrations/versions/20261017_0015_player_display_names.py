@@ -0,0 +1,62 @@
+"""Add stored player display names.
+
+Revision ID: 20261017_0015
+Revises: 20261017_0014
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261017_0015"
+down_revision: str | None = "20261017_0014"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "player_display_names",
+        sa.Column("player_id", sa.Integer(), nullable=False),
+        sa.Column("lounge_name", sa.Text(), nullable=True),
+        sa.Column("table_name", sa.Text(), nullable=True),
+        sa.Column("mii_name", sa.Text(), nullable=True),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["player_id"], ["players.player_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("player_id"),
+    )
+    # (player_id, alias_type, alias_value) is unique, so the application's ranking by
+    # (uses, last seen match, alias id) reduces to the latest-seen, newest alias per type.
+    op.execute(
+        """
+        WITH ranked AS (
+            SELECT DISTINCT ON (player_id, alias_type) player_id, alias_type, alias_value
+            FROM player_aliases
+            WHERE alias_type IN ('lounge_name', 'table_name', 'mii_name')
+              AND alias_value IS NOT NULL
+              AND TRIM(alias_value) <> ''
+            ORDER BY
+                player_id,
+                alias_type,
+                COALESCE(last_seen_match_id, 0) DESC,
+                player_alias_id DESC
+        )
+        INSERT INTO player_display_names
+            (player_id, lounge_name, table_name, mii_name, refreshed_at)
+        SELECT
+            players.player_id,
+            MAX(ranked.alias_value) FILTER (WHERE ranked.alias_type = 'lounge_name'),
+            MAX(ranked.alias_value) FILTER (WHERE ranked.alias_type = 'table_name'),
+            MAX(ranked.alias_value) FILTER (WHERE ranked.alias_type = 'mii_name'),
+            CURRENT_TIMESTAMP
+        FROM players
+        LEFT JOIN ranked ON ranked.player_id = players.player_id
+        GROUP BY players.player_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("player_display_names")
@@ -0,0 +1,54 @@
+"""Add pg_trgm GIN indexes for player, team, and track search.
+
+The extension is created only where the server ships it; without it the indexes are
+skipped and entity_search ranks names through its in-process trigram index.
+
+Revision ID: 20261017_0016
+Revises: 20261017_0015
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261017_0016"
+down_revision: str | None = "20261017_0015"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (name, table, column), matching SEARCH_SOURCES in entity_search.py.
+INDEXES = (
+    ("ix_players_canonical_name_trgm", "players", "canonical_name"),
+    ("ix_players_primary_friend_code_trgm", "players", "primary_friend_code"),
+    ("ix_player_aliases_alias_value_trgm", "player_aliases", "alias_value"),
+    ("ix_teams_canonical_name_trgm", "teams", "canonical_name"),
+    ("ix_teams_canonical_tag_trgm", "teams", "canonical_tag"),
+    ("ix_team_aliases_alias_value_trgm", "team_aliases", "alias_value"),
+    ("ix_tracks_canonical_name_trgm", "tracks", "canonical_name"),
+    ("ix_track_aliases_alias_value_trgm", "track_aliases", "alias_value"),
+)
+
+
+def upgrade() -> None:
+    if not op.get_context().as_sql:
+        available = op.get_bind().scalar(
+            sa.text("SELECT COUNT(*) FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        )
+        if not available:
+            return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Built concurrently so imports and public reads keep running during the upgrade.
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} USING gin (lower({column}) gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _table, _column in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,112 @@
+"""Persist per-race team totals.
+
+Revision ID: 20261017_0017
+Revises: 20261017_0016
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261017_0017"
+down_revision: str | None = "20261017_0016"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "race_team_totals",
+        sa.Column("race_id", sa.Integer(), nullable=False),
+        sa.Column("match_team_id", sa.Integer(), nullable=False),
+        sa.Column("team_season_entry_id", sa.Integer(), nullable=False),
+        sa.Column("player_points", sa.Integer(), nullable=False),
+        sa.Column("scored_results", sa.Integer(), nullable=False),
+        sa.Column("awarded_points", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("opponent_best", sa.Integer(), nullable=True),
+        sa.Column("result", sa.Text(), nullable=False),
+        sa.CheckConstraint(
+            "result IN ('win', 'loss', 'tie', 'unknown')", name="ck_race_team_total_result"
+        ),
+        sa.ForeignKeyConstraint(["race_id"], ["races.race_id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["match_team_id"], ["match_teams.match_team_id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["team_season_entry_id"], ["team_season_entries.team_season_entry_id"]
+        ),
+        sa.PrimaryKeyConstraint("race_id", "match_team_id"),
+    )
+    op.create_index(
+        "ix_race_team_totals_team_season_entry_id",
+        "race_team_totals",
+        ["team_season_entry_id"],
+        postgresql_include=["race_id", "score", "result"],
+    )
+    op.execute(
+        """
+        WITH player_points AS (
+            SELECT race_id, match_team_id, sum(score) AS points, count(*) AS results
+              FROM race_player_results
+             WHERE score BETWEEN 0 AND 15
+             GROUP BY race_id, match_team_id
+        ),
+        awarded_points AS (
+            SELECT race_id, match_team_id, sum(score) AS points
+              FROM race_team_results
+             GROUP BY race_id, match_team_id
+        ),
+        scored AS (
+            SELECT r.race_id,
+                   mt.match_team_id,
+                   mt.team_season_entry_id,
+                   COALESCE(pp.points, 0) AS player_points,
+                   COALESCE(pp.results, 0) AS scored_results,
+                   COALESCE(ap.points, 0) AS awarded_points,
+                   COALESCE(pp.points, 0) + COALESCE(ap.points, 0) AS score
+              FROM races r
+              JOIN match_teams mt ON mt.match_id = r.match_id
+              LEFT JOIN player_points pp
+                ON pp.race_id = r.race_id AND pp.match_team_id = mt.match_team_id
+              LEFT JOIN awarded_points ap
+                ON ap.race_id = r.race_id AND ap.match_team_id = mt.match_team_id
+        ),
+        ranked AS (
+            SELECT scored.*,
+                   CASE WHEN score = nth_value(score, 1) OVER race_scores
+                        THEN nth_value(score, 2) OVER race_scores
+                        ELSE nth_value(score, 1) OVER race_scores
+                   END AS opponent_best
+              FROM scored
+            WINDOW race_scores AS (
+                PARTITION BY race_id ORDER BY score DESC
+                ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+            )
+        )
+        INSERT INTO race_team_totals
+            (race_id, match_team_id, team_season_entry_id, player_points, scored_results,
+             awarded_points, score, opponent_best, result)
+        SELECT race_id,
+               match_team_id,
+               team_season_entry_id,
+               player_points,
+               scored_results,
+               awarded_points,
+               score,
+               opponent_best,
+               CASE WHEN opponent_best IS NULL THEN 'unknown'
+                    WHEN score > opponent_best THEN 'win'
+                    WHEN score < opponent_best THEN 'loss'
+                    ELSE 'tie'
+               END
+          FROM ranked
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_race_team_totals_team_season_entry_id", table_name="race_team_totals")
+    op.drop_table("race_team_totals")
@@ -3,6 +3,7 @@ from datetime import datetime, timezone
 
 from database import Base
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     CheckConstraint,
     Column,
@@ -150,6 +151,19 @@ class SourceFile(Base):
     )
 
 
+class ArchiveManifestEntry(Base):
+    """Last verified size, change stamp, and SHA-256 of one archive file or storage object."""
+
+    __tablename__ = "archive_manifest_entries"
+
+    location = Column(Text, primary_key=True)
+    path = Column(Text, primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    stamp = Column(Text, nullable=False)
+    sha256 = Column(Text, nullable=False)
+    verified_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+
 class DatabaseAdditionLog(Base):
     __tablename__ = "database_addition_logs"
 
@@ -275,6 +289,20 @@ class PlayerAlias(Base):
     )
 
 
+class PlayerDisplayName(Base):
+    """Alias-derived display names per player, refreshed whenever the player's aliases change."""
+
+    __tablename__ = "player_display_names"
+
+    player_id = Column(
+        Integer, ForeignKey("players.player_id", ondelete="CASCADE"), primary_key=True
+    )
+    lounge_name = Column(Text)
+    table_name = Column(Text)
+    mii_name = Column(Text)
+    refreshed_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+
 class PlayerSeasonEntry(Base):
     __tablename__ = "player_season_entries"
 
@@ -334,6 +362,13 @@ class Match(Base):
             "playoff_series_id", "series_match_number", name="uq_match_playoff_series_number"
         ),
         Index("ix_matches_match_type", "match_type"),
+        Index(
+            "ix_matches_scope",
+            "season_id",
+            "division_id",
+            "match_type",
+            postgresql_include=["match_id"],
+        ),
     )
 
 
@@ -364,7 +399,19 @@ class MatchTeam(Base):
     table_penalty_str = Column(Text)
     final_score = Column(Integer)
 
-    __table_args__ = (UniqueConstraint("match_id", "raw_team_key", name="uq_match_team_key"),)
+    __table_args__ = (
+        UniqueConstraint("match_id", "raw_team_key", name="uq_match_team_key"),
+        Index(
+            "ix_match_teams_match_id",
+            "match_id",
+            postgresql_include=["match_team_id", "team_season_entry_id"],
+        ),
+        Index(
+            "ix_match_teams_team_season_entry_id",
+            "team_season_entry_id",
+            postgresql_include=["match_team_id", "match_id"],
+        ),
+    )
 
 
 class MatchPlayer(Base):
@@ -427,7 +474,10 @@ class Race(Base):
     track_name_raw = Column(Text, nullable=False)
     has_penalty = Column(Boolean, nullable=False, default=False)
 
-    __table_args__ = (UniqueConstraint("match_id", "race_number", name="uq_race_match_number"),)
+    __table_args__ = (
+        UniqueConstraint("match_id", "race_number", name="uq_race_match_number"),
+        Index("ix_races_track_id", "track_id", postgresql_include=["race_id", "match_id"]),
+    )
 
 
 class RaceTeamResult(Base):
@@ -472,6 +522,137 @@ class RacePlayerResult(Base):
         CheckConstraint(
             "role_source IN ('manual', 'inferred', 'unknown')", name="ck_result_role_source"
         ),
+        # Covering indexes for the analytics reads: one player's history, a batch of
+        # races with their teams, and one match team's results.
+        Index(
+            "ix_race_player_results_player_id",
+            "player_id",
+            postgresql_include=[
+                "race_id",
+                "match_team_id",
+                "score",
+                "position",
+                "role",
+                "role_source",
+            ],
+        ),
+        Index(
+            "ix_race_player_results_race_team",
+            "race_id",
+            "match_team_id",
+            postgresql_include=["player_id", "score", "position", "role", "role_source"],
+        ),
+        Index(
+            "ix_race_player_results_match_team_id",
+            "match_team_id",
+            postgresql_include=["race_id", "player_id", "score"],
+        ),
+    )
+
+
+class MatchDetailSnapshot(Base):
+    """Rendered match detail payload, dropped whenever a rename, alias, identity, or track
+    merge changes what the match renders."""
+
+    __tablename__ = "match_detail_snapshots"
+
+    match_id = Column(Integer, ForeignKey("matches.match_id", ondelete="CASCADE"), primary_key=True)
+    payload_json = Column(Text, nullable=False)
+    rendered_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+
+class RaceClassification(Base):
+    """Persisted confirmed-5v5 status maintained whenever a race's results are written."""
+
+    __tablename__ = "race_classifications"
+
+    race_id = Column(Integer, ForeignKey("races.race_id", ondelete="CASCADE"), primary_key=True)
+    is_confirmed_5v5 = Column(Boolean, nullable=False, default=False)
+    result_count = Column(Integer, nullable=False, default=0)
+    classified_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+
+class RaceTeamTotal(Base):
+    """Each match team's complete score in a race with its best opponent's score."""
+
+    __tablename__ = "race_team_totals"
+
+    race_id = Column(Integer, ForeignKey("races.race_id", ondelete="CASCADE"), primary_key=True)
+    match_team_id = Column(
+        Integer, ForeignKey("match_teams.match_team_id", ondelete="CASCADE"), primary_key=True
+    )
+    team_season_entry_id = Column(
+        Integer, ForeignKey("team_season_entries.team_season_entry_id"), nullable=False
+    )
+    player_points = Column(Integer, nullable=False, default=0)
+    scored_results = Column(Integer, nullable=False, default=0)
+    awarded_points = Column(Integer, nullable=False, default=0)
+    score = Column(Integer, nullable=False, default=0)
+    opponent_best = Column(Integer)
+    result = Column(Text, nullable=False, default="unknown")
+
+    __table_args__ = (
+        CheckConstraint(
+            "result IN ('win', 'loss', 'tie', 'unknown')", name="ck_race_team_total_result"
+        ),
+        Index(
+            "ix_race_team_totals_team_season_entry_id",
+            "team_season_entry_id",
+            postgresql_include=["race_id", "score", "result"],
+        ),
+    )
+
+
+class DataVersion(Base):
+    """Monotonic counter bumped in every transaction that changes public analytics data."""
+
+    __tablename__ = "data_versions"
+
+    name = Column(Text, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+
+class PlayerTrackRollup(Base):
+    """Per-player track totals pre-summed by scope and classified role, rebuilt on write."""
+
+    __tablename__ = "player_track_rollups"
+
+    player_id = Column(
+        Integer, ForeignKey("players.player_id", ondelete="CASCADE"), primary_key=True
+    )
+    track_id = Column(Integer, ForeignKey("tracks.track_id", ondelete="CASCADE"), primary_key=True)
+    season_id = Column(
+        Integer, ForeignKey("seasons.season_id", ondelete="CASCADE"), primary_key=True
+    )
+    division_id = Column(
+        Integer, ForeignKey("divisions.division_id", ondelete="CASCADE"), primary_key=True
+    )
+    team_id = Column(Integer, ForeignKey("teams.team_id", ondelete="CASCADE"), primary_key=True)
+    match_type = Column(Text, primary_key=True)
+    role = Column(Text, primary_key=True)
+    role_source = Column(Text, primary_key=True)
+    races = Column(Integer, nullable=False, default=0)
+    scored_races = Column(Integer, nullable=False, default=0)
+    total_points = Column(Integer, nullable=False, default=0)
+    excluded_score_rows = Column(Integer, nullable=False, default=0)
+    placement_sum = Column(Integer, nullable=False, default=0)
+    placement_count = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    podiums = Column(Integer, nullable=False, default=0)
+    bag_points = Column(Integer, nullable=False, default=0)
+    zero_points = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("match_type IN ('regular', 'playoff')", name="ck_player_track_rollup_type"),
+        CheckConstraint(
+            "role IN ('runner', 'bagger', 'unknown')", name="ck_player_track_rollup_role"
+        ),
+        CheckConstraint(
+            "role_source IN ('explicit', 'inferred', 'unknown')",
+            name="ck_player_track_rollup_source",
+        ),
     )
 
 
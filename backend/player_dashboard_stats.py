@@ -3,6 +3,7 @@ from dataclasses import dataclass
 
 from analytics_eligibility import apply_analytics_race_filter
 from database import get_session_factory
+from leaderboards import scope_leaderboard
 from match_sets import apply_match_set, normalize_match_set
 from models import (
     Division,
@@ -22,14 +23,29 @@ from models import (
 )
 from player_display_names import _display_names_for_players
 from player_role_analytics import (
+    ROLE_TOTAL_FIELDS,
     bagger_counterpart_summary,
+    classify_results,
     confirmed_5v5_race_ids,
     normalize_role,
-    role_coverage,
+    role_coverage_key,
+    role_coverage_payload,
+    role_totals_from_columns,
     summarize_role_rows,
+    summarize_role_totals,
     valid_placement,
     valid_race_score,
 )
+from player_track_rollups import player_track_totals
+from race_facts import (
+    group_rows,
+    group_totals,
+    qualified_groups,
+    race_facts,
+    role_coverage_by_group,
+    role_totals_by_group,
+)
+from scope_catalog import scope_catalog
 from sqlalchemy import desc, select
 
 SessionLocal = get_session_factory()
@@ -71,12 +87,8 @@ def _resolve_scope(session, league="ctc", season=None, division=None):
     if not season_code:
         return DashboardScope(league_code, None, None, None, None, None)
 
-    season_row = session.execute(
-        select(Season.season_id, Season.season_code, Season.season_number).where(
-            Season.league_code == league_code,
-            Season.season_code == season_code,
-        )
-    ).first()
+    catalog = scope_catalog(session, league_code)
+    season_row = catalog.seasons_by_code.get(season_code)
     if not season_row:
         raise DashboardError(f"Unknown season: {season_code}")
 
@@ -90,12 +102,7 @@ def _resolve_scope(session, league="ctc", season=None, division=None):
             None,
         )
 
-    division_row = session.execute(
-        select(Division.division_id, Division.division_code).where(
-            Division.season_id == season_row.season_id,
-            Division.division_code == division_code,
-        )
-    ).first()
+    division_row = catalog.division(season_row.season_id, division_code)
     if not division_row:
         raise DashboardError(f"Unknown division for {season_code}: {division_code}")
 
@@ -299,41 +306,26 @@ def _player_identity(session, player, league_code="ctc"):
 
 
 def _player_race_rows(session, player_id, scope, team_id=None, match_set="regular"):
+    """Return the player's results as classify_results column tuples, in match order.
+
+    Match, season, and team details are read per match by _match_team_rows instead.
+    """
     statement = (
         select(
             RacePlayerResult.race_id,
+            RacePlayerResult.player_id,
             RacePlayerResult.match_team_id,
             RacePlayerResult.score,
             RacePlayerResult.position,
             RacePlayerResult.role,
             RacePlayerResult.role_source,
+            Race.match_id,
             Race.race_number,
-            Track.track_id,
-            Track.canonical_name.label("track_name"),
-            Match.match_id,
-            Match.match_label,
-            Match.format,
-            Match.week_number,
-            Match.races_played,
-            Season.season_id,
-            Season.season_code,
-            Season.season_number,
-            Division.division_code,
-            Team.team_id,
-            Team.canonical_name.label("team_name"),
-            TeamSeasonEntry.clan_tag,
+            Race.track_id,
         )
         .join(Race, Race.race_id == RacePlayerResult.race_id)
-        .join(Track, Track.track_id == Race.track_id)
         .join(Match, Match.match_id == Race.match_id)
         .join(Season, Season.season_id == Match.season_id)
-        .join(Division, Division.division_id == Match.division_id)
-        .join(MatchTeam, MatchTeam.match_team_id == RacePlayerResult.match_team_id)
-        .join(
-            TeamSeasonEntry,
-            TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
-        )
-        .join(Team, Team.team_id == TeamSeasonEntry.team_id)
         .where(
             RacePlayerResult.player_id == player_id,
             Season.league_code == scope.league_code,
@@ -344,7 +336,14 @@ def _player_race_rows(session, player_id, scope, team_id=None, match_set="regula
     if scope.division_id is not None:
         statement = statement.where(Match.division_id == scope.division_id)
     if team_id is not None:
-        statement = statement.where(Team.team_id == team_id)
+        statement = (
+            statement.join(MatchTeam, MatchTeam.match_team_id == RacePlayerResult.match_team_id)
+            .join(
+                TeamSeasonEntry,
+                TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
+            )
+            .where(TeamSeasonEntry.team_id == team_id)
+        )
     statement = apply_match_set(statement, match_set)
     statement = apply_analytics_race_filter(statement, session)
     return session.execute(statement.order_by(Match.match_id, Race.race_number)).all()
@@ -360,11 +359,20 @@ def _match_team_rows(session, match_ids):
             MatchTeam.final_score,
             MatchTeam.raw_total_score,
             MatchTeam.team_penalty_points,
+            Match.match_label,
+            Match.week_number,
+            Season.season_id,
+            Season.season_code,
+            Season.season_number,
+            Division.division_code,
             Team.team_id,
             Team.canonical_name,
             TeamSeasonEntry.display_name,
             TeamSeasonEntry.clan_tag,
         )
+        .join(Match, Match.match_id == MatchTeam.match_id)
+        .join(Season, Season.season_id == Match.season_id)
+        .join(Division, Division.division_id == Match.division_id)
         .join(
             TeamSeasonEntry,
             TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
@@ -384,108 +392,64 @@ def _final_score(row):
 def _player_ranking(session, player_id, scope, min_races, role, team_id=None, match_set="regular"):
     if scope.season_id is None or scope.division_id is None:
         return None
-    statement = (
-        select(
-            RacePlayerResult.player_id,
-            RacePlayerResult.race_id,
-            RacePlayerResult.match_team_id,
-            RacePlayerResult.score,
-            RacePlayerResult.position,
-            RacePlayerResult.role,
-            RacePlayerResult.role_source,
-        )
-        .join(Race, Race.race_id == RacePlayerResult.race_id)
-        .join(Match, Match.match_id == Race.match_id)
-        .join(MatchTeam, MatchTeam.match_team_id == RacePlayerResult.match_team_id)
-        .join(
-            TeamSeasonEntry,
-            TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
-        )
-        .where(
-            Match.season_id == scope.season_id,
-            Match.division_id == scope.division_id,
-        )
+    leaderboard = scope_leaderboard(
+        session,
+        scope.season_id,
+        scope.division_id,
+        role=role,
+        min_races=min_races,
+        team_id=team_id,
+        match_set=match_set,
     )
-    if team_id is not None:
-        statement = statement.where(TeamSeasonEntry.team_id == team_id)
-    statement = apply_match_set(statement, match_set)
-    statement = apply_analytics_race_filter(statement, session)
-    rows = list(session.execute(statement).all())
-    confirmed = confirmed_5v5_race_ids(session, rows)
-    _, classified = role_coverage(rows, confirmed)
-    by_player = defaultdict(list)
-    for classified_row in classified:
-        by_player[classified_row[0].player_id].append(classified_row)
-
-    values = {}
-    for current_player_id, player_rows in by_player.items():
-        metrics = summarize_role_rows(player_rows, role)
-        if metrics["scored_races"] < min_races:
-            continue
-        multiplier = 12 if role == "runner" else 1
-        values[current_player_id] = metrics["total_points"] / metrics["scored_races"] * multiplier
-    target = values.get(player_id)
-    if target is None:
-        return {"eligible": False, "minimum_races": min_races, "population": len(values)}
-    rank = 1 + sum(1 for value in values.values() if value > target)
+    entry = leaderboard.entry_for(player_id)
+    if entry is None:
+        return {
+            "eligible": False,
+            "minimum_races": min_races,
+            "population": leaderboard.population,
+        }
     return {
         "eligible": True,
-        "rank": rank,
-        "population": len(values),
+        "rank": entry.rank,
+        "population": leaderboard.population,
         "minimum_races": min_races,
-        "metric": "12_race_pace" if role == "runner" else "bagger_points_per_race",
-        "value": _round(target),
+        "metric": leaderboard.metric,
+        "value": _round(entry.value),
     }
 
 
-def get_player_overview(
-    player_id,
-    league="ctc",
-    season=None,
-    division=None,
-    team_id=None,
-    min_races=12,
-    role="runner",
-    match_set="regular",
-    session=None,
-):
-    role = normalize_role(role)
-    match_set = normalize_match_set(match_set)
-    if session is None:
-        with SessionLocal() as owned_session:
-            return get_player_overview(
-                player_id,
-                league=league,
-                season=season,
-                division=division,
-                team_id=team_id,
-                min_races=min_races,
-                role=role,
-                match_set=match_set,
-                session=owned_session,
-            )
-
+def _resolve_player_request(session, player_id, league, season, division, team_id):
     player = session.get(Player, player_id)
     if not player:
         raise DashboardNotFound("Player not found.")
     scope = _resolve_scope(session, league=league, season=season, division=division)
     if team_id is not None and not session.get(Team, team_id):
         raise DashboardError("Unknown team filter.")
+    return player, scope
+
 
+def _classified_player_rows(session, player_id, scope, team_id=None, match_set="regular"):
     rows = _player_race_rows(session, player_id, scope, team_id=team_id, match_set=match_set)
-    confirmed = confirmed_5v5_race_ids(session, rows)
-    coverage, classified = role_coverage(rows, confirmed)
-    selected = [item for item in classified if item[1] == role]
+    return classify_results(rows, confirmed_5v5_race_ids(session, rows))
+
+
+def _player_role_metrics(session, player_id, classified, role):
     metrics = summarize_role_rows(classified, role)
     if role == "bagger":
         metrics.update(bagger_counterpart_summary(session, player_id, classified))
+    return metrics
+
 
+def _player_overview_payload(
+    session, player, scope, team_id, min_races, role, match_set, coverage, classified, metrics
+):
+    player_id = player.player_id
     match_groups = defaultdict(list)
-    for row in rows:
-        match_groups[row.match_id].append(row)
     selected_by_match = defaultdict(list)
-    for row, _classified_role, _source in selected:
-        selected_by_match[row.match_id].append(row)
+    for result in classified:
+        match_groups[result.match_id].append(result)
+        if result.role == role:
+            selected_by_match[result.match_id].append(result)
     match_ids = list(match_groups)
     teams_by_match = defaultdict(list)
     for row in _match_team_rows(session, match_ids):
@@ -493,14 +457,15 @@ def get_player_overview(
 
     recent_matches = []
     match_scores = []
+    season_ids = set()
+    team_ids = set()
     for match_id, match_rows in match_groups.items():
         first = match_rows[0]
         role_rows = selected_by_match[match_id]
-        valid_scores = [row.score for row in role_rows if valid_race_score(row.score)]
-        player_score = sum(valid_scores) if valid_scores else None
-        excluded_score_rows = sum(
-            1 for row in role_rows if row.score is not None and not valid_race_score(row.score)
+        match_totals = role_totals_from_columns(
+            [row.score for row in role_rows], [row.position for row in role_rows]
         )
+        player_score = match_totals["total_points"] if match_totals["scored_races"] else None
         own_team = next(
             (
                 team
@@ -517,18 +482,22 @@ def get_player_overview(
         own_final = _final_score(own_team) if own_team else None
         opponent_final = max((_final_score(team) for team in opponents), default=None)
         match_result = _result(own_final, opponent_final)
+        # Every team row carries its match's details; the player's own row also has the team.
+        details = teams_by_match[match_id][0]
+        season_ids.add(details.season_id)
+        team_ids.add(own_team.team_id)
         recent_matches.append(
             {
                 "match_id": match_id,
-                "label": first.match_label,
-                "season": first.season_code,
-                "season_number": first.season_number,
-                "division": first.division_code,
-                "week": first.week_number,
+                "label": details.match_label,
+                "season": details.season_code,
+                "season_number": details.season_number,
+                "division": details.division_code,
+                "week": details.week_number,
                 "team": {
-                    "team_id": first.team_id,
-                    "name": first.team_name,
-                    "tag": first.clan_tag,
+                    "team_id": own_team.team_id,
+                    "name": own_team.canonical_name,
+                    "tag": own_team.clan_tag,
                     "score": own_final,
                 },
                 "opponents": [
@@ -545,8 +514,8 @@ def get_player_overview(
                 "result": match_result,
                 "player_score": player_score,
                 "role_races": len({row.race_id for row in role_rows}),
-                "scored_role_races": len(valid_scores),
-                "excluded_score_rows": excluded_score_rows,
+                "scored_role_races": match_totals["scored_races"],
+                "excluded_score_rows": match_totals["excluded_score_rows"],
             }
         )
         if player_score is not None:
@@ -576,8 +545,8 @@ def get_player_overview(
     metrics.update(
         {
             "matches": len(match_groups),
-            "seasons": len({row.season_id for row in rows}),
-            "teams": len({row.team_id for row in rows}),
+            "seasons": len(season_ids),
+            "teams": len(team_ids),
             "best_match_score": max(match_scores, default=None),
             "best_gp_score": max(gp_scores, default=None),
         }
@@ -613,43 +582,10 @@ def get_player_overview(
     }
 
 
-def get_player_performance(
-    player_id,
-    league="ctc",
-    season=None,
-    division=None,
-    team_id=None,
-    role="runner",
-    match_set="regular",
-    session=None,
+def _player_performance_payload(
+    player_id, scope, team_id, role, match_set, coverage, classified, metrics
 ):
-    role = normalize_role(role)
-    match_set = normalize_match_set(match_set)
-    if session is None:
-        with SessionLocal() as owned_session:
-            return get_player_performance(
-                player_id,
-                league=league,
-                season=season,
-                division=division,
-                team_id=team_id,
-                role=role,
-                match_set=match_set,
-                session=owned_session,
-            )
-    if not session.get(Player, player_id):
-        raise DashboardNotFound("Player not found.")
-    scope = _resolve_scope(session, league=league, season=season, division=division)
-    if team_id is not None and not session.get(Team, team_id):
-        raise DashboardError("Unknown team filter.")
-    rows = _player_race_rows(session, player_id, scope, team_id=team_id, match_set=match_set)
-    confirmed = confirmed_5v5_race_ids(session, rows)
-    coverage, classified = role_coverage(rows, confirmed)
-    selected_rows = [row for row, classified_role, _source in classified if classified_role == role]
-    metrics = summarize_role_rows(classified, role)
-    if role == "bagger":
-        metrics.update(bagger_counterpart_summary(session, player_id, classified))
-
+    selected_rows = [result for result in classified if result.role == role]
     score_distribution = defaultdict(int)
     placement_distribution = defaultdict(int)
     by_race_number = defaultdict(list)
@@ -694,52 +630,43 @@ def get_player_performance(
     }
 
 
-def get_player_tracks(
-    player_id,
-    league="ctc",
-    season=None,
-    division=None,
-    team_id=None,
-    min_races=12,
-    role="runner",
-    match_set="regular",
-    session=None,
+def _classified_track_totals(classified):
+    grouped = defaultdict(lambda: ([], []))
+    for result in classified:
+        scores, positions = grouped[(result.track_id, result.role, result.source)]
+        scores.append(result.score)
+        positions.append(result.position)
+    return {
+        key: role_totals_from_columns(scores, positions)
+        for key, (scores, positions) in grouped.items()
+    }
+
+
+def _track_names(session, track_ids):
+    if not track_ids:
+        return {}
+    return dict(
+        session.execute(
+            select(Track.track_id, Track.canonical_name).where(Track.track_id.in_(track_ids))
+        ).all()
+    )
+
+
+def _player_tracks_payload(
+    player_id, scope, team_id, min_races, role, match_set, track_totals, names
 ):
-    role = normalize_role(role)
-    match_set = normalize_match_set(match_set)
-    if session is None:
-        with SessionLocal() as owned_session:
-            return get_player_tracks(
-                player_id,
-                league=league,
-                season=season,
-                division=division,
-                team_id=team_id,
-                min_races=min_races,
-                role=role,
-                match_set=match_set,
-                session=owned_session,
-            )
-    if not session.get(Player, player_id):
-        raise DashboardNotFound("Player not found.")
-    scope = _resolve_scope(session, league=league, season=season, division=division)
-    if team_id is not None and not session.get(Team, team_id):
-        raise DashboardError("Unknown team filter.")
-    rows = _player_race_rows(session, player_id, scope, team_id=team_id, match_set=match_set)
-    confirmed = confirmed_5v5_race_ids(session, rows)
-    coverage, classified = role_coverage(rows, confirmed)
-    tracks = defaultdict(list)
-    names = {}
-    for item in classified:
-        row, classified_role, _source = item
+    coverage_counts = defaultdict(int)
+    tracks = {}
+    for (track_id, classified_role, source), totals in track_totals.items():
+        coverage_counts[role_coverage_key(classified_role, source)] += totals["races"]
         if classified_role != role:
             continue
-        tracks[row.track_id].append(item)
-        names[row.track_id] = row.track_name
-
+        track_role_totals = tracks.setdefault(track_id, dict.fromkeys(ROLE_TOTAL_FIELDS, 0))
+        for field in ROLE_TOTAL_FIELDS:
+            track_role_totals[field] += totals[field]
     results = []
-    for track_id, track_rows in tracks.items():
-        track_metrics = summarize_role_rows(track_rows, role)
+    for track_id, totals in tracks.items():
+        track_metrics = summarize_role_totals(totals, role)
         if track_metrics["scored_races"] < min_races:
             continue
         track_metrics.pop("role")
@@ -764,11 +691,218 @@ def get_player_tracks(
         "role": role,
         "scope": {**_scope_payload(scope), "team_id": team_id, "match_set": match_set},
         "minimum_races": min_races,
-        "role_coverage": coverage,
+        "role_coverage": role_coverage_payload(coverage_counts),
         "tracks": results,
     }
 
 
+def get_player_overview(
+    player_id,
+    league="ctc",
+    season=None,
+    division=None,
+    team_id=None,
+    min_races=12,
+    role="runner",
+    match_set="regular",
+    session=None,
+):
+    role = normalize_role(role)
+    match_set = normalize_match_set(match_set)
+    if session is None:
+        with SessionLocal() as owned_session:
+            return get_player_overview(
+                player_id,
+                league=league,
+                season=season,
+                division=division,
+                team_id=team_id,
+                min_races=min_races,
+                role=role,
+                match_set=match_set,
+                session=owned_session,
+            )
+
+    player, scope = _resolve_player_request(session, player_id, league, season, division, team_id)
+    coverage, classified = _classified_player_rows(
+        session, player_id, scope, team_id=team_id, match_set=match_set
+    )
+    metrics = _player_role_metrics(session, player_id, classified, role)
+    return _player_overview_payload(
+        session,
+        player,
+        scope,
+        team_id,
+        min_races,
+        role,
+        match_set,
+        coverage,
+        classified,
+        metrics,
+    )
+
+
+def get_player_performance(
+    player_id,
+    league="ctc",
+    season=None,
+    division=None,
+    team_id=None,
+    role="runner",
+    match_set="regular",
+    session=None,
+):
+    role = normalize_role(role)
+    match_set = normalize_match_set(match_set)
+    if session is None:
+        with SessionLocal() as owned_session:
+            return get_player_performance(
+                player_id,
+                league=league,
+                season=season,
+                division=division,
+                team_id=team_id,
+                role=role,
+                match_set=match_set,
+                session=owned_session,
+            )
+    _player, scope = _resolve_player_request(session, player_id, league, season, division, team_id)
+    coverage, classified = _classified_player_rows(
+        session, player_id, scope, team_id=team_id, match_set=match_set
+    )
+    metrics = _player_role_metrics(session, player_id, classified, role)
+    return _player_performance_payload(
+        player_id, scope, team_id, role, match_set, coverage, classified, metrics
+    )
+
+
+def _player_track_totals(session, player_id, scope, team_id=None, match_set="regular"):
+    totals = player_track_totals(session, player_id, scope, team_id=team_id, match_set=match_set)
+    if totals is not None:
+        return totals
+    # Players imported before rollups existed are summed from their live result rows.
+    _coverage, classified = _classified_player_rows(
+        session, player_id, scope, team_id=team_id, match_set=match_set
+    )
+    return _classified_track_totals(classified)
+
+
+def get_player_tracks(
+    player_id,
+    league="ctc",
+    season=None,
+    division=None,
+    team_id=None,
+    min_races=12,
+    role="runner",
+    match_set="regular",
+    session=None,
+):
+    role = normalize_role(role)
+    match_set = normalize_match_set(match_set)
+    if session is None:
+        with SessionLocal() as owned_session:
+            return get_player_tracks(
+                player_id,
+                league=league,
+                season=season,
+                division=division,
+                team_id=team_id,
+                min_races=min_races,
+                role=role,
+                match_set=match_set,
+                session=owned_session,
+            )
+    _player, scope = _resolve_player_request(session, player_id, league, season, division, team_id)
+    track_totals = _player_track_totals(
+        session, player_id, scope, team_id=team_id, match_set=match_set
+    )
+    names = _track_names(
+        session,
+        {
+            track_id
+            for track_id, classified_role, _source in track_totals
+            if classified_role == role
+        },
+    )
+    return _player_tracks_payload(
+        player_id, scope, team_id, min_races, role, match_set, track_totals, names
+    )
+
+
+def get_player_dashboard(
+    player_id,
+    league="ctc",
+    season=None,
+    division=None,
+    team_id=None,
+    min_races=12,
+    role="runner",
+    match_set="regular",
+    session=None,
+):
+    """Return the overview, performance and tracks payloads from one classified row set."""
+    role = normalize_role(role)
+    match_set = normalize_match_set(match_set)
+    if session is None:
+        with SessionLocal() as owned_session:
+            return get_player_dashboard(
+                player_id,
+                league=league,
+                season=season,
+                division=division,
+                team_id=team_id,
+                min_races=min_races,
+                role=role,
+                match_set=match_set,
+                session=owned_session,
+            )
+
+    player, scope = _resolve_player_request(session, player_id, league, season, division, team_id)
+    coverage, classified = _classified_player_rows(
+        session, player_id, scope, team_id=team_id, match_set=match_set
+    )
+    metrics = _player_role_metrics(session, player_id, classified, role)
+    # The live rows already exclude analytics-excluded races, so tracks are summed here
+    # instead of reading the rollup table a second time.
+    track_totals = _classified_track_totals(classified)
+    track_names = _track_names(
+        session,
+        {
+            track_id
+            for track_id, classified_role, _source in track_totals
+            if classified_role == role
+        },
+    )
+    return {
+        "overview": _player_overview_payload(
+            session,
+            player,
+            scope,
+            team_id,
+            min_races,
+            role,
+            match_set,
+            coverage,
+            classified,
+            dict(metrics),
+        ),
+        "performance": _player_performance_payload(
+            player_id, scope, team_id, role, match_set, coverage, classified, dict(metrics)
+        ),
+        "tracks": _player_tracks_payload(
+            player_id,
+            scope,
+            team_id,
+            min_races,
+            role,
+            match_set,
+            track_totals,
+            track_names,
+        ),
+    }
+
+
 def get_track_player_rankings(
     track_id,
     season,
@@ -800,49 +934,28 @@ def get_track_player_rankings(
     if not session.get(Track, track_id):
         raise DashboardNotFound("Track not found.")
 
-    statement = (
-        select(
-            RacePlayerResult.player_id,
-            RacePlayerResult.race_id,
-            RacePlayerResult.match_team_id,
-            RacePlayerResult.score,
-            RacePlayerResult.position,
-            RacePlayerResult.role,
-            RacePlayerResult.role_source,
-            Player.canonical_name,
-        )
-        .join(Race, Race.race_id == RacePlayerResult.race_id)
-        .join(Match, Match.match_id == Race.match_id)
-        .join(Player, Player.player_id == RacePlayerResult.player_id)
-        .where(
-            Race.track_id == track_id,
-            Match.season_id == scope.season_id,
-            Match.division_id == scope.division_id,
-        )
-        .order_by(RacePlayerResult.player_id, Race.race_id)
-    )
-    statement = apply_match_set(statement, match_set)
-    statement = apply_analytics_race_filter(statement, session)
-    rows = list(session.execute(statement).all())
-    confirmed = confirmed_5v5_race_ids(session, rows)
-    _, classified = role_coverage(rows, confirmed)
-    by_player = defaultdict(list)
-    for item in classified:
-        by_player[item[0].player_id].append(item)
-
+    facts = race_facts(session)
+    rows = facts.scope_rows(scope.season_id, scope.division_id, match_set, track_id=track_id)
+    player_ids, groups = group_rows(facts, rows)
+    totals = role_totals_by_group(facts, rows, groups, len(player_ids), role)
+    coverage = role_coverage_by_group(facts, rows, groups, len(player_ids))
+    qualified = {int(player_ids[group]): group for group in qualified_groups(totals, min_races)}
     display_names = _display_names_for_players(
         session,
-        by_player,
-        {row.player_id: row.canonical_name for row in rows if row.canonical_name},
+        qualified,
+        dict(
+            session.execute(
+                select(Player.player_id, Player.canonical_name).where(
+                    Player.player_id.in_(qualified), Player.canonical_name.is_not(None)
+                )
+            ).all()
+        ),
     )
 
     players = []
     exact_sort_values = {}
-    for player_id, player_rows in by_player.items():
-        metrics = summarize_role_rows(player_rows, role)
-        if metrics["scored_races"] < min_races:
-            continue
-        coverage, _ = role_coverage([item[0] for item in player_rows], confirmed)
+    for player_id, group in qualified.items():
+        metrics = summarize_role_totals(group_totals(totals, group), role)
         name = display_names.get(player_id) or f"Player {player_id}"
         exact_sort_values[player_id] = (
             metrics["total_points"] / metrics["scored_races"] * (12 if role == "runner" else 1)
@@ -853,7 +966,7 @@ def get_track_player_rankings(
                 "name": name,
                 "role": role,
                 "metrics": metrics,
-                "role_coverage": coverage,
+                "role_coverage": coverage[group],
             }
         )
 
@@ -872,3 +985,82 @@ def get_track_player_rankings(
         "minimum_races": min_races,
         "players": players,
     }
+
+
+def get_player_leaderboard(
+    season,
+    division,
+    league="ctc",
+    team_id=None,
+    min_races=12,
+    role="runner",
+    match_set="regular",
+    page=1,
+    per_page=50,
+    session=None,
+):
+    role = normalize_role(role)
+    match_set = normalize_match_set(match_set)
+    if session is None:
+        with SessionLocal() as owned_session:
+            return get_player_leaderboard(
+                season,
+                division,
+                league=league,
+                team_id=team_id,
+                min_races=min_races,
+                role=role,
+                match_set=match_set,
+                page=page,
+                per_page=per_page,
+                session=owned_session,
+            )
+
+    scope = _resolve_scope(session, league=league, season=season, division=division)
+    if scope.season_id is None or scope.division_id is None:
+        raise DashboardError("Leaderboards require season and division.")
+    if team_id is not None and not session.get(Team, team_id):
+        raise DashboardError("Unknown team filter.")
+    leaderboard = scope_leaderboard(
+        session,
+        scope.season_id,
+        scope.division_id,
+        role=role,
+        min_races=min_races,
+        team_id=team_id,
+        match_set=match_set,
+    )
+    offset = (page - 1) * per_page
+    entries = leaderboard.entries[offset : offset + per_page]
+    canonical_names = dict(
+        session.execute(
+            select(Player.player_id, Player.canonical_name).where(
+                Player.player_id.in_([entry.player_id for entry in entries])
+            )
+        ).all()
+    )
+    display_names = _display_names_for_players(
+        session,
+        [entry.player_id for entry in entries],
+        {player_id: name for player_id, name in canonical_names.items() if name},
+    )
+    return {
+        "role": role,
+        "scope": {**_scope_payload(scope), "team_id": team_id, "match_set": match_set},
+        "minimum_races": min_races,
+        "metric": leaderboard.metric,
+        "population": leaderboard.population,
+        "page": page,
+        "per_page": per_page,
+        "pages": -(-leaderboard.population // per_page),
+        "players": [
+            {
+                "rank": entry.rank,
+                "player_id": entry.player_id,
+                "name": display_names.get(entry.player_id) or f"Player {entry.player_id}",
+                "value": _round(entry.value),
+                "metrics": entry.metrics,
+            }
+            for entry in entries
+        ],
+    }
@@ -1,5 +1,9 @@
-from models import PlayerAlias
+from models import Player, PlayerAlias, PlayerDisplayName, utc_now
 from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+REBUILD_BATCH_SIZE = 500
+DISPLAY_NAME_FIELDS = ("lounge_name", "table_name", "mii_name")
 
 
 def _ranked_alias_values(session, player_ids, alias_type, rank_by):
@@ -36,22 +40,89 @@ def _ranked_alias_values(session, player_ids, alias_type, rank_by):
     return {player_id: value for player_id, (_, value) in ranked.items()}
 
 
+def _live_alias_names(session, player_ids):
+    """Rank aliases from player_aliases: (recent lounge, common table, common Mii) per player."""
+    recent_lounge_names = _ranked_alias_values(session, player_ids, "lounge_name", "recent")
+    common_table_names = _ranked_alias_values(session, player_ids, "table_name", "common")
+    common_mii_names = _ranked_alias_values(session, player_ids, "mii_name", "common")
+    return {
+        player_id: (
+            recent_lounge_names.get(player_id),
+            common_table_names.get(player_id),
+            common_mii_names.get(player_id),
+        )
+        for player_id in player_ids
+    }
+
+
+def _stored_alias_names(session, player_ids):
+    return {
+        row.player_id: (row.lounge_name, row.table_name, row.mii_name)
+        for row in session.execute(
+            select(
+                PlayerDisplayName.player_id,
+                PlayerDisplayName.lounge_name,
+                PlayerDisplayName.table_name,
+                PlayerDisplayName.mii_name,
+            ).where(PlayerDisplayName.player_id.in_(player_ids))
+        )
+    }
+
+
+def refresh_player_display_names(session, player_ids):
+    """Recompute stored display names from aliases and return the players whose names changed."""
+    player_ids = sorted(set(player_ids))
+    if not player_ids:
+        return set()
+    session.flush()
+    previous = _stored_alias_names(session, player_ids)
+    names = _live_alias_names(session, player_ids)
+    refreshed_at = utc_now()
+    statement = insert(PlayerDisplayName).values(
+        [
+            {
+                "player_id": player_id,
+                **dict(zip(DISPLAY_NAME_FIELDS, names[player_id], strict=True)),
+                "refreshed_at": refreshed_at,
+            }
+            for player_id in player_ids
+        ]
+    )
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[PlayerDisplayName.player_id],
+            set_={
+                name: statement.excluded[name] for name in (*DISPLAY_NAME_FIELDS, "refreshed_at")
+            },
+        )
+    )
+    return {player_id for player_id in player_ids if previous.get(player_id) != names[player_id]}
+
+
+def rebuild_player_display_names(session):
+    """Refresh stored display names for every player."""
+    session.flush()
+    player_ids = sorted(session.scalars(select(Player.player_id)).all())
+    for offset in range(0, len(player_ids), REBUILD_BATCH_SIZE):
+        refresh_player_display_names(session, player_ids[offset : offset + REBUILD_BATCH_SIZE])
+    return len(player_ids)
+
+
 def _display_names_for_players(session, player_ids, canonical_names=None):
     player_ids = list(dict.fromkeys(player_ids))
     if not player_ids:
         return {}
     canonical_names = canonical_names or {}
-    recent_lounge_names = _ranked_alias_values(session, player_ids, "lounge_name", "recent")
-    common_table_names = _ranked_alias_values(session, player_ids, "table_name", "common")
-    common_mii_names = _ranked_alias_values(session, player_ids, "mii_name", "common")
+    alias_names = _stored_alias_names(session, player_ids)
+    # Players created outside the importers have no stored row until their aliases change.
+    missing = [player_id for player_id in player_ids if player_id not in alias_names]
+    if missing:
+        alias_names.update(_live_alias_names(session, missing))
 
     return {
         player_id: (
             canonical_names.get(player_id)
-            or recent_lounge_names.get(player_id)
-            or common_table_names.get(player_id)
-            or common_mii_names.get(player_id)
-            or ""
+            or next((name for name in alias_names[player_id] if name), "")
         )
         for player_id in player_ids
     }
@@ -1,10 +1,12 @@
 import math
 from collections import defaultdict
 from decimal import Decimal
+from itertools import repeat
 from numbers import Real
 
-from models import RacePlayerResult
-from sqlalchemy import select
+from models import RaceClassification, RacePlayerResult
+from sqlalchemy import Integer, and_, any_, case, delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
 
 VALID_ROLES = frozenset({"runner", "bagger"})
 
@@ -57,17 +59,147 @@ def classify_role(row, confirmed_ids):
     return "unknown", "unknown"
 
 
+def sql_valid_race_score(score):
+    return score.between(0, 15)
+
+
+def sql_valid_placement(position):
+    return position.between(1, 10)
+
+
+def sql_classified_role(confirmed):
+    """Return SQL (role, source) expressions classifying RacePlayerResult rows as
+    classify_role does; confirmed is a boolean for the row's race being a confirmed 5v5.
+    """
+    role = RacePlayerResult.role
+    source = RacePlayerResult.role_source
+    explicit = role.in_(sorted(VALID_ROLES))
+    inferred = and_(confirmed, sql_valid_placement(RacePlayerResult.position))
+    classified_role = case(
+        (explicit, role),
+        (and_(inferred, RacePlayerResult.position <= 8), "runner"),
+        (inferred, "bagger"),
+        else_="unknown",
+    )
+    classified_source = case(
+        (explicit, case((source == "inferred", "inferred"), else_="explicit")),
+        (inferred, "inferred"),
+        else_="unknown",
+    )
+    return classified_role, classified_source
+
+
+def sql_confirmed_5v5(session, race_ids):
+    """Return a SQL boolean matching confirmed_5v5_race_ids for a RacePlayerResult row.
+
+    The statement must outer-join RaceClassification on the row's race. Races in
+    race_ids without a stored classification are derived here, once, and bound as one
+    array parameter.
+    """
+    unclassified_ids = session.scalars(
+        select(RacePlayerResult.race_id)
+        .distinct()
+        .outerjoin(RaceClassification, RaceClassification.race_id == RacePlayerResult.race_id)
+        .where(RacePlayerResult.race_id.in_(race_ids), RaceClassification.race_id.is_(None))
+    ).all()
+    derived = (
+        _confirmed_5v5_ids_from_results(_race_result_rows(session, unclassified_ids))
+        if unclassified_ids
+        else set()
+    )
+    return func.coalesce(
+        RaceClassification.is_confirmed_5v5,
+        RacePlayerResult.race_id == any_(literal(sorted(derived), ARRAY(Integer))),
+    )
+
+
+def sql_role_totals(score, position, selected=None):
+    """Return labelled aggregates for ROLE_TOTAL_FIELDS, as role_totals sums them.
+
+    selected optionally restricts every aggregate to rows matching a boolean expression.
+    """
+    valid_score = sql_valid_race_score(score)
+    valid_position = sql_valid_placement(position)
+    selected = literal(True) if selected is None else selected
+
+    def count(*conditions):
+        return func.count().filter(and_(selected, *conditions))
+
+    def total(value, *conditions):
+        return func.coalesce(func.sum(value).filter(and_(selected, *conditions)), 0)
+
+    columns = {
+        "races": count(),
+        "scored_races": count(valid_score),
+        "total_points": total(score, valid_score),
+        "excluded_score_rows": count(score.is_not(None), ~valid_score),
+        "placement_sum": total(position, valid_position),
+        "placement_count": count(valid_position),
+        "wins": count(valid_position, position == 1),
+        "podiums": count(valid_position, position <= 3),
+        "bag_points": count(valid_score, score > 0),
+        "zero_points": count(valid_score, score == 0),
+    }
+    return [columns[field].label(field) for field in ROLE_TOTAL_FIELDS]
+
+
+def _race_result_rows(session, race_ids):
+    return session.execute(
+        select(
+            RacePlayerResult.race_id,
+            RacePlayerResult.player_id,
+            RacePlayerResult.match_team_id,
+            RacePlayerResult.score,
+            RacePlayerResult.position,
+            RacePlayerResult.role,
+            RacePlayerResult.role_source,
+        ).where(RacePlayerResult.race_id.in_(race_ids))
+    ).all()
+
+
+def refresh_race_classifications(session, race_ids):
+    """Recompute and persist the confirmed-5v5 flag for races whose results changed."""
+    race_ids = set(race_ids)
+    if not race_ids:
+        return set()
+    session.flush()
+    results = _race_result_rows(session, race_ids)
+    confirmed = _confirmed_5v5_ids_from_results(results)
+    result_counts = defaultdict(int)
+    for row in results:
+        result_counts[row.race_id] += 1
+
+    session.execute(delete(RaceClassification).where(RaceClassification.race_id.in_(race_ids)))
+    session.execute(
+        insert(RaceClassification),
+        [
+            {
+                "race_id": race_id,
+                "is_confirmed_5v5": race_id in confirmed,
+                "result_count": result_counts[race_id],
+            }
+            for race_id in sorted(race_ids)
+        ],
+    )
+    return confirmed
+
+
 def confirmed_5v5_race_ids(session, rows):
     candidate_ids = {row.race_id for row in rows}
     if not candidate_ids:
         return set()
 
-    all_results = list(
-        session.execute(
-            select(RacePlayerResult).where(RacePlayerResult.race_id.in_(candidate_ids))
-        ).scalars()
-    )
-    return _confirmed_5v5_ids_from_results(all_results)
+    stored = session.execute(
+        select(RaceClassification.race_id, RaceClassification.is_confirmed_5v5).where(
+            RaceClassification.race_id.in_(candidate_ids)
+        )
+    ).all()
+    confirmed = {race_id for race_id, is_confirmed in stored if is_confirmed}
+    # Races written before the classification table existed are derived on demand.
+    unclassified_ids = candidate_ids - {race_id for race_id, _ in stored}
+    if unclassified_ids:
+        confirmed |= _confirmed_5v5_ids_from_results(_race_result_rows(session, unclassified_ids))
+    return confirmed
 
 
 def _confirmed_5v5_ids_from_results(all_results):
@@ -94,66 +226,225 @@ def _confirmed_5v5_ids_from_results(all_results):
     return confirmed
 
 
-def role_coverage(rows, confirmed_ids):
-    coverage = {
-        "explicit_runner": 0,
-        "inferred_runner": 0,
-        "explicit_bagger": 0,
-        "inferred_bagger": 0,
-        "unknown": 0,
-        "total": len(rows),
-    }
-    classified = []
-    for row in rows:
-        role, source = classify_role(row, confirmed_ids)
-        key = "unknown" if role == "unknown" else f"{source}_{role}"
-        coverage[key] += 1
-        classified.append((row, role, source))
+ROLE_COVERAGE_KEYS = (
+    "explicit_runner",
+    "inferred_runner",
+    "explicit_bagger",
+    "inferred_bagger",
+    "unknown",
+)
 
+
+def role_coverage_key(role, source):
+    return "unknown" if role == "unknown" else f"{source}_{role}"
+
+
+def role_coverage_payload(counts):
+    coverage = {key: counts.get(key, 0) for key in ROLE_COVERAGE_KEYS}
+    coverage["total"] = sum(coverage.values())
     known = coverage["total"] - coverage["unknown"]
     coverage["known_rate"] = (
         round(known / coverage["total"] * 100, 2) if coverage["total"] else None
     )
-    return coverage, classified
+    return coverage
 
 
-def summarize_role_rows(classified_rows, role):
+def _classify_values(race_id, position, role, role_source, confirmed_ids):
+    if role in VALID_ROLES:
+        return role, "inferred" if role_source == "inferred" else "explicit"
+    if race_id in confirmed_ids and valid_placement(position):
+        return "runner" if position <= 8 else "bagger", "inferred"
+    return "unknown", "unknown"
+
+
+def classify_role_columns(rows, confirmed_ids):
+    """Classify rows in one pass; return the coverage and parallel role and source lists."""
+    counts = dict.fromkeys(ROLE_COVERAGE_KEYS, 0)
+    roles = []
+    sources = []
+    for row in rows:
+        role, source = _classify_values(
+            row.race_id, row.position, row.role, row.role_source, confirmed_ids
+        )
+        counts["unknown" if role == "unknown" else f"{source}_{role}"] += 1
+        roles.append(role)
+        sources.append(source)
+    return role_coverage_payload(counts), roles, sources
+
+
+class ClassifiedResult:
+    """A race result reduced to the columns analytics read, with its classified role."""
+
+    __slots__ = (
+        "race_id",
+        "player_id",
+        "match_team_id",
+        "score",
+        "position",
+        "role",
+        "source",
+        "match_id",
+        "race_number",
+        "track_id",
+    )
+
+    def __init__(
+        self,
+        race_id,
+        player_id,
+        match_team_id,
+        score,
+        position,
+        role,
+        source,
+        match_id=None,
+        race_number=None,
+        track_id=None,
+    ):
+        self.race_id = race_id
+        self.player_id = player_id
+        self.match_team_id = match_team_id
+        self.score = score
+        self.position = position
+        self.role = role
+        self.source = source
+        self.match_id = match_id
+        self.race_number = race_number
+        self.track_id = track_id
+
+    def __repr__(self):
+        return (
+            f"ClassifiedResult(race_id={self.race_id!r}, player_id={self.player_id!r}, "
+            f"role={self.role!r}, source={self.source!r})"
+        )
+
+
+def classify_results(rows, confirmed_ids):
+    """Classify column tuples into ClassifiedResults; return the coverage and the results.
+
+    Each row is (race_id, player_id, match_team_id, score, position, role, role_source),
+    optionally followed by match_id, race_number, and track_id.
+    """
+    counts = dict.fromkeys(ROLE_COVERAGE_KEYS, 0)
+    results = []
+    for race_id, player_id, match_team_id, score, position, role, role_source, *context in rows:
+        role, source = _classify_values(race_id, position, role, role_source, confirmed_ids)
+        counts["unknown" if role == "unknown" else f"{source}_{role}"] += 1
+        results.append(
+            ClassifiedResult(
+                race_id, player_id, match_team_id, score, position, role, source, *context
+            )
+        )
+    return role_coverage_payload(counts), results
+
+
+def role_coverage(rows, confirmed_ids):
+    rows = rows if isinstance(rows, (list, tuple)) else list(rows)
+    coverage, roles, sources = classify_role_columns(rows, confirmed_ids)
+    return coverage, list(zip(rows, roles, sources, strict=True))
+
+
+ROLE_TOTAL_FIELDS = (
+    "races",
+    "scored_races",
+    "total_points",
+    "excluded_score_rows",
+    "placement_sum",
+    "placement_count",
+    "wins",
+    "podiums",
+    "bag_points",
+    "zero_points",
+)
+
+
+def role_totals_from_columns(scores, positions, roles=None, role=None):
+    """Reduce parallel score and position columns to role_totals' counters in one pass.
+
+    With roles, only entries whose role equals role are counted.
+    """
+    races = scored_races = total_points = excluded_score_rows = 0
+    placement_sum = placement_count = wins = podiums = bag_points = zero_points = 0
+    for score, position, entry_role in zip(
+        scores, positions, repeat(role) if roles is None else roles
+    ):
+        if entry_role != role:
+            continue
+        races += 1
+        # Plain ints, what the database returns, skip the general numeric checks.
+        if type(score) is int and 0 <= score <= 15 or valid_race_score(score):
+            scored_races += 1
+            total_points += score
+            if score > 0:
+                bag_points += 1
+            elif score == 0:
+                zero_points += 1
+        elif score is not None:
+            excluded_score_rows += 1
+        if type(position) is int and 1 <= position <= 10 or valid_placement(position):
+            placement = int(position)
+            placement_sum += placement
+            placement_count += 1
+            if placement == 1:
+                wins += 1
+            if placement <= 3:
+                podiums += 1
+    return {
+        "races": races,
+        "scored_races": scored_races,
+        "total_points": total_points,
+        "excluded_score_rows": excluded_score_rows,
+        "placement_sum": placement_sum,
+        "placement_count": placement_count,
+        "wins": wins,
+        "podiums": podiums,
+        "bag_points": bag_points,
+        "zero_points": zero_points,
+    }
+
+
+def role_totals(rows):
+    """Reduce result rows to the additive counters every role summary is derived from."""
+    rows = rows if isinstance(rows, (list, tuple)) else list(rows)
+    return role_totals_from_columns([row.score for row in rows], [row.position for row in rows])
+
+
+def summarize_role_totals(totals, role):
     role = normalize_role(role)
-    selected_rows = [row for row, classified_role, _ in classified_rows if classified_role == role]
-    scores = [row.score for row in selected_rows if valid_race_score(row.score)]
-    placements = [int(row.position) for row in selected_rows if valid_placement(row.position)]
-    total_points = sum(scores)
-    scored_races = len(scores)
+    total_points = totals["total_points"]
+    scored_races = totals["scored_races"]
+    placement_count = totals["placement_count"]
     points_per_race = round(total_points / scored_races, 2) if scored_races else None
 
     summary = {
         "role": role,
-        "races": len(selected_rows),
+        "races": totals["races"],
         "scored_races": scored_races,
         "total_points": total_points,
         "points_per_race": points_per_race,
-        "average_placement": (round(sum(placements) / len(placements), 2) if placements else None),
-        "excluded_score_rows": sum(
-            1 for row in selected_rows if row.score is not None and not valid_race_score(row.score)
+        "average_placement": (
+            round(totals["placement_sum"] / placement_count, 2) if placement_count else None
         ),
+        "excluded_score_rows": totals["excluded_score_rows"],
     }
 
     if role == "runner":
-        wins = sum(1 for placement in placements if placement == 1)
-        podiums = sum(1 for placement in placements if 1 <= placement <= 3)
+        podiums = totals["podiums"]
         summary.update(
             {
                 "twelve_race_pace": (
                     round(total_points / scored_races * 12, 2) if scored_races else None
                 ),
-                "wins": wins,
+                "wins": totals["wins"],
                 "podiums": podiums,
-                "podium_rate": (round(podiums / len(placements) * 100, 2) if placements else None),
+                "podium_rate": (
+                    round(podiums / placement_count * 100, 2) if placement_count else None
+                ),
             }
         )
     else:
-        bag_points = sum(1 for score in scores if score > 0)
-        zero_points = sum(1 for score in scores if score == 0)
+        bag_points = totals["bag_points"]
+        zero_points = totals["zero_points"]
         summary.update(
             {
                 "bag_points": bag_points,
@@ -169,8 +460,36 @@ def summarize_role_rows(classified_rows, role):
     return summary
 
 
+def summarize_role_columns(scores, positions, roles, role):
+    """Return summarize_role_rows' metrics from parallel score, position, and role columns."""
+    role = normalize_role(role)
+    return summarize_role_totals(role_totals_from_columns(scores, positions, roles, role), role)
+
+
+def _results_and_roles(classified_rows):
+    """Return (result, role) pairs from ClassifiedResults or role_coverage's tuples."""
+    return [
+        (item, item.role) if isinstance(item, ClassifiedResult) else (item[0], item[1])
+        for item in classified_rows
+    ]
+
+
+def summarize_role_rows(classified_rows, role):
+    """Summarize the rows classified as role, given as ClassifiedResults or as the
+    (row, role, source) tuples role_coverage returns."""
+    results = _results_and_roles(classified_rows)
+    return summarize_role_columns(
+        [row.score for row, _role in results],
+        [row.position for row, _role in results],
+        [classified_role for _row, classified_role in results],
+        role,
+    )
+
+
 def bagger_counterpart_summary(session, selected_player_id, classified_rows):
-    candidate_ids = {row.race_id for row, role, _ in classified_rows if role == "bagger"}
+    candidate_ids = {
+        row.race_id for row, role in _results_and_roles(classified_rows) if role == "bagger"
+    }
     empty_summary = {
         "counterpart_races": 0,
         "opponent_points_for": 0,
@@ -180,27 +499,23 @@ def bagger_counterpart_summary(session, selected_player_id, classified_rows):
     if not candidate_ids:
         return empty_summary
 
-    all_rows = list(
-        session.execute(
-            select(RacePlayerResult).where(RacePlayerResult.race_id.in_(candidate_ids))
-        ).scalars()
-    )
-    confirmed_ids = _confirmed_5v5_ids_from_results(all_rows)
-    _, all_classified = role_coverage(all_rows, confirmed_ids)
+    all_rows = _race_result_rows(session, candidate_ids)
+    confirmed_ids = confirmed_5v5_race_ids(session, all_rows)
+    _, all_classified = classify_results(all_rows, confirmed_ids)
     by_race = defaultdict(list)
     for classified in all_classified:
-        by_race[classified[0].race_id].append(classified)
+        by_race[classified.race_id].append(classified)
 
     counterpart_races = 0
     points_for = 0
     points_against = 0
     for race_id in candidate_ids:
         race_rows = by_race[race_id]
-        if len({row.match_team_id for row, _, _ in race_rows}) != 2:
+        if len({row.match_team_id for row in race_rows}) != 2:
             continue
         baggers_by_team = defaultdict(list)
-        for row, role, _ in race_rows:
-            if role == "bagger":
+        for row in race_rows:
+            if row.role == "bagger":
                 baggers_by_team[row.match_team_id].append(row)
         if len(baggers_by_team) != 2 or any(
             len(team_baggers) != 1 for team_baggers in baggers_by_team.values()
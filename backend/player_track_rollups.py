@@ -0,0 +1,197 @@
+"""Pre-summed player × track × scope × role totals kept alongside race results."""
+
+from collections import defaultdict
+
+from analytics_eligibility import analytics_excluded_race_ids
+from match_sets import match_types_for
+from models import (
+    Match,
+    MatchTeam,
+    PlayerTrackRollup,
+    Race,
+    RacePlayerResult,
+    Season,
+    TeamSeasonEntry,
+)
+from player_role_analytics import (
+    ROLE_TOTAL_FIELDS,
+    classify_role_columns,
+    confirmed_5v5_race_ids,
+    role_totals_from_columns,
+)
+from sqlalchemy import delete, insert, select
+
+REBUILD_BATCH_SIZE = 200
+ROLLUP_KEY_FIELDS = (
+    "player_id",
+    "track_id",
+    "season_id",
+    "division_id",
+    "team_id",
+    "match_type",
+    "role",
+    "role_source",
+)
+
+
+def _source_statement():
+    return (
+        select(
+            RacePlayerResult.player_id,
+            RacePlayerResult.race_id,
+            RacePlayerResult.match_team_id,
+            RacePlayerResult.score,
+            RacePlayerResult.position,
+            RacePlayerResult.role,
+            RacePlayerResult.role_source,
+            Race.track_id,
+            Match.season_id,
+            Match.division_id,
+            Match.match_type,
+            TeamSeasonEntry.team_id,
+        )
+        .join(Race, Race.race_id == RacePlayerResult.race_id)
+        .join(Match, Match.match_id == Race.match_id)
+        .join(MatchTeam, MatchTeam.match_team_id == RacePlayerResult.match_team_id)
+        .join(
+            TeamSeasonEntry,
+            TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
+        )
+    )
+
+
+def _grouped_totals(session, rows):
+    confirmed = confirmed_5v5_race_ids(session, rows)
+    _coverage, roles, sources = classify_role_columns(rows, confirmed)
+    grouped = defaultdict(lambda: ([], []))
+    for row, role, source in zip(rows, roles, sources, strict=True):
+        scores, positions = grouped[
+            (
+                row.player_id,
+                row.track_id,
+                row.season_id,
+                row.division_id,
+                row.team_id,
+                row.match_type,
+                role,
+                source,
+            )
+        ]
+        scores.append(row.score)
+        positions.append(row.position)
+    return {
+        key: role_totals_from_columns(scores, positions)
+        for key, (scores, positions) in grouped.items()
+    }
+
+
+def refresh_player_track_rollups(session, player_ids):
+    """Recompute every rollup row for the given players from their stored results."""
+    player_ids = set(player_ids)
+    if not player_ids:
+        return 0
+    session.flush()
+    session.execute(delete(PlayerTrackRollup).where(PlayerTrackRollup.player_id.in_(player_ids)))
+    rows = session.execute(
+        _source_statement().where(RacePlayerResult.player_id.in_(player_ids))
+    ).all()
+    totals = _grouped_totals(session, rows)
+    if totals:
+        session.execute(
+            insert(PlayerTrackRollup),
+            [
+                {**dict(zip(ROLLUP_KEY_FIELDS, key, strict=True)), **values}
+                for key, values in sorted(totals.items())
+            ],
+        )
+    return len(totals)
+
+
+def rebuild_player_track_rollups(session):
+    """Rebuild rollups for every player, e.g. after bulk role or track changes."""
+    session.flush()
+    session.execute(delete(PlayerTrackRollup))
+    player_ids = sorted(session.scalars(select(RacePlayerResult.player_id).distinct()).all())
+    written = 0
+    for offset in range(0, len(player_ids), REBUILD_BATCH_SIZE):
+        written += refresh_player_track_rollups(
+            session, player_ids[offset : offset + REBUILD_BATCH_SIZE]
+        )
+    return written
+
+
+def _apply_scope(statement, columns, scope, team_id, match_set):
+    season_column, division_column, team_column, match_type_column = columns
+    statement = statement.where(match_type_column.in_(match_types_for(match_set)))
+    if scope.season_id is not None:
+        statement = statement.where(season_column == scope.season_id)
+    if scope.division_id is not None:
+        statement = statement.where(division_column == scope.division_id)
+    if team_id is not None:
+        statement = statement.where(team_column == team_id)
+    return statement
+
+
+def player_track_totals(session, player_id, scope, team_id=None, match_set="regular"):
+    """Return {(track_id, role, role_source): totals} for a scope, or None without rollups.
+
+    Analytics-excluded races stay in the stored rollups and are subtracted here, so
+    editing the reviewed exclusion list never leaves the table stale.
+    """
+    has_rollups = session.scalar(
+        select(PlayerTrackRollup.player_id).where(PlayerTrackRollup.player_id == player_id).limit(1)
+    )
+    if has_rollups is None:
+        return None
+
+    statement = (
+        select(PlayerTrackRollup)
+        .join(Season, Season.season_id == PlayerTrackRollup.season_id)
+        .where(
+            PlayerTrackRollup.player_id == player_id,
+            Season.league_code == scope.league_code,
+        )
+    )
+    statement = _apply_scope(
+        statement,
+        (
+            PlayerTrackRollup.season_id,
+            PlayerTrackRollup.division_id,
+            PlayerTrackRollup.team_id,
+            PlayerTrackRollup.match_type,
+        ),
+        scope,
+        team_id,
+        match_set,
+    )
+    totals = defaultdict(lambda: dict.fromkeys(ROLE_TOTAL_FIELDS, 0))
+    for rollup in session.scalars(statement):
+        bucket = totals[(rollup.track_id, rollup.role, rollup.role_source)]
+        for field in ROLE_TOTAL_FIELDS:
+            bucket[field] += getattr(rollup, field)
+
+    excluded_ids = analytics_excluded_race_ids(session)
+    if excluded_ids:
+        excluded_statement = (
+            _source_statement()
+            .join(Season, Season.season_id == Match.season_id)
+            .where(
+                RacePlayerResult.player_id == player_id,
+                RacePlayerResult.race_id.in_(excluded_ids),
+                Season.league_code == scope.league_code,
+            )
+        )
+        excluded_statement = _apply_scope(
+            excluded_statement,
+            (Match.season_id, Match.division_id, TeamSeasonEntry.team_id, Match.match_type),
+            scope,
+            team_id,
+            match_set,
+        )
+        excluded_rows = session.execute(excluded_statement).all()
+        for key, values in _grouped_totals(session, excluded_rows).items():
+            bucket = totals[(key[1], key[6], key[7])]
+            for field in ROLE_TOTAL_FIELDS:
+                bucket[field] -= values[field]
+
+    return {key: values for key, values in totals.items() if values["races"] > 0}
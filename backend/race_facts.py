@@ -0,0 +1,320 @@
+"""Columnar in-process copy of the analytics-eligible race results, one per results version.
+
+Each result is one position across typed NumPy arrays, with its role already classified
+the way player_role_analytics.classify_role does it. Leaderboards and track rankings
+select a scope with array masks and reduce it per player with bincounts instead of
+querying and classifying rows on every request.
+"""
+
+from dataclasses import dataclass
+from itertools import islice
+
+import numpy as np
+from analytics_eligibility import (
+    analytics_excluded_race_ids,
+    analytics_results_version,
+    apply_analytics_race_filter,
+)
+from engine_cache import EngineCache
+from match_sets import match_types_for
+from models import Match, MatchTeam, Race, RacePlayerResult, TeamSeasonEntry
+from player_role_analytics import (
+    ROLE_COVERAGE_KEYS,
+    ROLE_TOTAL_FIELDS,
+    normalize_role,
+    role_coverage_payload,
+)
+from sqlalchemy import select
+
+MAX_CACHED_FACTS = 2
+# Result rows fetched and converted to arrays per round trip while loading.
+PARTITION_ROWS = 10_000
+
+ROLE_UNKNOWN, ROLE_RUNNER, ROLE_BAGGER = 0, 1, 2
+ROLE_CODES = {"runner": ROLE_RUNNER, "bagger": ROLE_BAGGER}
+SOURCE_UNKNOWN, SOURCE_EXPLICIT, SOURCE_INFERRED = 0, 1, 2
+MATCH_TYPE_CODES = {"regular": 0, "playoff": 1}
+# Stored in place of NULL ids and values; the *_present masks say which are real.
+MISSING = -1
+
+_facts_cache = EngineCache(MAX_CACHED_FACTS)
+
+
+@dataclass(frozen=True, eq=False)
+class RaceFacts:
+    race_id: np.ndarray
+    player_id: np.ndarray
+    match_team_id: np.ndarray
+    team_id: np.ndarray
+    score: np.ndarray
+    score_present: np.ndarray
+    position: np.ndarray
+    position_present: np.ndarray
+    role: np.ndarray
+    role_source: np.ndarray
+    track_id: np.ndarray
+    season_id: np.ndarray
+    division_id: np.ndarray
+    match_type: np.ndarray
+
+    @property
+    def score_valid(self):
+        return self.score_present & (self.score >= 0) & (self.score <= 15)
+
+    @property
+    def placement_valid(self):
+        return self.position_present & (self.position >= 1) & (self.position <= 10)
+
+    def scope_rows(self, season_id, division_id, match_set="regular", team_id=None, track_id=None):
+        """Return the indexes of the results in a season/division scope."""
+        mask = (self.season_id == season_id) & (self.division_id == division_id)
+        mask &= np.isin(
+            self.match_type,
+            [MATCH_TYPE_CODES[match_type] for match_type in match_types_for(match_set)],
+        )
+        if team_id is not None:
+            mask &= self.team_id == team_id
+        if track_id is not None:
+            mask &= self.track_id == track_id
+        return np.flatnonzero(mask)
+
+
+def confirmed_5v5_mask(race_id, player_id, match_team_id):
+    """Flag results of races with ten distinct players split five and five over two teams.
+
+    Matches player_role_analytics._confirmed_5v5_ids_from_results, applied to every race.
+    """
+    confirmed = np.zeros(len(race_id), dtype=bool)
+    if not len(race_id):
+        return confirmed
+    races, race_index, race_rows = np.unique(race_id, return_inverse=True, return_counts=True)
+    _, player_index = np.unique(player_id, return_inverse=True)
+    _, team_index = np.unique(match_team_id, return_inverse=True)
+    race_count = len(races)
+
+    # Distinct players per race; with ten rows and ten players nobody appears twice,
+    # so every team's row count is also its distinct player count.
+    race_players = np.unique(race_index * (player_index.max() + 1) + player_index)
+    distinct_players = np.bincount(race_players // (player_index.max() + 1), minlength=race_count)
+    race_teams, team_rows = np.unique(
+        race_index * (team_index.max() + 1) + team_index, return_counts=True
+    )
+    team_race = race_teams // (team_index.max() + 1)
+    team_count = np.bincount(team_race, minlength=race_count)
+    smallest_team = np.full(race_count, np.iinfo(np.int64).max)
+    np.minimum.at(smallest_team, team_race, team_rows)
+
+    race_confirmed = (
+        (race_rows == 10) & (distinct_players == 10) & (team_count == 2) & (smallest_team == 5)
+    )
+    confirmed[:] = race_confirmed[race_index]
+    return confirmed
+
+
+def classify_roles(stored_role, stored_inferred, position, placement_valid, confirmed):
+    """Return role and source codes, following player_role_analytics.classify_role."""
+    explicit = stored_role != ROLE_UNKNOWN
+    role = np.where(explicit, stored_role, ROLE_UNKNOWN).astype(np.int8)
+    source = np.where(
+        explicit, np.where(stored_inferred, SOURCE_INFERRED, SOURCE_EXPLICIT), SOURCE_UNKNOWN
+    ).astype(np.int8)
+    placed = ~explicit & confirmed & placement_valid
+    runner = placed & (position <= 8)
+    bagger = placed & (position >= 9)
+    role[runner] = ROLE_RUNNER
+    role[bagger] = ROLE_BAGGER
+    source[runner | bagger] = SOURCE_INFERRED
+    return role, source
+
+
+def _nullable(values, dtype):
+    present = np.fromiter((value is not None for value in values), dtype=bool, count=len(values))
+    array = np.fromiter(
+        (MISSING if value is None else value for value in values), dtype=dtype, count=len(values)
+    )
+    return array, present
+
+
+def _partition_columns(rows):
+    """Convert one partition of fact rows to the stored columns, before classification."""
+    (
+        race_ids,
+        player_ids,
+        match_team_ids,
+        team_ids,
+        scores,
+        positions,
+        roles,
+        role_sources,
+        track_ids,
+        season_ids,
+        division_ids,
+        match_types,
+    ) = list(zip(*rows)) if rows else [()] * 12
+    count = len(rows)
+
+    def ids(values):
+        return _nullable(values, np.int64)[0]
+
+    score, score_present = _nullable(scores, np.int64)
+    position, position_present = _nullable(positions, np.int64)
+    return {
+        "race_id": ids(race_ids),
+        "player_id": ids(player_ids),
+        "match_team_id": ids(match_team_ids),
+        "team_id": ids(team_ids),
+        "score": score,
+        "score_present": score_present,
+        "position": position,
+        "position_present": position_present,
+        "stored_role": np.fromiter(
+            (ROLE_CODES.get(role, ROLE_UNKNOWN) for role in roles), dtype=np.int8, count=count
+        ),
+        "stored_inferred": np.fromiter(
+            (source == "inferred" for source in role_sources), dtype=bool, count=count
+        ),
+        "track_id": ids(track_ids),
+        "season_id": ids(season_ids),
+        "division_id": ids(division_ids),
+        "match_type": np.fromiter(
+            (MATCH_TYPE_CODES.get(match_type, MISSING) for match_type in match_types),
+            dtype=np.int8,
+            count=count,
+        ),
+    }
+
+
+def build_race_facts(rows, partition_rows=PARTITION_ROWS):
+    """Build RaceFacts from (race_id, player_id, match_team_id, team_id, score, position,
+    role, role_source, track_id, season_id, division_id, match_type) rows.
+
+    Rows are converted to arrays partition_rows at a time, so only one partition of them
+    is held at once; roles are classified once every race is complete.
+    """
+    rows = iter(rows)
+    partitions = []
+    while partition := list(islice(rows, partition_rows)):
+        partitions.append(_partition_columns(partition))
+    partitions = partitions or [_partition_columns([])]
+    columns = {
+        name: np.concatenate([partition[name] for partition in partitions])
+        for name in partitions[0]
+    }
+
+    placement_valid = (
+        columns["position_present"] & (columns["position"] >= 1) & (columns["position"] <= 10)
+    )
+    role, role_source = classify_roles(
+        columns.pop("stored_role"),
+        columns.pop("stored_inferred"),
+        columns["position"],
+        placement_valid,
+        confirmed_5v5_mask(columns["race_id"], columns["player_id"], columns["match_team_id"]),
+    )
+    return RaceFacts(role=role, role_source=role_source, **columns)
+
+
+def _load_race_facts(session):
+    statement = (
+        select(
+            RacePlayerResult.race_id,
+            RacePlayerResult.player_id,
+            RacePlayerResult.match_team_id,
+            TeamSeasonEntry.team_id,
+            RacePlayerResult.score,
+            RacePlayerResult.position,
+            RacePlayerResult.role,
+            RacePlayerResult.role_source,
+            Race.track_id,
+            Match.season_id,
+            Match.division_id,
+            Match.match_type,
+        )
+        .join(Race, Race.race_id == RacePlayerResult.race_id)
+        .join(Match, Match.match_id == Race.match_id)
+        .join(MatchTeam, MatchTeam.match_team_id == RacePlayerResult.match_team_id)
+        .join(
+            TeamSeasonEntry,
+            TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
+        )
+    )
+    # Streamed through a server-side cursor; build_race_facts keeps one partition of rows.
+    return build_race_facts(
+        session.execute(
+            apply_analytics_race_filter(statement, session),
+            execution_options={"yield_per": PARTITION_ROWS},
+        )
+    )
+
+
+def race_facts(session):
+    """Return the columnar results, loading them at most once per results version."""
+    key = (analytics_results_version(session), analytics_excluded_race_ids(session))
+    return _facts_cache.get_or_build(session, key, lambda: _load_race_facts(session))
+
+
+def group_rows(facts, rows):
+    """Group result indexes by player; return the player ids and each row's group."""
+    return np.unique(facts.player_id[rows], return_inverse=True)
+
+
+def role_totals_by_group(facts, rows, groups, group_count, role):
+    """Return role_totals for each group as {field: array}, counting role's results only."""
+    selected = facts.role[rows] == ROLE_CODES[normalize_role(role)]
+    rows, groups = rows[selected], groups[selected]
+    score = facts.score[rows]
+    position = facts.position[rows]
+    score_valid = facts.score_valid[rows]
+    placement_valid = facts.placement_valid[rows]
+
+    def count(mask):
+        return np.bincount(groups[mask], minlength=group_count)
+
+    def total(mask, values):
+        return np.bincount(groups[mask], weights=values[mask], minlength=group_count).astype(
+            np.int64
+        )
+
+    return {
+        "races": np.bincount(groups, minlength=group_count),
+        "scored_races": count(score_valid),
+        "total_points": total(score_valid, score),
+        "excluded_score_rows": count(facts.score_present[rows] & ~score_valid),
+        "placement_sum": total(placement_valid, position),
+        "placement_count": count(placement_valid),
+        "wins": count(placement_valid & (position == 1)),
+        "podiums": count(placement_valid & (position <= 3)),
+        "bag_points": count(score_valid & (score > 0)),
+        "zero_points": count(score_valid & (score == 0)),
+    }
+
+
+def qualified_groups(totals, min_races):
+    """Return the groups with at least min_races scored races in the selected role; a group
+    with none has no per-race value to rank by, even when min_races is 0."""
+    return [int(group) for group in np.flatnonzero(totals["scored_races"] >= max(min_races, 1))]
+
+
+def group_totals(totals, group):
+    """Return one group's role_totals dict with plain int counters."""
+    return {field: int(totals[field][group]) for field in ROLE_TOTAL_FIELDS}
+
+
+def role_coverage_by_group(facts, rows, groups, group_count):
+    """Return role_coverage payloads for each group, over all of its results."""
+    role = facts.role[rows]
+    source = facts.role_source[rows]
+    masks = {
+        "explicit_runner": (role == ROLE_RUNNER) & (source == SOURCE_EXPLICIT),
+        "inferred_runner": (role == ROLE_RUNNER) & (source == SOURCE_INFERRED),
+        "explicit_bagger": (role == ROLE_BAGGER) & (source == SOURCE_EXPLICIT),
+        "inferred_bagger": (role == ROLE_BAGGER) & (source == SOURCE_INFERRED),
+        "unknown": role == ROLE_UNKNOWN,
+    }
+    counts = {
+        key: np.bincount(groups[masks[key]], minlength=group_count) for key in ROLE_COVERAGE_KEYS
+    }
+    return [
+        role_coverage_payload({key: int(counts[key][group]) for key in ROLE_COVERAGE_KEYS})
+        for group in range(group_count)
+    ]
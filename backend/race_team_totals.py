@@ -0,0 +1,154 @@
+"""Per-race team totals kept alongside race results for the team analytics."""
+
+from models import MatchTeam, Race, RacePlayerResult, RaceTeamResult, RaceTeamTotal
+from player_role_analytics import sql_valid_race_score
+from sqlalchemy import and_, case, delete, exists, func, insert, select
+
+TOTAL_COLUMNS = (
+    "race_id",
+    "match_team_id",
+    "team_season_entry_id",
+    "player_points",
+    "scored_results",
+    "awarded_points",
+    "score",
+    "opponent_best",
+    "result",
+)
+
+
+def _live_totals(race_ids):
+    """Compute race_team_totals rows for race_ids from the stored results.
+
+    A team's score is its valid player scores plus missing-player awards; its best
+    opponent is the highest score among the race's other match teams.
+    """
+    player_points = (
+        select(
+            RacePlayerResult.race_id,
+            RacePlayerResult.match_team_id,
+            func.sum(RacePlayerResult.score).label("points"),
+            func.count().label("results"),
+        )
+        .where(
+            RacePlayerResult.race_id.in_(race_ids),
+            sql_valid_race_score(RacePlayerResult.score),
+        )
+        .group_by(RacePlayerResult.race_id, RacePlayerResult.match_team_id)
+        .subquery()
+    )
+    awarded_points = (
+        select(
+            RaceTeamResult.race_id,
+            RaceTeamResult.match_team_id,
+            func.sum(RaceTeamResult.score).label("points"),
+        )
+        .where(RaceTeamResult.race_id.in_(race_ids))
+        .group_by(RaceTeamResult.race_id, RaceTeamResult.match_team_id)
+        .subquery()
+    )
+    score = func.coalesce(player_points.c.points, 0) + func.coalesce(awarded_points.c.points, 0)
+    by_score = {"partition_by": Race.race_id, "order_by": score.desc(), "rows": (None, None)}
+    ranked = (
+        select(
+            Race.race_id,
+            MatchTeam.match_team_id,
+            MatchTeam.team_season_entry_id,
+            func.coalesce(player_points.c.points, 0).label("player_points"),
+            func.coalesce(player_points.c.results, 0).label("scored_results"),
+            func.coalesce(awarded_points.c.points, 0).label("awarded_points"),
+            score.label("score"),
+            func.nth_value(score, 1).over(**by_score).label("best_score"),
+            func.nth_value(score, 2).over(**by_score).label("second_score"),
+        )
+        .join(MatchTeam, MatchTeam.match_id == Race.match_id)
+        .outerjoin(
+            player_points,
+            and_(
+                player_points.c.race_id == Race.race_id,
+                player_points.c.match_team_id == MatchTeam.match_team_id,
+            ),
+        )
+        .outerjoin(
+            awarded_points,
+            and_(
+                awarded_points.c.race_id == Race.race_id,
+                awarded_points.c.match_team_id == MatchTeam.match_team_id,
+            ),
+        )
+        .where(Race.race_id.in_(race_ids))
+        .subquery()
+    )
+    # The best score belongs to another team unless this team set it; then the
+    # second-best score (equal to it on a tie) is the opponent's.
+    opponent_best = case(
+        (ranked.c.score == ranked.c.best_score, ranked.c.second_score),
+        else_=ranked.c.best_score,
+    )
+    result = case(
+        (opponent_best.is_(None), "unknown"),
+        (ranked.c.score > opponent_best, "win"),
+        (ranked.c.score < opponent_best, "loss"),
+        else_="tie",
+    )
+    return select(
+        ranked.c.race_id,
+        ranked.c.match_team_id,
+        ranked.c.team_season_entry_id,
+        ranked.c.player_points,
+        ranked.c.scored_results,
+        ranked.c.awarded_points,
+        ranked.c.score,
+        opponent_best.label("opponent_best"),
+        result.label("result"),
+    )
+
+
+def _insert_totals(session, race_ids):
+    # SQLAlchemy reports no rowcount for INSERT ... SELECT, so count the returned keys.
+    statement = (
+        insert(RaceTeamTotal)
+        .from_select(TOTAL_COLUMNS, _live_totals(race_ids))
+        .returning(RaceTeamTotal.race_id)
+    )
+    return len(session.execute(statement).all())
+
+
+def refresh_race_team_totals(session, race_ids):
+    """Recompute the stored totals of races whose results changed."""
+    race_ids = sorted(set(race_ids))
+    if not race_ids:
+        return 0
+    session.flush()
+    session.execute(delete(RaceTeamTotal).where(RaceTeamTotal.race_id.in_(race_ids)))
+    return _insert_totals(session, race_ids)
+
+
+def rebuild_race_team_totals(session):
+    """Recompute the stored totals of every race."""
+    session.flush()
+    session.execute(delete(RaceTeamTotal))
+    return _insert_totals(session, select(Race.race_id))
+
+
+def race_team_totals(session, race_ids):
+    """Return a subquery of the totals for race_ids.
+
+    Stored rows answer when every race has them; races written before the table
+    existed are summed from race_player_results and race_team_results instead.
+    """
+    unstored = session.scalar(
+        select(Race.race_id)
+        .where(
+            Race.race_id.in_(race_ids),
+            ~exists().where(RaceTeamTotal.race_id == Race.race_id),
+        )
+        .limit(1)
+    )
+    if unstored is None:
+        statement = select(*(getattr(RaceTeamTotal, name) for name in TOTAL_COLUMNS)).where(
+            RaceTeamTotal.race_id.in_(race_ids)
+        )
+    else:
+        statement = _live_totals(race_ids)
+    return statement.subquery("race_totals")
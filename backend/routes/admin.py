@@ -9,8 +9,8 @@ import team_logo_management
 from acceptance_service import accept_match
 from admin_auth import record_audit, require_admin
 from archive_storage import get_archive_storage
+from data_version import bump_data_version
 from database_health_reviews import set_issue_review
-from extensions import cache
 from flask import Blueprint, g, jsonify, request
 from import_json_to_db import detect_new_entries, import_preview_match
 from match_upload import (
@@ -113,7 +113,7 @@ def api_alias_add(entity_type, entity_id):
                     "value": alias.alias_value,
                 },
             )
-        cache.clear()
+            bump_data_version(session)
         return jsonify(detail), 201
     except Exception as error:
         return _alias_error(error)
@@ -138,7 +138,7 @@ def api_player_canonical_name_update(player_id):
                     "canonical_name": detail["canonical_name"],
                 },
             )
-        cache.clear()
+            bump_data_version(session)
         return jsonify(detail)
     except Exception as error:
         return _alias_error(error)
@@ -163,7 +163,7 @@ def api_track_canonical_name_update(track_id):
                     "canonical_name": detail["canonical_name"],
                 },
             )
-        cache.clear()
+            bump_data_version(session)
         return jsonify({"track": detail, **result})
     except Exception as error:
         return _alias_error(error)
@@ -191,7 +191,7 @@ def api_track_merge(track_id):
                     "aliases_moved": result["aliases_moved"],
                 },
             )
-        cache.clear()
+            bump_data_version(session, results=result["races_updated"] > 0)
         return jsonify(result)
     except Exception as error:
         return _alias_error(error)
@@ -213,7 +213,7 @@ def api_alias_delete(entity_type, entity_id, alias_id):
                 target_id=alias_id,
                 details={"entity_id": entity_id, **deleted},
             )
-        cache.clear()
+            bump_data_version(session)
         return jsonify(detail)
     except Exception as error:
         return _alias_error(error)
@@ -245,7 +245,7 @@ def api_team_identity_update(team_id):
                 target_id=team_id,
                 details={"previous": previous, "current": detail["team"]},
             )
-        cache.clear()
+            bump_data_version(session)
         return jsonify(detail)
     except Exception as error:
         return _team_identity_error(error)
@@ -271,7 +271,7 @@ def api_team_league_identity_add(team_id):
                     "tag": identity.tag,
                 },
             )
-        cache.clear()
+            bump_data_version(session)
         return jsonify(detail), 201
     except Exception as error:
         return _team_identity_error(error)
@@ -293,7 +293,7 @@ def api_team_league_identity_delete(team_id, team_league_identity_id):
                 target_id=team_league_identity_id,
                 details={"team_id": team_id, **deleted},
             )
-        cache.clear()
+            bump_data_version(session)
         return jsonify(detail)
     except Exception as error:
         return _team_identity_error(error)
@@ -321,7 +321,7 @@ def api_team_season_identity_update(team_id, team_season_entry_id):
                 target_id=team_season_entry_id,
                 details={"team_id": team_id, "previous": previous, "current": updated},
             )
-        cache.clear()
+            bump_data_version(session)
         return jsonify(detail)
     except Exception as error:
         return _team_identity_error(error)
@@ -369,7 +369,7 @@ def api_team_logo_upload(team_id):
                     "asset_path": logo.asset_path,
                 },
             )
-        cache.clear()
+            bump_data_version(session)
         return jsonify(detail), 201
     except Exception as error:
         return _team_logo_error(error)
@@ -394,7 +394,7 @@ def api_team_logo_update(team_id, logo_id):
                     "alt_text": logo.alt_text,
                 },
             )
-        cache.clear()
+            bump_data_version(session)
         return jsonify(detail)
     except Exception as error:
         return _team_logo_error(error)
@@ -539,12 +539,12 @@ def api_database_health():
         "no",
     }
     try:
-        with stats.SessionLocal() as session:
-            return jsonify(
-                database_health_service.build_database_health(
-                    session, include_archive=include_archive
-                )
+        # The archive check refreshes its hash manifest, so the session commits on exit.
+        with stats.SessionLocal.begin() as session:
+            report = database_health_service.build_database_health(
+                session, include_archive=include_archive
             )
+        return jsonify(report)
     except Exception:
         logger.exception("Failed to build database health report")
         return jsonify({"error": "Failed to build database health report."}), 500
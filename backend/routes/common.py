@@ -62,6 +62,26 @@ def minimum_races_arg(default=12):
     return value
 
 
+def page_args(default_per_page=50, max_per_page=200):
+    page = optional_int_arg("page")
+    per_page = optional_int_arg("per_page")
+    page = 1 if page is None else page
+    per_page = default_per_page if per_page is None else per_page
+    if page < 1:
+        raise DashboardError("page must be at least 1.")
+    if per_page < 1 or per_page > max_per_page:
+        raise DashboardError(f"per_page must be between 1 and {max_per_page}.")
+    return page, per_page
+
+
+def match_page_args(default_limit=50, max_limit=200):
+    limit = optional_int_arg("limit")
+    limit = default_limit if limit is None else limit
+    if limit < 1 or limit > max_limit:
+        raise DashboardError(f"limit must be between 1 and {max_limit}.")
+    return limit, (request.args.get("cursor") or "").strip() or None
+
+
 def match_request_payload():
     payload = request.get_json(silent=True)
     match_data = (
@@ -1,9 +1,10 @@
 import logging
 from pathlib import Path
 
+from admin_auth import require_admin
 from alembic.config import Config
 from alembic.script import ScriptDirectory
-from database import get_session_factory
+from database import get_session_factory, pool_metrics
 from flask import Blueprint, jsonify
 from models import Match, SourceFile
 from sqlalchemy import func, select, text
@@ -72,3 +73,10 @@ def health_data():
     except Exception:
         logger.exception("Public data health check failed")
         return jsonify({"status": "unavailable"}), 503
+
+
+@operations_api.get("/api/health/pool")
+@require_admin
+def health_pool():
+    """Return connection pool usage and checkout waits, for sizing against worker threads."""
+    return jsonify({"pools": pool_metrics()})
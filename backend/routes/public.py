@@ -13,12 +13,15 @@ from routes.common import (
     division_arg,
     error_response,
     league_arg,
+    match_page_args,
     match_set_arg,
     minimum_races_arg,
     optional_int_arg,
+    page_args,
     role_arg,
     season_arg,
 )
+from routes.response_cache import cached_response
 
 logger = logging.getLogger(__name__)
 public_api = Blueprint("public_api", __name__)
@@ -47,6 +50,7 @@ def api_team_logo_content(logo_id):
 
 
 @public_api.get("/api/player")
+@cached_response
 def player_stats():
     player_name = request.args.get("name")
     if not player_name:
@@ -68,6 +72,7 @@ def player_stats():
 
 
 @public_api.get("/api/player-avg")
+@cached_response
 def player_avg():
     player_name = request.args.get("name")
     if not player_name:
@@ -87,6 +92,7 @@ def player_avg():
 
 
 @public_api.get("/api/players")
+@cached_response
 def api_players():
     try:
         return jsonify(
@@ -100,6 +106,7 @@ def api_players():
 
 
 @public_api.get("/api/player-directory")
+@cached_response
 def api_player_directory():
     try:
         return jsonify(
@@ -112,6 +119,7 @@ def api_player_directory():
 
 
 @public_api.get("/api/player-identities")
+@cached_response
 def api_player_identities():
     try:
         return jsonify(
@@ -125,6 +133,7 @@ def api_player_identities():
 
 
 @public_api.get("/api/team-roster-pool")
+@cached_response
 def api_team_roster_pool():
     try:
         with stats.SessionLocal() as session:
@@ -142,6 +151,7 @@ def api_team_roster_pool():
 
 
 @public_api.get("/api/player-team-memberships")
+@cached_response
 def api_player_team_memberships():
     try:
         raw_player_ids = request.args.get("player_ids", "")
@@ -163,6 +173,7 @@ def api_player_team_memberships():
 
 
 @public_api.get("/api/players/<int:player_id>/overview")
+@cached_response
 def api_player_dashboard_overview(player_id):
     try:
         return jsonify(
@@ -182,6 +193,7 @@ def api_player_dashboard_overview(player_id):
 
 
 @public_api.get("/api/players/<int:player_id>/performance")
+@cached_response
 def api_player_dashboard_performance(player_id):
     try:
         return jsonify(
@@ -200,6 +212,7 @@ def api_player_dashboard_performance(player_id):
 
 
 @public_api.get("/api/players/<int:player_id>/tracks")
+@cached_response
 def api_player_dashboard_tracks(player_id):
     try:
         return jsonify(
@@ -218,7 +231,50 @@ def api_player_dashboard_tracks(player_id):
         return error_response(error)
 
 
+@public_api.get("/api/players/<int:player_id>/dashboard")
+@cached_response
+def api_player_dashboard(player_id):
+    try:
+        return jsonify(
+            dashboards.get_player_dashboard(
+                player_id,
+                league=league_arg(),
+                season=season_arg(),
+                division=division_arg(),
+                team_id=optional_int_arg("team_id"),
+                min_races=minimum_races_arg(),
+                role=role_arg(),
+                match_set=match_set_arg(),
+            )
+        )
+    except Exception as error:
+        return error_response(error)
+
+
+@public_api.get("/api/leaderboard")
+@cached_response
+def api_player_leaderboard():
+    try:
+        page, per_page = page_args()
+        return jsonify(
+            dashboards.get_player_leaderboard(
+                season_arg(),
+                division_arg(),
+                league=league_arg(),
+                team_id=optional_int_arg("team_id"),
+                min_races=minimum_races_arg(),
+                role=role_arg(),
+                match_set=match_set_arg(),
+                page=page,
+                per_page=per_page,
+            )
+        )
+    except Exception as error:
+        return error_response(error)
+
+
 @public_api.get("/api/teams/<int:team_id>/overview")
+@cached_response
 def api_team_dashboard_overview(team_id):
     try:
         return jsonify(
@@ -237,6 +293,7 @@ def api_team_dashboard_overview(team_id):
 
 
 @public_api.get("/api/teams/<int:team_id>/roster")
+@cached_response
 def api_team_dashboard_roster(team_id):
     try:
         return jsonify(
@@ -256,6 +313,7 @@ def api_team_dashboard_roster(team_id):
 
 
 @public_api.get("/api/teams/<int:team_id>/tracks")
+@cached_response
 def api_team_dashboard_tracks(team_id):
     try:
         return jsonify(
@@ -274,6 +332,7 @@ def api_team_dashboard_tracks(team_id):
 
 
 @public_api.get("/api/track-search")
+@cached_response
 def api_track_search():
     try:
         include_other_leagues = str(request.args.get("include_other_leagues") or "").lower() in {
@@ -293,6 +352,7 @@ def api_track_search():
 
 
 @public_api.get("/api/seasons")
+@cached_response
 def api_seasons():
     try:
         return jsonify(stats.list_seasons(league_code=league_arg()))
@@ -302,6 +362,7 @@ def api_seasons():
 
 
 @public_api.get("/api/match-scopes")
+@cached_response
 def api_match_scopes():
     try:
         return jsonify(stats.list_match_scopes())
@@ -310,6 +371,7 @@ def api_match_scopes():
 
 
 @public_api.get("/api/team-scopes")
+@cached_response
 def api_team_scopes():
     try:
         return jsonify(stats.list_team_scopes())
@@ -318,6 +380,7 @@ def api_team_scopes():
 
 
 @public_api.get("/api/divisions")
+@cached_response
 def api_divisions():
     try:
         return jsonify(stats.list_divisions(season=season_arg(), league_code=league_arg()))
@@ -327,6 +390,7 @@ def api_divisions():
 
 
 @public_api.get("/api/top-team-players")
+@cached_response
 def api_top_team_players():
     try:
         role = role_arg()
@@ -351,6 +415,7 @@ def api_top_team_players():
 
 
 @public_api.get("/api/teams")
+@cached_response
 def api_teams():
     try:
         return jsonify(
@@ -362,23 +427,27 @@ def api_teams():
 
 
 @public_api.get("/api/matches")
+@cached_response
 def api_matches():
     try:
-        return jsonify(
-            stats.list_matches(
-                league_code=league_arg(),
-                season=season_arg(),
-                division=division_arg(),
-                team=request.args.get("team"),
-                match_set=match_set_arg(),
-            )
-        )
+        scope = {
+            "league_code": league_arg(),
+            "season": season_arg(),
+            "division": division_arg(),
+            "team": request.args.get("team"),
+            "match_set": match_set_arg(),
+        }
+        if "limit" in request.args or "cursor" in request.args:
+            limit, cursor = match_page_args()
+            return jsonify(stats.list_match_page(**scope, limit=limit, cursor=cursor))
+        return jsonify(stats.list_matches(**scope))
     except Exception as error:
         logger.exception("Failed to list matches")
         return error_response(error)
 
 
 @public_api.get("/api/playoff-series")
+@cached_response
 def api_playoff_series():
     try:
         return jsonify(
@@ -395,6 +464,7 @@ def api_playoff_series():
 
 
 @public_api.get("/api/matches/<int:match_id>")
+@cached_response
 def api_match_detail(match_id):
     try:
         return jsonify(stats.get_match_detail(match_id))
@@ -404,6 +474,7 @@ def api_match_detail(match_id):
 
 
 @public_api.get("/api/top-team-tracks")
+@cached_response
 def api_top_team_tracks():
     try:
         min_races = minimum_races_arg(default=2)
@@ -426,6 +497,7 @@ def api_top_team_tracks():
 
 
 @public_api.get("/api/tracks")
+@cached_response
 def api_tracks():
     try:
         return jsonify(
@@ -442,6 +514,7 @@ def api_tracks():
 
 
 @public_api.get("/api/top-tracks")
+@cached_response
 def api_top_tracks():
     track = request.args.get("track")
     if not track:
@@ -469,6 +542,7 @@ def api_top_tracks():
 
 
 @public_api.get("/api/top-teams-on-track")
+@cached_response
 def api_top_teams_on_track():
     track = request.args.get("track")
     if not track:
@@ -0,0 +1,82 @@
+"""Data-versioned response cache and conditional GET support for public reads."""
+
+import hashlib
+import json
+from functools import wraps
+
+import stats_db as stats
+from data_version import cached_data_version
+from extensions import cache
+from flask import current_app, request
+
+CASE_INSENSITIVE_ARGS = frozenset({"season", "division", "league", "match_set", "role"})
+INTEGER_ARGS = frozenset({"min_races", "team_id", "opponent_team_id", "page", "per_page", "limit"})
+DEFAULT_ARGS = {"league": "ctc", "match_set": "regular", "role": "runner"}
+
+
+def normalized_query_args():
+    """Return request arguments in a canonical order with equivalent spellings collapsed."""
+    normalized = []
+    for name in sorted(request.args):
+        for raw_value in request.args.getlist(name):
+            value = raw_value.strip()
+            if name in CASE_INSENSITIVE_ARGS:
+                value = value.lower()
+            elif name in INTEGER_ARGS:
+                try:
+                    value = str(int(value))
+                except ValueError:
+                    pass
+            if value == "" or DEFAULT_ARGS.get(name) == value:
+                continue
+            normalized.append((name, value))
+    return normalized
+
+
+def _response_etag(version):
+    identity = json.dumps(
+        [current_app.config["RESPONSE_CACHE_SALT"], request.path, normalized_query_args()],
+        separators=(",", ":"),
+    )
+    return f"v{version}-{hashlib.sha256(identity.encode('utf-8')).hexdigest()[:32]}"
+
+
+def _matches_client_etag(etag):
+    # Compression appends ":gzip"/":br" to strong validators after this layer runs.
+    return any(candidate.split(":", 1)[0] == etag for candidate in request.if_none_match.as_set())
+
+
+def cached_response(view):
+    """Serve successful responses from the shared cache until the data version changes."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        config = current_app.config
+        if not config["RESPONSE_CACHE_ENABLED"]:
+            return view(*args, **kwargs)
+        version = cached_data_version(
+            stats.SessionLocal,
+            config["DATA_VERSION_TTL_SECONDS"],
+            shared_ttl_seconds=(
+                config["DATA_VERSION_SHARED_TTL_SECONDS"] if config["CACHE_SHARED"] else None
+            ),
+        )
+        etag = _response_etag(version)
+        if _matches_client_etag(etag):
+            response = current_app.response_class(status=304)
+        else:
+            cache_key = f"public-response:{etag}"
+            cached = cache.get(cache_key)
+            if cached is None:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                cache.set(cache_key, (response.get_data(), response.mimetype))
+            else:
+                body, mimetype = cached
+                response = current_app.response_class(body, mimetype=mimetype)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    return wrapper
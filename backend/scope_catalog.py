@@ -0,0 +1,187 @@
+"""League catalogs of seasons, divisions, season teams, and tracks, cached per data version.
+
+Scope and name resolution read these instead of querying the catalog tables on every
+request. A catalog is built once per league and data version in each process and is
+also pinned to the session that first asked for it until that session flushes or the
+request commits a write through SessionLocal.begin(), so one request checks the data
+version at most once however many names it resolves.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+
+from analytics_eligibility import analytics_data_version
+from database import session_pins
+from engine_cache import EngineCache
+from models import Division, Season, Team, TeamSeasonEntry, Track, TrackAlias
+from sqlalchemy import desc, select
+
+MAX_CACHED_CATALOGS = 16
+SESSION_CATALOGS = "scope_catalogs"
+
+_catalog_cache = EngineCache(MAX_CACHED_CATALOGS)
+
+
+@dataclass(frozen=True)
+class CatalogSeason:
+    season_id: int
+    season_code: str
+    season_number: int | None
+    name: str
+    status: str
+
+
+@dataclass(frozen=True)
+class CatalogDivision:
+    division_id: int
+    season_id: int
+    division_code: str
+    division_name: str
+
+
+@dataclass(frozen=True)
+class CatalogTeam:
+    team_id: int
+    team_season_entry_id: int
+    clan_tag: str
+    display_name: str | None
+    canonical_name: str
+
+
+@dataclass(frozen=True)
+class CatalogTrack:
+    track_id: int
+    canonical_name: str
+
+
+@dataclass(frozen=True)
+class ScopeCatalog:
+    league_code: str
+    seasons: tuple[CatalogSeason, ...]
+    seasons_by_code: dict
+    divisions: dict
+    teams: dict
+    teams_by_tag: dict
+    tracks_by_name: dict
+
+    def latest_season(self, division_code=None):
+        """Return the newest season, or the newest one with division_code."""
+        for season in self.seasons:
+            if division_code is None or self.division(season.season_id, division_code):
+                return season
+        return None
+
+    def division(self, season_id, division_code=None):
+        """Return the season's division_code division, or its first division by code."""
+        for division in self.divisions.get(season_id, ()):
+            if division_code is None or division.division_code == division_code:
+                return division
+        return None
+
+    def season_teams(self, season_id, division_id):
+        """Return the scope's teams ordered by clan tag."""
+        return self.teams.get((season_id, division_id), ())
+
+    def team(self, season_id, division_id, clan_tag):
+        return self.teams_by_tag.get((season_id, division_id, clan_tag.strip().lower()))
+
+    def track(self, name):
+        """Return the track with this canonical name, else the one with this alias."""
+        return self.tracks_by_name.get(name.strip().lower())
+
+
+def _build_scope_catalog(session, league_code):
+    seasons = tuple(
+        CatalogSeason(*row)
+        for row in session.execute(
+            select(
+                Season.season_id,
+                Season.season_code,
+                Season.season_number,
+                Season.name,
+                Season.status,
+            )
+            .where(Season.league_code == league_code)
+            .order_by(desc(Season.season_number), desc(Season.season_id))
+        )
+    )
+    divisions = defaultdict(list)
+    for row in session.execute(
+        select(
+            Division.division_id,
+            Division.season_id,
+            Division.division_code,
+            Division.division_name,
+        )
+        .join(Season, Season.season_id == Division.season_id)
+        .where(Season.league_code == league_code)
+        .order_by(Division.division_code)
+    ):
+        divisions[row.season_id].append(CatalogDivision(*row))
+
+    teams = defaultdict(list)
+    teams_by_tag = {}
+    for row in session.execute(
+        select(
+            TeamSeasonEntry.season_id,
+            TeamSeasonEntry.division_id,
+            Team.team_id,
+            TeamSeasonEntry.team_season_entry_id,
+            TeamSeasonEntry.clan_tag,
+            TeamSeasonEntry.display_name,
+            Team.canonical_name,
+        )
+        .join(Team, Team.team_id == TeamSeasonEntry.team_id)
+        .join(Season, Season.season_id == TeamSeasonEntry.season_id)
+        .where(Season.league_code == league_code)
+        .order_by(TeamSeasonEntry.clan_tag, TeamSeasonEntry.team_season_entry_id)
+    ):
+        team = CatalogTeam(*row[2:])
+        teams[(row.season_id, row.division_id)].append(team)
+        teams_by_tag.setdefault((row.season_id, row.division_id, team.clan_tag.lower()), team)
+
+    tracks_by_name = {}
+    canonical = session.execute(
+        select(Track.track_id, Track.canonical_name)
+        .where(Track.league_code == league_code)
+        .order_by(Track.track_id)
+    ).all()
+    aliases = session.execute(
+        select(TrackAlias.alias_value, Track.track_id, Track.canonical_name)
+        .join(Track, Track.track_id == TrackAlias.track_id)
+        .where(Track.league_code == league_code)
+        .order_by(TrackAlias.track_alias_id)
+    ).all()
+    # Canonical names win over any alias that happens to spell another track's name.
+    for row in canonical:
+        tracks_by_name.setdefault(row.canonical_name.strip().lower(), CatalogTrack(*row))
+    for row in aliases:
+        tracks_by_name.setdefault(
+            row.alias_value.strip().lower(), CatalogTrack(row.track_id, row.canonical_name)
+        )
+
+    return ScopeCatalog(
+        league_code=league_code,
+        seasons=seasons,
+        seasons_by_code={season.season_code: season for season in seasons},
+        divisions={season_id: tuple(rows) for season_id, rows in divisions.items()},
+        teams={scope: tuple(rows) for scope, rows in teams.items()},
+        teams_by_tag=teams_by_tag,
+        tracks_by_name=tracks_by_name,
+    )
+
+
+def scope_catalog(session, league_code="ctc"):
+    """Return the league's catalog, building it at most once per data version."""
+    league_code = str(league_code or "ctc").strip().lower()
+    pinned = session_pins(session).setdefault(SESSION_CATALOGS, {})
+    catalog = pinned.get(league_code)
+    if catalog is not None:
+        return catalog
+
+    key = (league_code, analytics_data_version(session))
+    catalog = _catalog_cache.get_or_build(
+        session, key, lambda: _build_scope_catalog(session, league_code)
+    )
+    pinned[league_code] = catalog
+    return catalog
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""Time public analytics endpoints with and without the covering indexes.
+
+The JSON archive is imported into a disposable schema, its match facts are cloned until
+the schema holds --scale copies, and each endpoint is timed first without the analytics
+indexes and then with them. The schema is dropped afterwards unless --keep-schema is set.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+import models  # noqa: F401  (registers the tables on Base.metadata)
+from database import Base, database_url
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.orm import sessionmaker
+
+# Indexes added by migration 20261017_0013.
+ANALYTICS_INDEXES = (
+    "ix_matches_scope",
+    "ix_match_teams_match_id",
+    "ix_match_teams_team_season_entry_id",
+    "ix_races_track_id",
+    "ix_race_player_results_player_id",
+    "ix_race_player_results_race_team",
+    "ix_race_player_results_match_team_id",
+)
+
+# Fact tables copied per scale step, parents first. Every other table is shared by the
+# copies, so the clones land in the same seasons, divisions, teams, players, and tracks.
+CLONED_TABLES = (
+    "matches",
+    "match_teams",
+    "match_players",
+    "races",
+    "race_team_results",
+    "race_player_results",
+    "race_classifications",
+    "race_team_totals",
+)
+
+# Columns that belong to a unique constraint together with an unchanged parent key.
+UNIQUE_OFFSETS = {
+    ("matches", "match_index_in_source"): 100_000,
+    ("matches", "series_match_number"): 1_000,
+}
+
+
+def analytics_indexes():
+    indexes = {
+        index.name: index for table in Base.metadata.tables.values() for index in table.indexes
+    }
+    return [indexes[name] for name in ANALYTICS_INDEXES]
+
+
+def scale_archive(connection, copies: int) -> None:
+    tables = Base.metadata.tables
+    offsets = {}
+    for name in CLONED_TABLES:
+        key = tables[name].primary_key.columns.values()[0]
+        offsets[name] = connection.scalar(text(f"SELECT COALESCE(MAX({key.name}), 0) FROM {name}"))
+
+    for copy in range(1, copies + 1):
+        for name in CLONED_TABLES:
+            table = tables[name]
+            expressions = []
+            for column in table.columns:
+                references = [
+                    foreign_key.column.table.name
+                    for foreign_key in column.foreign_keys
+                    if foreign_key.column.table.name in offsets
+                ]
+                if references:
+                    expressions.append(f"{column.name} + {copy * offsets[references[0]]}")
+                elif column.primary_key:
+                    expressions.append(f"{column.name} + {copy * offsets[name]}")
+                elif (name, column.name) in UNIQUE_OFFSETS:
+                    expressions.append(
+                        f"{column.name} + {copy * UNIQUE_OFFSETS[name, column.name]}"
+                    )
+                else:
+                    expressions.append(column.name)
+            column_list = ", ".join(column.name for column in table.columns)
+            connection.execute(
+                text(
+                    f"INSERT INTO {name} ({column_list}) "
+                    f"SELECT {', '.join(expressions)} FROM {name} "
+                    f"WHERE {table.primary_key.columns.values()[0].name} <= :limit"
+                ),
+                {"limit": offsets[name]},
+            )
+
+    for name in CLONED_TABLES:
+        key = tables[name].primary_key.columns.values()[0]
+        if key.foreign_keys:
+            continue
+        connection.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{name}', '{key.name}'), "
+                f"(SELECT MAX({key.name}) FROM {name}))"
+            )
+        )
+
+
+def benchmark_targets(connection) -> dict:
+    scope = connection.execute(
+        text("""
+            SELECT s.league_code, s.season_code, d.division_code, m.season_id, m.division_id
+            FROM matches m
+            JOIN seasons s ON s.season_id = m.season_id
+            JOIN divisions d ON d.division_id = m.division_id
+            GROUP BY s.league_code, s.season_code, d.division_code, m.season_id, m.division_id
+            ORDER BY COUNT(*) DESC
+            LIMIT 1
+        """)
+    ).one()
+    player_id = connection.scalar(
+        text("""
+            SELECT player_id FROM race_player_results
+            GROUP BY player_id ORDER BY COUNT(*) DESC, player_id LIMIT 1
+        """)
+    )
+    # The busiest team of that scope, named by its season tag as the public routes expect.
+    team_id, team_tag = connection.execute(
+        text("""
+            SELECT e.team_id, e.clan_tag
+            FROM match_teams mt
+            JOIN team_season_entries e ON e.team_season_entry_id = mt.team_season_entry_id
+            WHERE e.season_id = :season_id AND e.division_id = :division_id
+            GROUP BY e.team_id, e.clan_tag
+            ORDER BY COUNT(*) DESC, e.team_id
+            LIMIT 1
+        """),
+        {"season_id": scope.season_id, "division_id": scope.division_id},
+    ).one()
+    track = connection.scalar(
+        text("""
+            SELECT t.canonical_name FROM races r JOIN tracks t ON t.track_id = r.track_id
+            GROUP BY t.canonical_name ORDER BY COUNT(*) DESC, t.canonical_name LIMIT 1
+        """)
+    )
+    match_id = connection.scalar(text("SELECT MAX(match_id) FROM matches"))
+    return {
+        "league": scope.league_code,
+        "season": scope.season_code,
+        "division": scope.division_code,
+        "player_id": player_id,
+        "team_id": team_id,
+        "team_tag": team_tag,
+        "track": track,
+        "match_id": match_id,
+    }
+
+
+def benchmark_endpoints(targets: dict) -> list[tuple[str, str, dict]]:
+    scope = {
+        "league": targets["league"],
+        "season": targets["season"],
+        "division": targets["division"],
+    }
+    player = f"/api/players/{targets['player_id']}"
+    team = f"/api/teams/{targets['team_id']}"
+    return [
+        ("player overview", f"{player}/overview", {"league": targets["league"]}),
+        ("player tracks", f"{player}/tracks", {"league": targets["league"]}),
+        ("player dashboard", f"{player}/dashboard", {"league": targets["league"]}),
+        ("team overview", f"{team}/overview", scope),
+        ("team roster", f"{team}/roster", scope),
+        ("team tracks", f"{team}/tracks", scope),
+        ("leaderboard", "/api/leaderboard", scope),
+        ("top team tracks", "/api/top-team-tracks", {**scope, "team": targets["team_tag"]}),
+        ("top teams on track", "/api/top-teams-on-track", {**scope, "track": targets["track"]}),
+        ("match detail", f"/api/matches/{targets['match_id']}", {}),
+    ]
+
+
+def time_endpoints(client, session_factory, endpoints, repeat: int) -> dict[str, float]:
+    from data_version import bump_data_version
+
+    timings = {}
+    for label, path, params in endpoints:
+        samples = []
+        for _ in range(repeat + 1):
+            # A new data version keeps the in-process analytics caches from answering.
+            with session_factory.begin() as session:
+                bump_data_version(session, results=True)
+            started = time.perf_counter()
+            response = client.get(path, query_string=params)
+            samples.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise SystemExit(f"{path} returned {response.status_code}: {response.get_data()}")
+        timings[label] = statistics.median(samples[1:])
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url", help="PostgreSQL URL; defaults to the DATABASE_URL environment variable."
+    )
+    parser.add_argument(
+        "--json-root", type=Path, default=BACKEND_DIR / "JSON", help="JSON archive root."
+    )
+    parser.add_argument("--scale", type=int, default=10, help="Copies of the archive to time.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed requests per endpoint.")
+    parser.add_argument("--keep-schema", action="store_true")
+    args = parser.parse_args()
+
+    base_url = make_url(database_url(args.database_url))
+    schema = f"benchmark_{uuid.uuid4().hex[:12]}"
+    scoped_url = base_url.update_query_dict({"options": f"-csearch_path={schema}"})
+    admin_engine = create_engine(base_url, future=True)
+    with admin_engine.begin() as connection:
+        connection.execute(text(f'CREATE SCHEMA "{schema}"'))
+    # Application modules read DATABASE_URL when first imported.
+    os.environ["DATABASE_URL"] = scoped_url.render_as_string(hide_password=False)
+    engine = create_engine(scoped_url, future=True)
+    try:
+        Base.metadata.create_all(engine)
+        from bulk_import import bulk_import_json_tree
+        from player_track_rollups import rebuild_player_track_rollups
+
+        bulk_import_json_tree(os.environ["DATABASE_URL"], args.json_root.resolve())
+        session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        with engine.begin() as connection:
+            scale_archive(connection, args.scale - 1)
+        with session_factory.begin() as session:
+            rebuild_player_track_rollups(session)
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("VACUUM ANALYZE"))
+            targets = benchmark_targets(connection)
+            counts = {
+                name: connection.scalar(text(f"SELECT COUNT(*) FROM {name}"))
+                for name in ("matches", "races", "race_player_results")
+            }
+        print(
+            f"schema={schema} scale={args.scale} " + " ".join(f"{k}={v}" for k, v in counts.items())
+        )
+
+        from app import create_app
+
+        client = create_app({"RESPONSE_CACHE_ENABLED": False}).test_client()
+        endpoints = benchmark_endpoints(targets)
+        indexes = analytics_indexes()
+        for index in indexes:
+            index.drop(engine)
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("ANALYZE"))
+        before = time_endpoints(client, session_factory, endpoints, args.repeat)
+        for index in indexes:
+            index.create(engine)
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("ANALYZE"))
+        after = time_endpoints(client, session_factory, endpoints, args.repeat)
+        # Backends publish their statistics once idle for a moment.
+        time.sleep(2)
+        with engine.connect() as connection:
+            scans = dict(
+                connection.execute(
+                    text(
+                        "SELECT indexrelname, idx_scan FROM pg_stat_user_indexes"
+                        " WHERE schemaname = :schema AND indexrelname = ANY(:names)"
+                    ),
+                    {"schema": schema, "names": list(ANALYTICS_INDEXES)},
+                ).all()
+            )
+
+        print(f"{'endpoint':<22}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+        for label, _path, _params in endpoints:
+            speedup = before[label] / after[label] if after[label] else float("inf")
+            print(f"{label:<22}{before[label]:>12.1f}{after[label]:>12.1f}{speedup:>9.1f}x")
+        print(f"{'index':<46}{'scans':>8}")
+        for name in ANALYTICS_INDEXES:
+            print(f"{name:<46}{scans.get(name, 0):>8}")
+    finally:
+        engine.dispose()
+        if not args.keep_schema:
+            with admin_engine.begin() as connection:
+                connection.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+        admin_engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import argparse
+import os
 import sys
 import tempfile
 from pathlib import Path, PurePosixPath
@@ -48,7 +49,7 @@ def main() -> None:
         if downloaded == 0:
             raise RuntimeError("The bootstrap prefix contains no JSON source objects.")
 
-        imported = import_json_tree(None, json_root)
+        imported = import_json_tree(None, json_root, bulk=True, workers=os.cpu_count() or 1)
         archived, failed = archive_imported_sources(
             get_session_factory(), GcsArchiveStorage(args.bucket), json_root
         )
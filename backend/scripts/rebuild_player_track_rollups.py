@@ -0,0 +1,30 @@
+import argparse
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from data_version import bump_data_version
+from database import get_session_factory
+from player_track_rollups import rebuild_player_track_rollups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Recompute player_track_rollups for every player from the stored results."
+    )
+    parser.add_argument(
+        "--database-url", help="PostgreSQL URL; defaults to the DATABASE_URL environment variable."
+    )
+    args = parser.parse_args()
+
+    with get_session_factory(args.database_url).begin() as session:
+        written = rebuild_player_track_rollups(session)
+        # Cached track responses were rendered from the live fallback; serve the rollups.
+        bump_data_version(session)
+    print(f"player_track_rollups: {written}")
+
+
+if __name__ == "__main__":
+    main()
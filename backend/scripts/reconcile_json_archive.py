@@ -18,10 +18,15 @@ def main() -> None:
         "--database-url", help="PostgreSQL URL; defaults to the DATABASE_URL environment variable."
     )
     parser.add_argument("--json-root", type=Path, help="Override the JSON archive root.")
+    parser.add_argument(
+        "--full-verify",
+        action="store_true",
+        help="Re-hash every archived file instead of trusting unchanged manifest entries.",
+    )
     args = parser.parse_args()
 
-    with get_session_factory(args.database_url)() as session:
-        report = reconcile_archive(session, args.json_root)
+    with get_session_factory(args.database_url).begin() as session:
+        report = reconcile_archive(session, args.json_root, full_verify=args.full_verify)
     print(json.dumps(report, ensure_ascii=False, indent=2))
     if any(report.values()):
         raise SystemExit(1)
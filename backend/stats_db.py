@@ -10,6 +10,7 @@ from models import (
     Track,
 )
 from player_role_analytics import normalize_role, summarize_role_rows
+from race_team_totals import race_team_totals
 from sqlalchemy import desc, func, select
 from stats_queries import (
     AmbiguousPlayerError,
@@ -25,6 +26,7 @@ from stats_queries import (
     find_player_identities,
     get_match_detail,
     list_divisions,
+    list_match_page,
     list_match_scopes,
     list_matches,
     list_player_directory,
@@ -47,6 +49,7 @@ __all__ = [
     "find_player_identities",
     "get_match_detail",
     "list_divisions",
+    "list_match_page",
     "list_match_scopes",
     "list_matches",
     "list_playoff_series",
@@ -81,7 +84,7 @@ def findplayeravg(
         player_row = _resolve_player(session, player, scope)
         team_row = None
         if team:
-            team_row = _resolve_team(session, team, scope)
+            team_row = _resolve_team(session, team, scope, league_code=league)
 
         if track:
             track_row = _resolve_track(session, track, scope, match_set, league_code=league)
@@ -128,10 +131,19 @@ def findplayeravg(
         }
 
 
+def _scope_race_ids(session, scope, match_set):
+    statement = (
+        select(Race.race_id)
+        .join(Match, Match.match_id == Race.match_id)
+        .where(Match.season_id == scope.season_id, Match.division_id == scope.division_id)
+    )
+    return apply_analytics_race_filter(apply_match_set(statement, match_set), session)
+
+
 def findteamavg(team, track, division=None, season=None, match_set="regular", league="ctc"):
     with SessionLocal() as session:
         scope = _get_scope(session, season=season, division=division, league_code=league)
-        team_row = _resolve_team(session, team, scope)
+        team_row = _resolve_team(session, team, scope, league_code=league)
         track_row = _resolve_track(session, track, scope, match_set, league_code=league)
         statement = (
             select(
@@ -188,30 +200,25 @@ def top_team_tracks(
 ):
     with SessionLocal() as session:
         scope = _get_scope(session, season=season, division=division, league_code=league)
-        team_row = _resolve_team(session, team, scope)
+        team_row = _resolve_team(session, team, scope, league_code=league)
+        totals = race_team_totals(session, _scope_race_ids(session, scope, match_set))
         statement = (
             select(
                 Track.canonical_name.label("track"),
-                (func.sum(RacePlayerResult.score) / func.count(func.distinct(Race.race_id))).label(
-                    "average"
-                ),
-                func.count(func.distinct(Race.race_id)).label("races"),
+                (func.sum(totals.c.player_points) / func.count()).label("average"),
+                func.count().label("races"),
             )
-            .join(Race, Race.race_id == RacePlayerResult.race_id)
-            .join(Match, Match.match_id == Race.match_id)
+            .select_from(totals)
+            .join(Race, Race.race_id == totals.c.race_id)
             .join(Track, Track.track_id == Race.track_id)
             .where(
-                Match.season_id == scope.season_id,
-                Match.division_id == scope.division_id,
-                RacePlayerResult.team_season_entry_id == team_row.team_season_entry_id,
-                _score_filter(),
+                totals.c.team_season_entry_id == team_row.team_season_entry_id,
+                totals.c.scored_results > 0,
             )
             .group_by(Track.track_id, Track.canonical_name)
-            .having(func.count(func.distinct(Race.race_id)) >= min_races)
+            .having(func.count() >= min_races)
             .order_by(desc("average"), desc("races"), Track.canonical_name)
         )
-        statement = apply_match_set(statement, match_set)
-        statement = apply_analytics_race_filter(statement, session)
         rows = session.execute(statement).all()
         return [
             {
@@ -235,7 +242,7 @@ def top_team_players(
     role = normalize_role(role)
     with SessionLocal() as session:
         scope = _get_scope(session, season=season, division=division, league_code=league)
-        team_row = _resolve_team(session, team, scope)
+        team_row = _resolve_team(session, team, scope, league_code=league)
         players = dashboards.get_team_roster(
             team_row.team_id,
             league=league,
@@ -301,32 +308,26 @@ def top_track_teams(
     with SessionLocal() as session:
         scope = _get_scope(session, season=season, division=division, league_code=league)
         track_row = _resolve_track(session, track, scope, match_set, league_code=league)
+        race_ids = _scope_race_ids(session, scope, match_set).where(
+            Race.track_id == track_row.track_id
+        )
+        totals = race_team_totals(session, race_ids)
         statement = (
             select(
                 TeamSeasonEntry.clan_tag.label("name"),
-                (func.sum(RacePlayerResult.score) / func.count(func.distinct(Race.race_id))).label(
-                    "average"
-                ),
-                func.count(func.distinct(Race.race_id)).label("races"),
+                (func.sum(totals.c.player_points) / func.count()).label("average"),
+                func.count().label("races"),
             )
-            .join(Race, Race.race_id == RacePlayerResult.race_id)
-            .join(Match, Match.match_id == Race.match_id)
+            .select_from(totals)
             .join(
                 TeamSeasonEntry,
-                TeamSeasonEntry.team_season_entry_id == RacePlayerResult.team_season_entry_id,
-            )
-            .where(
-                Match.season_id == scope.season_id,
-                Match.division_id == scope.division_id,
-                Race.track_id == track_row.track_id,
-                _score_filter(),
+                TeamSeasonEntry.team_season_entry_id == totals.c.team_season_entry_id,
             )
+            .where(totals.c.scored_results > 0)
             .group_by(TeamSeasonEntry.team_season_entry_id, TeamSeasonEntry.clan_tag)
-            .having(func.count(func.distinct(Race.race_id)) >= min_races)
+            .having(func.count() >= min_races)
             .order_by(desc("average"), desc("races"), TeamSeasonEntry.clan_tag)
         )
-        statement = apply_match_set(statement, match_set)
-        statement = apply_analytics_race_filter(statement, session)
         rows = session.execute(statement).all()
         return [
             {
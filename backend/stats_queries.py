@@ -1,6 +1,13 @@
+import base64
+import json
+from collections import defaultdict
 from dataclasses import dataclass
 
+from analytics_eligibility import analytics_data_version
 from database import get_session_factory
+from engine_cache import EngineCache
+from entity_search import search_entity_ids
+from match_detail_snapshots import load_match_detail_snapshot, save_match_detail_snapshot
 from match_sets import apply_match_set, normalize_match_set
 from models import (
     Division,
@@ -25,10 +32,15 @@ from models import (
     TrackAlias,
 )
 from player_display_names import _display_names_for_players
-from sqlalchemy import and_, desc, func, select
+from scope_catalog import scope_catalog
+from sqlalchemy import and_, desc, exists, func, select, tuple_
 
 SessionLocal = get_session_factory()
 
+MAX_CACHED_NAME_INDEXES = 64
+
+_name_index_cache = EngineCache(MAX_CACHED_NAME_INDEXES)
+
 
 class AnalyticsError(ValueError):
     pass
@@ -94,31 +106,17 @@ def _score_filter():
 def _get_scope(session, season=None, division=None, league_code="ctc"):
     season_code = normalize_season_code(season)
     division_code = normalize_division_code(division)
+    catalog = scope_catalog(session, league_code)
 
     if season_code is None:
-        stmt = select(Season).where(Season.league_code == league_code)
-        if division_code is not None:
-            stmt = stmt.join(Division, Division.season_id == Season.season_id).where(
-                Division.division_code == division_code
-            )
-        stmt = stmt.order_by(desc(Season.season_number), desc(Season.season_id)).limit(1)
-        season_obj = session.execute(stmt).scalar_one_or_none()
+        season_obj = catalog.latest_season(division_code)
     else:
-        season_obj = session.execute(
-            select(Season).where(
-                Season.league_code == league_code,
-                Season.season_code == season_code,
-            )
-        ).scalar_one_or_none()
+        season_obj = catalog.seasons_by_code.get(season_code)
 
     if season_obj is None:
         raise AnalyticsError("Invalid season")
 
-    division_stmt = select(Division).where(Division.season_id == season_obj.season_id)
-    if division_code is not None:
-        division_stmt = division_stmt.where(Division.division_code == division_code)
-    division_stmt = division_stmt.order_by(Division.division_code).limit(1)
-    division_obj = session.execute(division_stmt).scalar_one_or_none()
+    division_obj = catalog.division(season_obj.season_id, division_code)
 
     if division_obj is None:
         raise AnalyticsError(
@@ -181,31 +179,68 @@ def _player_candidate_dict(row):
     }
 
 
-def _resolve_player(session, player, scope):
-    query_text = player.strip()
-    query = query_text.lower()
-    if not query_text:
-        raise AnalyticsError("Player name is required")
+@dataclass(frozen=True)
+class PlayerNameIndex:
+    """A scope's player rows with lowercased names and aliases mapped to row positions."""
+
+    rows: tuple[PlayerLookupRow, ...]
+    by_name: dict
+    by_alias: dict
+
 
-    direct_rows = _valid_players(session, scope)
-    direct_matches = []
-    for row in direct_rows:
-        names = [
+def _build_player_name_index(session, scope):
+    rows = tuple(_valid_players(session, scope))
+    by_name = defaultdict(list)
+    positions_by_player = defaultdict(list)
+    for position, row in enumerate(rows):
+        positions_by_player[row.player_id].append(position)
+        names = (
             row.display_name,
             row.primary_lounge_name,
             row.primary_mii_name,
             row.canonical_name,
-        ]
-        if any(name and name.lower() == query for name in names):
-            direct_matches.append(row)
+        )
+        for name in dict.fromkeys(name.lower() for name in names if name):
+            by_name[name].append(position)
+
+    alias_players = defaultdict(set)
+    if positions_by_player:
+        for player_id, alias in session.execute(
+            select(PlayerAlias.player_id, func.lower(PlayerAlias.alias_value)).where(
+                PlayerAlias.player_id.in_(list(positions_by_player))
+            )
+        ):
+            alias_players[alias].add(player_id)
+    return PlayerNameIndex(
+        rows=rows,
+        by_name={name: tuple(positions) for name, positions in by_name.items()},
+        by_alias={
+            alias: tuple(
+                sorted(position for player_id in ids for position in positions_by_player[player_id])
+            )
+            for alias, ids in alias_players.items()
+        },
+    )
 
-    alias_player_ids = {
-        row[0]
-        for row in session.execute(
-            select(PlayerAlias.player_id).where(func.lower(PlayerAlias.alias_value) == query)
-        ).all()
-    }
-    alias_matches = [row for row in direct_rows if row.player_id in alias_player_ids]
+
+def _player_name_index(session, scope):
+    """Return the scope's player name index, building it at most once per data version."""
+    key = (scope.season_id, scope.division_id, analytics_data_version(session))
+    return _name_index_cache.get_or_build(
+        session, key, lambda: _build_player_name_index(session, scope)
+    )
+
+
+def _resolve_player(session, player, scope):
+    query_text = player.strip()
+    query = query_text.lower()
+    if not query_text:
+        raise AnalyticsError("Player name is required")
+
+    index = _player_name_index(session, scope)
+    direct_rows = index.rows
+    direct_matches = [direct_rows[position] for position in index.by_name.get(query, ())]
+    alias_matches = [direct_rows[position] for position in index.by_alias.get(query, ())]
 
     matches_by_id = {row.player_id: row for row in direct_matches + alias_matches}
     matches = list(matches_by_id.values())
@@ -223,27 +258,15 @@ def _resolve_player(session, player, scope):
     return matches[0]
 
 
-def _resolve_team(session, team, scope):
+def _resolve_team(session, team, scope, league_code="ctc"):
     if not team or not team.strip():
         raise AnalyticsError("Team is required")
-    query = team.strip().lower()
-    row = session.execute(
-        select(
-            Team.team_id,
-            TeamSeasonEntry.team_season_entry_id,
-            TeamSeasonEntry.clan_tag,
-            TeamSeasonEntry.display_name,
-            Team.canonical_name,
-        )
-        .join(Team, Team.team_id == TeamSeasonEntry.team_id)
-        .where(
-            TeamSeasonEntry.season_id == scope.season_id,
-            TeamSeasonEntry.division_id == scope.division_id,
-            func.lower(TeamSeasonEntry.clan_tag) == query,
-        )
-    ).first()
+    catalog = scope_catalog(session, league_code)
+    row = catalog.team(scope.season_id, scope.division_id, team)
     if row is None:
-        valid_teams = list_teams(season=scope.season_code, division=scope.division_code)
+        valid_teams = [
+            entry.clan_tag for entry in catalog.season_teams(scope.season_id, scope.division_id)
+        ]
         raise AnalyticsError(f"Invalid Team Name, Valid Teams: {valid_teams}")
     return row
 
@@ -251,19 +274,20 @@ def _resolve_team(session, team, scope):
 def _resolve_track(session, track, scope, match_set="regular", league_code="ctc"):
     if not track or not track.strip():
         raise AnalyticsError("Track name is required")
-    query = track.strip().lower()
-    statement = (
-        select(Track.track_id, Track.canonical_name)
-        .join(Race, Race.track_id == Track.track_id)
-        .join(Match, Match.match_id == Race.match_id)
-        .where(
-            Match.season_id == scope.season_id,
-            Match.division_id == scope.division_id,
-            func.lower(Track.canonical_name) == query,
+    row = scope_catalog(session, league_code).track(track)
+    if row is not None:
+        raced = (
+            select(Race.race_id)
+            .join(Match, Match.match_id == Race.match_id)
+            .where(
+                Race.track_id == row.track_id,
+                Match.season_id == scope.season_id,
+                Match.division_id == scope.division_id,
+            )
+            .limit(1)
         )
-        .group_by(Track.track_id)
-    )
-    row = session.execute(apply_match_set(statement, match_set)).first()
+        if session.scalar(apply_match_set(raced, match_set)) is None:
+            row = None
     if row is None:
         valid_tracks = list_tracks(
             league_code=league_code,
@@ -279,7 +303,7 @@ def list_players(season=None, division=None, league_code="ctc"):
     with SessionLocal() as session:
         scope = _get_scope(session, season=season, division=division, league_code=league_code)
         players = {}
-        for row in _valid_players(session, scope):
+        for row in _player_name_index(session, scope).rows:
             display_name = _display_player(row)
             if display_name:
                 players[display_name.lower()] = display_name
@@ -290,7 +314,7 @@ def list_player_directory(season=None, division=None, league_code="ctc"):
     with SessionLocal() as session:
         scope = _get_scope(session, season=season, division=division, league_code=league_code)
         players = {}
-        for row in _valid_players(session, scope):
+        for row in _player_name_index(session, scope).rows:
             display_name = _display_player(row)
             if not display_name:
                 continue
@@ -324,22 +348,11 @@ def find_player_identities(friend_code=None, query=None, limit=12):
             )
             reason = "exact_friend_code" if player_ids else "none"
         elif query:
-            pattern = f"%{query.lower()}%"
-            player_id_match = int(query) if query.isdigit() else None
-            player_ids = list(
-                session.scalars(
-                    select(Player.player_id)
-                    .outerjoin(PlayerAlias, PlayerAlias.player_id == Player.player_id)
-                    .where(
-                        (Player.player_id == player_id_match)
-                        | func.lower(func.coalesce(Player.canonical_name, "")).like(pattern)
-                        | func.lower(func.coalesce(PlayerAlias.alias_value, "")).like(pattern)
-                    )
-                    .distinct()
-                    .order_by(Player.player_id)
-                    .limit(limit)
-                )
-            )
+            player_ids = search_entity_ids(session, "players", query, limit)
+            if query.isdigit() and session.get(Player, int(query)) is not None:
+                # An exact player id outranks every name match.
+                player_ids = [int(query), *(pid for pid in player_ids if pid != int(query))]
+                player_ids = player_ids[:limit]
             reason = "player_search" if player_ids else "none"
 
         if not player_ids:
@@ -350,6 +363,8 @@ def find_player_identities(friend_code=None, query=None, limit=12):
                 Player.player_id.in_(player_ids)
             )
         ).all()
+        positions = {player_id: position for position, player_id in enumerate(player_ids)}
+        players.sort(key=lambda row: positions[row.player_id])
         codes = session.execute(
             select(PlayerFriendCode.player_id, PlayerFriendCode.friend_code)
             .where(PlayerFriendCode.player_id.in_(player_ids))
@@ -395,14 +410,18 @@ def search_tracks(query=None, limit=500, league_code="ctc", include_other_league
         if not include_other_leagues:
             statement = statement.where(func.lower(Track.league_code) == league_code.casefold())
         if query:
-            pattern = f"%{query}%"
-            matching_ids = select(TrackAlias.track_id).where(
-                func.lower(TrackAlias.alias_value).like(pattern)
+            ranked_ids = search_entity_ids(
+                session,
+                "tracks",
+                query,
+                limit,
+                league_code=None if include_other_leagues else league_code,
             )
-            statement = statement.where(
-                func.lower(Track.canonical_name).like(pattern) | Track.track_id.in_(matching_ids)
-            )
-        rows = session.execute(statement.limit(limit)).all()
+            rows = session.execute(statement.where(Track.track_id.in_(ranked_ids))).all()
+            positions = {track_id: position for position, track_id in enumerate(ranked_ids)}
+            rows.sort(key=lambda row: positions[row.track_id])
+        else:
+            rows = session.execute(statement.limit(limit)).all()
         track_ids = [row.track_id for row in rows]
         aliases_by_track: dict[int, list[str]] = {track_id: [] for track_id in track_ids}
         if track_ids:
@@ -425,24 +444,14 @@ def search_tracks(query=None, limit=500, league_code="ctc", include_other_league
 
 def list_seasons(league_code="ctc"):
     with SessionLocal() as session:
-        rows = session.execute(
-            select(
-                Season.season_code,
-                Season.season_number,
-                Season.name,
-                Season.status,
-            )
-            .where(Season.league_code == league_code)
-            .order_by(desc(Season.season_number), desc(Season.season_id))
-        ).all()
         return [
             {
-                "season": row.season_code,
-                "season_number": row.season_number,
-                "name": row.name,
-                "status": row.status,
+                "season": season.season_code,
+                "season_number": season.season_number,
+                "name": season.name,
+                "status": season.status,
             }
-            for row in rows
+            for season in scope_catalog(session, league_code).seasons
         ]
 
 
@@ -512,26 +521,21 @@ def list_team_scopes():
 def list_divisions(season=None, league_code="ctc"):
     with SessionLocal() as session:
         scope = _get_scope(session, season=season, division=None, league_code=league_code)
-        rows = session.execute(
-            select(Division.division_code, Division.division_name)
-            .where(Division.season_id == scope.season_id)
-            .order_by(Division.division_code)
-        ).all()
-        return [{"division": row.division_code, "name": row.division_name} for row in rows]
+        return [
+            {"division": division.division_code, "name": division.division_name}
+            for division in scope_catalog(session, league_code).divisions[scope.season_id]
+        ]
 
 
 def list_teams(season=None, division=None, league_code="ctc"):
     with SessionLocal() as session:
         scope = _get_scope(session, season=season, division=division, league_code=league_code)
-        rows = session.execute(
-            select(TeamSeasonEntry.clan_tag)
-            .where(
-                TeamSeasonEntry.season_id == scope.season_id,
-                TeamSeasonEntry.division_id == scope.division_id,
+        return [
+            team.clan_tag
+            for team in scope_catalog(session, league_code).season_teams(
+                scope.season_id, scope.division_id
             )
-            .order_by(TeamSeasonEntry.clan_tag)
-        ).scalars()
-        return list(rows)
+        ]
 
 
 def list_tracks(season=None, division=None, match_set="regular", league_code="ctc"):
@@ -575,107 +579,180 @@ def _playoff_match_display_label(
     return stored_label
 
 
-def list_matches(season=None, division=None, team=None, match_set="regular", league_code="ctc"):
-    with SessionLocal() as session:
-        scope = _get_scope(session, season=season, division=division, league_code=league_code)
-        match_set = normalize_match_set(match_set)
-        playoff_config = session.get(DivisionPlayoffConfig, scope.division_id)
-        statement = (
-            select(
-                Match.match_id,
-                Match.match_type,
-                Match.week_number,
-                Match.playoff_series_id,
-                Match.series_match_number,
-                PlayoffSeries.stage.label("playoff_stage"),
-                PlayoffSeries.series_number.label("playoff_series_number"),
-                Match.match_label,
-                Match.races_played,
-                Match.import_status,
-                Match.review_notes,
+# Listing order as (expression, python type) pairs with NULLs spelled out, so a cursor can
+# resume after any row with one row comparison. NULLs sort last, as in an ascending ORDER BY.
+MATCH_SORT_KEYS = (
+    (Match.match_type, str),
+    (Match.week_number.is_(None), bool),
+    (func.coalesce(Match.week_number, 0), int),
+    (PlayoffSeries.stage.is_(None), bool),
+    (func.coalesce(PlayoffSeries.stage, ""), str),
+    (PlayoffSeries.series_number.is_(None), bool),
+    (func.coalesce(PlayoffSeries.series_number, 0), int),
+    (Match.series_match_number.is_(None), bool),
+    (func.coalesce(Match.series_match_number, 0), int),
+    (Match.match_label, str),
+    (Match.match_id, int),
+)
+
+
+def _encode_match_cursor(row):
+    values = [row[f"sort_key_{index}"] for index in range(len(MATCH_SORT_KEYS))]
+    token = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(token).decode("ascii").rstrip("=")
+
+
+def _decode_match_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as error:
+        raise AnalyticsError("Invalid cursor") from error
+    if not isinstance(values, list) or len(values) != len(MATCH_SORT_KEYS):
+        raise AnalyticsError("Invalid cursor")
+    for value, (_expression, value_type) in zip(values, MATCH_SORT_KEYS, strict=True):
+        if type(value) is not value_type:
+            raise AnalyticsError("Invalid cursor")
+    return values
+
+
+def _match_summaries(session, scope, team, match_set, limit=None, cursor=None):
+    """Return the scope's match summaries in listing order and the cursor after the last one.
+
+    The team filter and the cursor are applied in SQL, so a page reads only its own
+    matches and their teams; the cursor is None once the listing is exhausted.
+    """
+    playoff_config = session.get(DivisionPlayoffConfig, scope.division_id)
+    sort_keys = [expression for expression, _value_type in MATCH_SORT_KEYS]
+    statement = (
+        select(
+            Match.match_id,
+            Match.match_type,
+            Match.week_number,
+            Match.playoff_series_id,
+            Match.series_match_number,
+            PlayoffSeries.stage.label("playoff_stage"),
+            PlayoffSeries.series_number.label("playoff_series_number"),
+            Match.match_label,
+            Match.races_played,
+            Match.import_status,
+            Match.review_notes,
+            *(key.label(f"sort_key_{index}") for index, key in enumerate(sort_keys)),
+        )
+        .where(
+            Match.season_id == scope.season_id,
+            Match.division_id == scope.division_id,
+        )
+        .outerjoin(
+            PlayoffSeries,
+            PlayoffSeries.playoff_series_id == Match.playoff_series_id,
+        )
+        .order_by(*sort_keys)
+    )
+    team_query = team.strip().lower() if team else ""
+    if team_query:
+        statement = statement.where(
+            exists().where(
+                MatchTeam.match_id == Match.match_id,
+                TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
+                func.lower(TeamSeasonEntry.clan_tag) == team_query,
             )
-            .where(
-                Match.season_id == scope.season_id,
-                Match.division_id == scope.division_id,
+        )
+    if cursor:
+        statement = statement.where(tuple_(*sort_keys) > tuple_(*_decode_match_cursor(cursor)))
+    if limit is not None:
+        # One extra row tells whether another page follows.
+        statement = statement.limit(limit + 1)
+    match_rows = session.execute(apply_match_set(statement, match_set)).mappings().all()
+    next_cursor = None
+    if limit is not None and len(match_rows) > limit:
+        match_rows = match_rows[:limit]
+        next_cursor = _encode_match_cursor(match_rows[-1])
+    match_ids = [row["match_id"] for row in match_rows]
+
+    team_rows = []
+    if match_ids:
+        team_rows = session.execute(
+            select(
+                MatchTeam.match_id,
+                MatchTeam.final_score,
+                TeamSeasonEntry.clan_tag,
             )
-            .outerjoin(
-                PlayoffSeries,
-                PlayoffSeries.playoff_series_id == Match.playoff_series_id,
+            .join(
+                TeamSeasonEntry,
+                TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
             )
+            .where(MatchTeam.match_id.in_(match_ids))
             .order_by(
-                Match.match_type,
-                Match.week_number,
-                PlayoffSeries.stage,
-                PlayoffSeries.series_number,
-                Match.series_match_number,
-                Match.match_label,
-                Match.match_id,
+                MatchTeam.match_id,
+                desc(func.coalesce(MatchTeam.final_score, -1)),
+                MatchTeam.match_team_id,
             )
-        )
-        match_rows = session.execute(apply_match_set(statement, match_set)).all()
-        match_ids = [row.match_id for row in match_rows]
+        ).all()
 
-        team_rows = []
-        if match_ids:
-            team_rows = session.execute(
-                select(
-                    MatchTeam.match_id,
-                    MatchTeam.final_score,
-                    TeamSeasonEntry.clan_tag,
-                )
-                .join(
-                    TeamSeasonEntry,
-                    TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
-                )
-                .where(MatchTeam.match_id.in_(match_ids))
-                .order_by(
-                    MatchTeam.match_id,
-                    desc(func.coalesce(MatchTeam.final_score, -1)),
-                    MatchTeam.match_team_id,
-                )
-            ).all()
+    teams_by_match = {match_id: [] for match_id in match_ids}
+    scores_by_match = {match_id: [] for match_id in match_ids}
+    for row in team_rows:
+        teams_by_match.setdefault(row.match_id, []).append(row.clan_tag)
+        scores_by_match.setdefault(row.match_id, []).append(str(row.final_score))
+
+    matches = [
+        {
+            "match_id": row["match_id"],
+            "match_type": row["match_type"],
+            "week": row["week_number"],
+            "playoff_series_id": row["playoff_series_id"],
+            "series_match_number": row["series_match_number"],
+            "playoff_stage": row["playoff_stage"],
+            "playoff_series_number": row["playoff_series_number"],
+            "label": _playoff_match_display_label(
+                row["match_label"],
+                row["playoff_stage"],
+                row["playoff_series_number"],
+                row["series_match_number"],
+                playoff_config,
+            ),
+            "playoff_semifinal_series_count": (
+                playoff_config.semifinal_series_count
+                if row["match_type"] == "playoff" and playoff_config
+                else None
+            ),
+            "races": row["races_played"],
+            "teams": " vs ".join(teams_by_match.get(row["match_id"], [])),
+            "scores": " - ".join(scores_by_match.get(row["match_id"], [])),
+            "import_status": row["import_status"],
+            "review_notes": row["review_notes"],
+        }
+        for row in match_rows
+    ]
+    return matches, next_cursor
 
-        teams_by_match = {match_id: [] for match_id in match_ids}
-        scores_by_match = {match_id: [] for match_id in match_ids}
-        for row in team_rows:
-            teams_by_match.setdefault(row.match_id, []).append(row.clan_tag)
-            scores_by_match.setdefault(row.match_id, []).append(str(row.final_score))
 
-        team_query = team.strip().lower() if team else ""
-        matches = [
-            {
-                "match_id": row.match_id,
-                "match_type": row.match_type,
-                "week": row.week_number,
-                "playoff_series_id": row.playoff_series_id,
-                "series_match_number": row.series_match_number,
-                "playoff_stage": row.playoff_stage,
-                "playoff_series_number": row.playoff_series_number,
-                "label": _playoff_match_display_label(
-                    row.match_label,
-                    row.playoff_stage,
-                    row.playoff_series_number,
-                    row.series_match_number,
-                    playoff_config,
-                ),
-                "playoff_semifinal_series_count": (
-                    playoff_config.semifinal_series_count
-                    if row.match_type == "playoff" and playoff_config
-                    else None
-                ),
-                "races": row.races_played,
-                "teams": " vs ".join(teams_by_match.get(row.match_id, [])),
-                "scores": " - ".join(scores_by_match.get(row.match_id, [])),
-                "import_status": row.import_status,
-                "review_notes": row.review_notes,
-            }
-            for row in match_rows
-            if not team_query
-            or team_query in [tag.lower() for tag in teams_by_match.get(row.match_id, [])]
-        ]
+def list_matches(season=None, division=None, team=None, match_set="regular", league_code="ctc"):
+    with SessionLocal() as session:
+        scope = _get_scope(session, season=season, division=division, league_code=league_code)
+        matches, _cursor = _match_summaries(session, scope, team, normalize_match_set(match_set))
         return matches
 
 
+def list_match_page(
+    season=None,
+    division=None,
+    team=None,
+    match_set="regular",
+    league_code="ctc",
+    limit=50,
+    cursor=None,
+):
+    """Return one keyset page of list_matches and the cursor of the page after it."""
+    with SessionLocal() as session:
+        scope = _get_scope(session, season=season, division=division, league_code=league_code)
+        matches, next_cursor = _match_summaries(
+            session, scope, team, normalize_match_set(match_set), limit=limit, cursor=cursor
+        )
+        return {"matches": matches, "next_cursor": next_cursor}
+
+
 def list_playoff_series(season=None, division=None, team=None, league_code="ctc"):
     with SessionLocal() as session:
         scope = _get_scope(session, season=season, division=division, league_code=league_code)
@@ -819,245 +896,244 @@ def _team_penalties(session, match_id):
 
 
 def get_match_detail(match_id, session=None):
+    """Render a match; without a session the stored snapshot is served and filled on a miss."""
     if session is None:
         with SessionLocal() as owned_session:
-            return get_match_detail(match_id, session=owned_session)
-    if session is not None:
-        match = session.get(Match, match_id)
-        if not match:
-            raise AnalyticsError("Invalid match")
-
-        season = session.get(Season, match.season_id)
-        division = session.get(Division, match.division_id)
-        playoff_series = (
-            session.get(PlayoffSeries, match.playoff_series_id)
-            if match.playoff_series_id is not None
-            else None
+            detail = load_match_detail_snapshot(owned_session, match_id)
+            if detail is None:
+                detail = get_match_detail(match_id, session=owned_session)
+                save_match_detail_snapshot(owned_session, match_id, detail)
+                owned_session.commit()
+            return detail
+
+    match = session.get(Match, match_id)
+    if not match:
+        raise AnalyticsError("Invalid match")
+
+    season = session.get(Season, match.season_id)
+    division = session.get(Division, match.division_id)
+    playoff_series = (
+        session.get(PlayoffSeries, match.playoff_series_id)
+        if match.playoff_series_id is not None
+        else None
+    )
+    playoff_config = (
+        session.get(DivisionPlayoffConfig, match.division_id)
+        if playoff_series is not None
+        else None
+    )
+    race_rows = session.execute(
+        select(Race.race_id, Race.race_number, Race.track_name_raw, Track.canonical_name)
+        .join(Track, Track.track_id == Race.track_id)
+        .where(Race.match_id == match.match_id)
+        .order_by(Race.race_number)
+    ).all()
+    race_ids = [row.race_id for row in race_rows]
+    race_index_by_id = {race_id: index for index, race_id in enumerate(race_ids)}
+
+    match_teams = session.execute(
+        select(
+            MatchTeam.match_team_id,
+            MatchTeam.team_season_entry_id,
+            MatchTeam.raw_team_key,
+            MatchTeam.raw_total_score,
+            MatchTeam.team_penalty_points,
+            MatchTeam.final_score,
+            MatchTeam.hex_color,
+            Team.team_id,
+            TeamSeasonEntry.clan_tag,
+            TeamSeasonEntry.display_name,
         )
-        playoff_config = (
-            session.get(DivisionPlayoffConfig, match.division_id)
-            if playoff_series is not None
-            else None
+        .join(
+            TeamSeasonEntry,
+            TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
         )
-        race_rows = session.execute(
-            select(Race.race_id, Race.race_number, Race.track_name_raw, Track.canonical_name)
-            .join(Track, Track.track_id == Race.track_id)
-            .where(Race.match_id == match.match_id)
-            .order_by(Race.race_number)
-        ).all()
-        race_ids = [row.race_id for row in race_rows]
-        race_index_by_id = {race_id: index for index, race_id in enumerate(race_ids)}
-
-        match_teams = session.execute(
-            select(
-                MatchTeam.match_team_id,
-                MatchTeam.team_season_entry_id,
-                MatchTeam.raw_team_key,
-                MatchTeam.raw_total_score,
-                MatchTeam.team_penalty_points,
-                MatchTeam.final_score,
-                MatchTeam.hex_color,
-                Team.team_id,
-                TeamSeasonEntry.clan_tag,
-                TeamSeasonEntry.display_name,
-            )
-            .join(
-                TeamSeasonEntry,
-                TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
-            )
-            .join(Team, Team.team_id == TeamSeasonEntry.team_id)
-            .where(MatchTeam.match_id == match.match_id)
-            .order_by(
-                desc(func.coalesce(MatchTeam.final_score, -1)),
-                MatchTeam.match_team_id,
-            )
-        ).all()
-        team_penalties = _team_penalties(session, match.match_id)
-
-        player_rows = session.execute(
-            select(
-                MatchPlayer.match_player_id,
-                MatchPlayer.match_team_id,
-                MatchPlayer.player_id,
-                MatchPlayer.friend_code_raw,
-                MatchPlayer.lounge_name_raw,
-                MatchPlayer.mii_name_raw,
-                MatchPlayer.table_name_raw,
-                MatchPlayer.raw_total_score,
-                MatchPlayer.player_penalty_points,
-                MatchPlayer.subbed_out,
-                Player.canonical_name,
-            )
-            .join(Player, Player.player_id == MatchPlayer.player_id)
-            .join(MatchTeam, MatchTeam.match_team_id == MatchPlayer.match_team_id)
-            .where(MatchTeam.match_id == match.match_id)
-            .order_by(
-                MatchPlayer.match_team_id,
-                desc(MatchPlayer.raw_total_score),
-                MatchPlayer.match_player_id,
-            )
-        ).all()
-        display_names = _display_names_for_players(
-            session,
-            [row.player_id for row in player_rows],
-            {row.player_id: row.canonical_name for row in player_rows},
+        .join(Team, Team.team_id == TeamSeasonEntry.team_id)
+        .where(MatchTeam.match_id == match.match_id)
+        .order_by(
+            desc(func.coalesce(MatchTeam.final_score, -1)),
+            MatchTeam.match_team_id,
         )
+    ).all()
+    team_penalties = _team_penalties(session, match.match_id)
 
-        scores_by_match_player = {
-            row.match_player_id: [None for _ in race_rows] for row in player_rows
-        }
-        positions_by_match_player = {
-            row.match_player_id: [None for _ in race_rows] for row in player_rows
-        }
-        result_rows = session.execute(
-            select(
-                RacePlayerResult.match_player_id,
-                RacePlayerResult.race_id,
-                RacePlayerResult.score,
-                RacePlayerResult.position,
-                RacePlayerResult.role,
-            ).where(RacePlayerResult.race_id.in_(race_ids))
-        ).all()
-        roles_by_match_player = {
-            row.match_player_id: ["unknown" for _ in race_rows] for row in player_rows
-        }
-        for row in result_rows:
-            index = race_index_by_id.get(row.race_id)
-            if index is None or row.match_player_id not in scores_by_match_player:
-                continue
-            scores_by_match_player[row.match_player_id][index] = row.score
-            positions_by_match_player[row.match_player_id][index] = row.position
-            roles_by_match_player[row.match_player_id][index] = row.role
-
-        missing_scores_by_team = {
-            row.match_team_id: [None for _ in race_rows] for row in match_teams
-        }
-        missing_reasons_by_team = {
-            row.match_team_id: [[] for _ in race_rows] for row in match_teams
-        }
-        team_result_rows = session.execute(
-            select(
-                RaceTeamResult.match_team_id,
-                RaceTeamResult.race_id,
-                RaceTeamResult.score,
-                RaceTeamResult.reason,
-            ).where(
-                RaceTeamResult.race_id.in_(race_ids),
-                RaceTeamResult.result_type == "missing_player",
-            )
-        ).all()
-        for result in team_result_rows:
-            index = race_index_by_id.get(result.race_id)
-            scores = missing_scores_by_team.get(result.match_team_id)
-            reasons = missing_reasons_by_team.get(result.match_team_id)
-            if index is None or scores is None or reasons is None:
-                continue
-            scores[index] = (scores[index] or 0) + result.score
-            reasons[index].append(result.reason)
+    player_rows = session.execute(
+        select(
+            MatchPlayer.match_player_id,
+            MatchPlayer.match_team_id,
+            MatchPlayer.player_id,
+            MatchPlayer.friend_code_raw,
+            MatchPlayer.lounge_name_raw,
+            MatchPlayer.mii_name_raw,
+            MatchPlayer.table_name_raw,
+            MatchPlayer.raw_total_score,
+            MatchPlayer.player_penalty_points,
+            MatchPlayer.subbed_out,
+            Player.canonical_name,
+        )
+        .join(Player, Player.player_id == MatchPlayer.player_id)
+        .join(MatchTeam, MatchTeam.match_team_id == MatchPlayer.match_team_id)
+        .where(MatchTeam.match_id == match.match_id)
+        .order_by(
+            MatchPlayer.match_team_id,
+            desc(MatchPlayer.raw_total_score),
+            MatchPlayer.match_player_id,
+        )
+    ).all()
+    display_names = _display_names_for_players(
+        session,
+        [row.player_id for row in player_rows],
+        {row.player_id: row.canonical_name for row in player_rows},
+    )
 
-        players_by_team = {row.match_team_id: [] for row in match_teams}
-        for row in player_rows:
-            players_by_team.setdefault(row.match_team_id, []).append(
-                {
-                    "match_player_id": row.match_player_id,
-                    "player_id": row.player_id,
-                    "name": display_names.get(row.player_id)
-                    or row.lounge_name_raw
-                    or row.table_name_raw
-                    or row.mii_name_raw
-                    or "",
-                    "friend_code": row.friend_code_raw,
-                    "total": row.raw_total_score,
-                    "penalties": row.player_penalty_points,
-                    "subbed_out": row.subbed_out,
-                    "scores": scores_by_match_player.get(row.match_player_id, []),
-                    "positions": positions_by_match_player.get(row.match_player_id, []),
-                    "roles": roles_by_match_player.get(row.match_player_id, []),
-                }
-            )
+    scores_by_match_player = {row.match_player_id: [None for _ in race_rows] for row in player_rows}
+    positions_by_match_player = {
+        row.match_player_id: [None for _ in race_rows] for row in player_rows
+    }
+    result_rows = session.execute(
+        select(
+            RacePlayerResult.match_player_id,
+            RacePlayerResult.race_id,
+            RacePlayerResult.score,
+            RacePlayerResult.position,
+            RacePlayerResult.role,
+        ).where(RacePlayerResult.race_id.in_(race_ids))
+    ).all()
+    roles_by_match_player = {
+        row.match_player_id: ["unknown" for _ in race_rows] for row in player_rows
+    }
+    for row in result_rows:
+        index = race_index_by_id.get(row.race_id)
+        if index is None or row.match_player_id not in scores_by_match_player:
+            continue
+        scores_by_match_player[row.match_player_id][index] = row.score
+        positions_by_match_player[row.match_player_id][index] = row.position
+        roles_by_match_player[row.match_player_id][index] = row.role
+
+    missing_scores_by_team = {row.match_team_id: [None for _ in race_rows] for row in match_teams}
+    missing_reasons_by_team = {row.match_team_id: [[] for _ in race_rows] for row in match_teams}
+    team_result_rows = session.execute(
+        select(
+            RaceTeamResult.match_team_id,
+            RaceTeamResult.race_id,
+            RaceTeamResult.score,
+            RaceTeamResult.reason,
+        ).where(
+            RaceTeamResult.race_id.in_(race_ids),
+            RaceTeamResult.result_type == "missing_player",
+        )
+    ).all()
+    for result in team_result_rows:
+        index = race_index_by_id.get(result.race_id)
+        scores = missing_scores_by_team.get(result.match_team_id)
+        reasons = missing_reasons_by_team.get(result.match_team_id)
+        if index is None or scores is None or reasons is None:
+            continue
+        scores[index] = (scores[index] or 0) + result.score
+        reasons[index].append(result.reason)
+
+    players_by_team = {row.match_team_id: [] for row in match_teams}
+    for row in player_rows:
+        players_by_team.setdefault(row.match_team_id, []).append(
+            {
+                "match_player_id": row.match_player_id,
+                "player_id": row.player_id,
+                "name": display_names.get(row.player_id)
+                or row.lounge_name_raw
+                or row.table_name_raw
+                or row.mii_name_raw
+                or "",
+                "friend_code": row.friend_code_raw,
+                "total": row.raw_total_score,
+                "penalties": row.player_penalty_points,
+                "subbed_out": row.subbed_out,
+                "scores": scores_by_match_player.get(row.match_player_id, []),
+                "positions": positions_by_match_player.get(row.match_player_id, []),
+                "roles": roles_by_match_player.get(row.match_player_id, []),
+            }
+        )
 
-        teams = []
-        for row in match_teams:
-            team_players = sorted(
-                players_by_team.get(row.match_team_id, []),
-                key=lambda player: (-int(player["total"] or 0), player["name"].lower()),
-            )
-            teams.append(
-                {
-                    "match_team_id": row.match_team_id,
-                    "team_season_entry_id": row.team_season_entry_id,
-                    "team_id": row.team_id,
-                    "tag": row.clan_tag,
-                    "name": row.display_name,
-                    "raw_team_key": row.raw_team_key,
-                    "hex_color": row.hex_color or "#3b82f6",
-                    "raw_total_score": row.raw_total_score,
-                    "team_penalties": row.team_penalty_points,
-                    "final_score": row.final_score,
-                    "penalty": team_penalties.get(row.match_team_id, {"points": 0, "notes": ""}),
-                    "missing_player": {
-                        "scores": missing_scores_by_team.get(row.match_team_id, []),
-                        "reasons": missing_reasons_by_team.get(row.match_team_id, []),
-                        "total": sum(
-                            score or 0
-                            for score in missing_scores_by_team.get(row.match_team_id, [])
-                        ),
-                    },
-                    "players": team_players,
-                }
-            )
+    teams = []
+    for row in match_teams:
+        team_players = sorted(
+            players_by_team.get(row.match_team_id, []),
+            key=lambda player: (-int(player["total"] or 0), player["name"].lower()),
+        )
+        teams.append(
+            {
+                "match_team_id": row.match_team_id,
+                "team_season_entry_id": row.team_season_entry_id,
+                "team_id": row.team_id,
+                "tag": row.clan_tag,
+                "name": row.display_name,
+                "raw_team_key": row.raw_team_key,
+                "hex_color": row.hex_color or "#3b82f6",
+                "raw_total_score": row.raw_total_score,
+                "team_penalties": row.team_penalty_points,
+                "final_score": row.final_score,
+                "penalty": team_penalties.get(row.match_team_id, {"points": 0, "notes": ""}),
+                "missing_player": {
+                    "scores": missing_scores_by_team.get(row.match_team_id, []),
+                    "reasons": missing_reasons_by_team.get(row.match_team_id, []),
+                    "total": sum(
+                        score or 0 for score in missing_scores_by_team.get(row.match_team_id, [])
+                    ),
+                },
+                "players": team_players,
+            }
+        )
 
-        cumulative = []
-        if len(teams) >= 2:
-            running = 0
-            for race_index in range(len(race_rows)):
-                team_totals = []
-                for team in teams[:2]:
-                    player_total = sum(
-                        player["scores"][race_index] or 0
-                        for player in team["players"]
-                        if race_index < len(player["scores"])
-                    )
-                    missing_scores = team["missing_player"]["scores"]
-                    missing_total = (
-                        missing_scores[race_index] or 0 if race_index < len(missing_scores) else 0
-                    )
-                    team_totals.append(player_total + missing_total)
-                running += team_totals[0] - team_totals[1]
-                cumulative.append(running)
+    cumulative = []
+    if len(teams) >= 2:
+        running = 0
+        for race_index in range(len(race_rows)):
+            team_totals = []
+            for team in teams[:2]:
+                player_total = sum(
+                    player["scores"][race_index] or 0
+                    for player in team["players"]
+                    if race_index < len(player["scores"])
+                )
+                missing_scores = team["missing_player"]["scores"]
+                missing_total = (
+                    missing_scores[race_index] or 0 if race_index < len(missing_scores) else 0
+                )
+                team_totals.append(player_total + missing_total)
+            running += team_totals[0] - team_totals[1]
+            cumulative.append(running)
 
-        return {
-            "match_id": match.match_id,
-            "match_type": match.match_type,
-            "season": season.season_code if season else "",
-            "division": division.division_code if division else "",
-            "week": match.week_number,
-            "playoff_series_id": match.playoff_series_id,
-            "series_match_number": match.series_match_number,
-            "playoff_stage": playoff_series.stage if playoff_series else None,
-            "playoff_series_number": playoff_series.series_number if playoff_series else None,
-            "label": _playoff_match_display_label(
-                match.match_label,
-                playoff_series.stage if playoff_series else None,
-                playoff_series.series_number if playoff_series else None,
-                match.series_match_number,
-                playoff_config,
-            ),
-            "playoff_semifinal_series_count": (
-                playoff_config.semifinal_series_count if playoff_config else None
-            ),
-            "format": match.format,
-            "races_played": match.races_played,
-            "import_status": match.import_status,
-            "review_notes": match.review_notes,
-            "tracks": [
-                {
-                    "race_number": row.race_number,
-                    "name": row.canonical_name or row.track_name_raw,
-                    "raw_name": row.track_name_raw,
-                }
-                for row in race_rows
-            ],
-            "teams": teams,
-            "differential": cumulative,
-        }
+    return {
+        "match_id": match.match_id,
+        "match_type": match.match_type,
+        "season": season.season_code if season else "",
+        "division": division.division_code if division else "",
+        "week": match.week_number,
+        "playoff_series_id": match.playoff_series_id,
+        "series_match_number": match.series_match_number,
+        "playoff_stage": playoff_series.stage if playoff_series else None,
+        "playoff_series_number": playoff_series.series_number if playoff_series else None,
+        "label": _playoff_match_display_label(
+            match.match_label,
+            playoff_series.stage if playoff_series else None,
+            playoff_series.series_number if playoff_series else None,
+            match.series_match_number,
+            playoff_config,
+        ),
+        "playoff_semifinal_series_count": (
+            playoff_config.semifinal_series_count if playoff_config else None
+        ),
+        "format": match.format,
+        "races_played": match.races_played,
+        "import_status": match.import_status,
+        "review_notes": match.review_notes,
+        "tracks": [
+            {
+                "race_number": row.race_number,
+                "name": row.canonical_name or row.track_name_raw,
+                "raw_name": row.track_name_raw,
+            }
+            for row in race_rows
+        ],
+        "teams": teams,
+        "differential": cumulative,
+    }
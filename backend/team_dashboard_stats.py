@@ -10,8 +10,8 @@ from models import (
     Player,
     PlayerFriendCode,
     Race,
+    RaceClassification,
     RacePlayerResult,
-    RaceTeamResult,
     Season,
     Team,
     TeamSeasonEntry,
@@ -32,16 +32,28 @@ from player_dashboard_stats import (
 )
 from player_display_names import _display_names_for_players
 from player_role_analytics import (
-    confirmed_5v5_race_ids,
+    ROLE_COVERAGE_KEYS,
+    ROLE_TOTAL_FIELDS,
     normalize_role,
-    role_coverage,
-    summarize_role_rows,
-    valid_race_score,
+    role_coverage_payload,
+    sql_classified_role,
+    sql_confirmed_5v5,
+    sql_role_totals,
+    sql_valid_race_score,
+    summarize_role_totals,
 )
-from sqlalchemy import select
+from race_team_totals import race_team_totals
+from sqlalchemy import Integer, and_, distinct, func, select, type_coerce
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
 
 SessionLocal = get_session_factory()
 PLACEHOLDER_LOGO = "/media/shared/team-logo-placeholder.svg"
+EMPTY_COUNTERPART_SUMMARY = {
+    "counterpart_races": 0,
+    "opponent_points_for": 0,
+    "opponent_points_against": 0,
+    "opponent_point_differential": 0,
+}
 
 
 def _team_identity(session, team, scope):
@@ -357,69 +369,106 @@ def _filtered_team_match_ids(session, team_id, scope, opponent_team_id=None, mat
     return [match_id for match_id in match_ids if opponent_team_id in teams_by_match[match_id]]
 
 
-def _bulk_bagger_counterpart_summaries(session, classified_rows, confirmed_ids):
-    candidate_players_by_race = defaultdict(set)
-    for row, classified_role, _source in classified_rows:
-        if classified_role == "bagger":
-            candidate_players_by_race[row.race_id].add(row.player_id)
+def _classified_team_results(session, team_id, match_ids):
+    """CTE of every result in the team's analytics races with its role classified in SQL.
 
-    empty_summary = {
-        "counterpart_races": 0,
-        "opponent_points_for": 0,
-        "opponent_points_against": 0,
-        "opponent_point_differential": 0,
-    }
-    player_ids = {
-        player_id
-        for race_players in candidate_players_by_race.values()
-        for player_id in race_players
-    }
-    summaries = {player_id: dict(empty_summary) for player_id in player_ids}
-    candidate_race_ids = set(candidate_players_by_race)
-    if not candidate_race_ids:
-        return summaries
-
-    all_rows = list(
-        session.scalars(
-            select(RacePlayerResult).where(RacePlayerResult.race_id.in_(candidate_race_ids))
+    Opponent rows are kept for the bagger counterpart comparison; on_team marks the
+    team's own rows.
+    """
+    race_ids = apply_analytics_race_filter(
+        select(Race.race_id).where(Race.match_id.in_(match_ids)), session
+    )
+    role, role_source = sql_classified_role(sql_confirmed_5v5(session, race_ids))
+    return (
+        select(
+            RacePlayerResult.player_id,
+            RacePlayerResult.race_id,
+            RacePlayerResult.match_team_id,
+            RacePlayerResult.score,
+            RacePlayerResult.position,
+            role.label("role"),
+            role_source.label("role_source"),
+            (TeamSeasonEntry.team_id == team_id).label("on_team"),
+            Race.race_number,
+            Match.match_id,
+            Match.week_number,
+            Season.season_number,
+        )
+        .join(Race, Race.race_id == RacePlayerResult.race_id)
+        .join(Match, Match.match_id == Race.match_id)
+        .join(Season, Season.season_id == Match.season_id)
+        .join(MatchTeam, MatchTeam.match_team_id == RacePlayerResult.match_team_id)
+        .join(
+            TeamSeasonEntry,
+            TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
         )
+        .outerjoin(RaceClassification, RaceClassification.race_id == RacePlayerResult.race_id)
+        .where(RacePlayerResult.race_id.in_(race_ids))
+        .cte("classified_results")
     )
-    _, all_classified = role_coverage(all_rows, confirmed_ids)
-    by_race = defaultdict(list)
-    for item in all_classified:
-        by_race[item[0].race_id].append(item)
-
-    for race_id, selected_player_ids in candidate_players_by_race.items():
-        race_rows = by_race[race_id]
-        if len({row.match_team_id for row, _role, _source in race_rows}) != 2:
-            continue
-        baggers_by_team = defaultdict(list)
-        for row, classified_role, _source in race_rows:
-            if classified_role == "bagger":
-                baggers_by_team[row.match_team_id].append(row)
-        if len(baggers_by_team) != 2 or any(
-            len(team_baggers) != 1 for team_baggers in baggers_by_team.values()
-        ):
-            continue
 
-        baggers = [team_baggers[0] for team_baggers in baggers_by_team.values()]
-        for player_id in selected_player_ids:
-            selected = [row for row in baggers if row.player_id == player_id]
-            if len(selected) != 1:
-                continue
-            opponent = next(row for row in baggers if row is not selected[0])
-            if not valid_race_score(selected[0].score) or not valid_race_score(opponent.score):
-                continue
-            summary = summaries[player_id]
-            summary["counterpart_races"] += 1
-            summary["opponent_points_for"] += selected[0].score
-            summary["opponent_points_against"] += opponent.score
-
-    for summary in summaries.values():
-        summary["opponent_point_differential"] = (
-            summary["opponent_points_for"] - summary["opponent_points_against"]
+
+def _coverage_columns(classified):
+    columns = []
+    for key in ROLE_COVERAGE_KEYS:
+        if key == "unknown":
+            condition = classified.c.role == "unknown"
+        else:
+            source, role = key.split("_")
+            condition = and_(classified.c.role == role, classified.c.role_source == source)
+        columns.append(func.count().filter(condition).label(key))
+    return columns
+
+
+def _bulk_bagger_counterpart_summaries(session, classified):
+    """Compare each team bagger with the lone opposing bagger in races where both teams
+    fielded exactly one bagger, for every player in one query."""
+    eligible_races = (
+        select(classified.c.race_id)
+        .group_by(classified.c.race_id)
+        .having(
+            func.count(distinct(classified.c.match_team_id)) == 2,
+            func.count().filter(classified.c.role == "bagger") == 2,
+            func.count(distinct(classified.c.match_team_id)).filter(classified.c.role == "bagger")
+            == 2,
+        )
+    )
+    selected = classified.alias("selected_bagger")
+    opponent = classified.alias("opponent_bagger")
+    rows = session.execute(
+        select(
+            selected.c.player_id,
+            func.count().label("counterpart_races"),
+            func.sum(selected.c.score).label("points_for"),
+            func.sum(opponent.c.score).label("points_against"),
+        )
+        .join(
+            opponent,
+            and_(
+                opponent.c.race_id == selected.c.race_id,
+                opponent.c.match_team_id != selected.c.match_team_id,
+                opponent.c.player_id != selected.c.player_id,
+            ),
+        )
+        .where(
+            selected.c.on_team,
+            selected.c.role == "bagger",
+            opponent.c.role == "bagger",
+            selected.c.race_id.in_(eligible_races),
+            sql_valid_race_score(selected.c.score),
+            sql_valid_race_score(opponent.c.score),
         )
-    return summaries
+        .group_by(selected.c.player_id)
+    ).all()
+    return {
+        row.player_id: {
+            "counterpart_races": row.counterpart_races,
+            "opponent_points_for": row.points_for,
+            "opponent_points_against": row.points_against,
+            "opponent_point_differential": row.points_for - row.points_against,
+        }
+        for row in rows
+    }
 
 
 def get_team_roster(
@@ -457,132 +506,115 @@ def get_team_roster(
         if not session.get(Team, opponent_team_id):
             raise DashboardError("Unknown opponent filter.")
     match_ids = _filtered_team_match_ids(session, team_id, scope, opponent_team_id, match_set)
+    payload = {
+        "team_id": team_id,
+        "role": role,
+        "scope": {
+            **_scope_payload(scope),
+            "opponent_team_id": opponent_team_id,
+            "match_set": match_set,
+        },
+        "minimum_races": min_races,
+    }
     if not match_ids:
-        empty_coverage, _ = role_coverage([], set())
-        return {
-            "team_id": team_id,
-            "role": role,
-            "scope": {
-                **_scope_payload(scope),
-                "opponent_team_id": opponent_team_id,
-                "match_set": match_set,
-            },
-            "minimum_races": min_races,
-            "role_coverage": empty_coverage,
-            "players": [],
-        }
+        return {**payload, "role_coverage": role_coverage_payload({}), "players": []}
+
+    classified = _classified_team_results(session, team_id, match_ids)
+    selected = classified.c.role == role
+    appearance_order = (
+        func.coalesce(classified.c.season_number, 0),
+        func.coalesce(classified.c.week_number, 0),
+        classified.c.match_id,
+        classified.c.race_number,
+    )
 
-    statement = (
+    def appearance(*order):
+        return type_coerce(
+            func.array_agg(aggregate_order_by(classified.c.match_id, *order)).filter(selected),
+            ARRAY(Integer),
+        )[1]
+
+    rows = session.execute(
         select(
-            RacePlayerResult.player_id,
-            RacePlayerResult.race_id,
-            RacePlayerResult.match_team_id,
-            RacePlayerResult.score,
-            RacePlayerResult.position,
-            RacePlayerResult.role,
-            RacePlayerResult.role_source,
-            Race.race_number,
-            Match.match_id,
-            Match.match_label,
-            Match.format,
-            Match.week_number,
-            Season.season_code,
-            Season.season_number,
-            Division.division_code,
+            classified.c.player_id,
             Player.canonical_name,
+            *_coverage_columns(classified),
+            *sql_role_totals(classified.c.score, classified.c.position, selected),
+            func.count(distinct(classified.c.match_id)).filter(selected).label("matches"),
+            appearance(*appearance_order).label("first_match_id"),
+            appearance(*(column.desc() for column in appearance_order)).label("last_match_id"),
         )
-        .join(Race, Race.race_id == RacePlayerResult.race_id)
-        .join(Match, Match.match_id == Race.match_id)
-        .join(Season, Season.season_id == Match.season_id)
-        .join(Division, Division.division_id == Match.division_id)
-        .join(MatchTeam, MatchTeam.match_team_id == RacePlayerResult.match_team_id)
-        .join(
-            TeamSeasonEntry,
-            TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
-        )
-        .join(Player, Player.player_id == RacePlayerResult.player_id)
-        .where(
-            Match.match_id.in_(match_ids),
-            TeamSeasonEntry.team_id == team_id,
-        )
-        .order_by(Season.season_number, Match.week_number, Match.match_id, Race.race_number)
-    )
-    statement = apply_analytics_race_filter(statement, session)
-    rows = session.execute(statement).all()
-    confirmed = confirmed_5v5_race_ids(session, rows)
-    coverage, classified = role_coverage(rows, confirmed)
-    all_by_player = defaultdict(list)
-    by_player = defaultdict(lambda: {"classified": []})
-    for item in classified:
-        row, classified_role, _source = item
-        all_by_player[row.player_id].append(item)
-        if classified_role != role:
-            continue
-        by_player[row.player_id]["classified"].append(item)
+        .join(Player, Player.player_id == classified.c.player_id)
+        .where(classified.c.on_team)
+        .group_by(classified.c.player_id, Player.canonical_name)
+        .order_by(classified.c.player_id)
+    ).all()
 
+    coverage_counts = defaultdict(int)
+    for row in rows:
+        for key in ROLE_COVERAGE_KEYS:
+            coverage_counts[key] += getattr(row, key)
+    role_rows = [row for row in rows if row.races]
     display_names = _display_names_for_players(
         session,
-        by_player,
+        [row.player_id for row in role_rows],
         {row.player_id: row.canonical_name for row in rows if row.canonical_name},
     )
+    qualified = []
+    for row in role_rows:
+        metrics = summarize_role_totals(
+            {field: getattr(row, field) for field in ROLE_TOTAL_FIELDS}, role
+        )
+        if metrics["scored_races"] >= min_races:
+            qualified.append((row, metrics))
 
     counterpart_summaries = (
-        _bulk_bagger_counterpart_summaries(session, classified, confirmed)
-        if role == "bagger"
-        else {}
+        _bulk_bagger_counterpart_summaries(session, classified) if role == "bagger" else {}
     )
-
-    player_ids = list(by_player)
+    player_ids = [row.player_id for row, _metrics in qualified]
     codes_by_player = defaultdict(list)
-    for row in session.execute(
-        select(PlayerFriendCode.player_id, PlayerFriendCode.friend_code)
-        .where(PlayerFriendCode.player_id.in_(player_ids))
-        .order_by(PlayerFriendCode.friend_code)
-    ).all():
-        codes_by_player[row.player_id].append(row.friend_code)
+    appearances = {}
+    if qualified:
+        for code in session.execute(
+            select(PlayerFriendCode.player_id, PlayerFriendCode.friend_code)
+            .where(PlayerFriendCode.player_id.in_(player_ids))
+            .order_by(PlayerFriendCode.friend_code)
+        ).all():
+            codes_by_player[code.player_id].append(code.friend_code)
+        appearance_ids = {
+            match_id
+            for row, _metrics in qualified
+            for match_id in (row.first_match_id, row.last_match_id)
+        }
+        for match in session.execute(
+            select(Match.match_id, Match.week_number, Season.season_code, Division.division_code)
+            .join(Season, Season.season_id == Match.season_id)
+            .join(Division, Division.division_id == Match.division_id)
+            .where(Match.match_id.in_(appearance_ids))
+        ).all():
+            appearances[match.match_id] = {
+                "match_id": match.match_id,
+                "season": match.season_code,
+                "division": match.division_code,
+                "week": match.week_number,
+            }
 
     players = []
-    for player_id, data in by_player.items():
-        player_rows = [row for row, _role, _source in data["classified"]]
-        metrics = summarize_role_rows(data["classified"], role)
-        if metrics["scored_races"] < min_races:
-            continue
+    for row, metrics in qualified:
         if role == "bagger":
-            metrics.update(counterpart_summaries[player_id])
-        player_coverage, _ = role_coverage(
-            [item[0] for item in all_by_player[player_id]], confirmed
-        )
-        ordered = sorted(
-            player_rows,
-            key=lambda row: (
-                row.season_number or 0,
-                row.week_number or 0,
-                row.match_id,
-                row.race_number,
-            ),
-        )
-        first = ordered[0]
-        last = ordered[-1]
+            metrics.update(counterpart_summaries.get(row.player_id, EMPTY_COUNTERPART_SUMMARY))
         players.append(
             {
-                "player_id": player_id,
-                "name": display_names.get(player_id) or f"Player {player_id}",
-                "friend_codes": codes_by_player[player_id],
-                "matches": len({row.match_id for row in player_rows}),
+                "player_id": row.player_id,
+                "name": display_names.get(row.player_id) or f"Player {row.player_id}",
+                "friend_codes": codes_by_player[row.player_id],
+                "matches": row.matches,
                 "metrics": metrics,
-                "role_coverage": player_coverage,
-                "first_appearance": {
-                    "match_id": first.match_id,
-                    "season": first.season_code,
-                    "division": first.division_code,
-                    "week": first.week_number,
-                },
-                "last_appearance": {
-                    "match_id": last.match_id,
-                    "season": last.season_code,
-                    "division": last.division_code,
-                    "week": last.week_number,
-                },
+                "role_coverage": role_coverage_payload(
+                    {key: getattr(row, key) for key in ROLE_COVERAGE_KEYS}
+                ),
+                "first_appearance": appearances[row.first_match_id],
+                "last_appearance": appearances[row.last_match_id],
             }
         )
     sort_metric = "twelve_race_pace" if role == "runner" else "points_per_race"
@@ -594,18 +626,7 @@ def get_team_roster(
             row["name"].lower(),
         )
     )
-    return {
-        "team_id": team_id,
-        "role": role,
-        "scope": {
-            **_scope_payload(scope),
-            "opponent_team_id": opponent_team_id,
-            "match_set": match_set,
-        },
-        "minimum_races": min_races,
-        "role_coverage": coverage,
-        "players": players,
-    }
+    return {**payload, "role_coverage": role_coverage_payload(coverage_counts), "players": players}
 
 
 def get_team_tracks(
@@ -649,87 +670,43 @@ def get_team_tracks(
             "tracks": [],
         }
 
-    statement = (
+    race_ids = apply_analytics_race_filter(
+        select(Race.race_id).where(Race.match_id.in_(match_ids)), session
+    )
+    totals = race_team_totals(session, race_ids)
+    tracks = session.execute(
         select(
-            Race.race_id,
             Race.track_id,
-            Track.canonical_name.label("track_name"),
-            MatchTeam.match_team_id,
+            Track.canonical_name,
+            func.count().label("races"),
+            func.sum(totals.c.score).label("points"),
+            func.count().filter(totals.c.result == "win").label("wins"),
+            func.count().filter(totals.c.result == "tie").label("ties"),
         )
-        .join(Match, Match.match_id == Race.match_id)
+        .select_from(totals)
+        .join(Race, Race.race_id == totals.c.race_id)
         .join(Track, Track.track_id == Race.track_id)
-        .join(MatchTeam, MatchTeam.match_id == Match.match_id)
         .join(
             TeamSeasonEntry,
-            TeamSeasonEntry.team_season_entry_id == MatchTeam.team_season_entry_id,
-        )
-        .where(Match.match_id.in_(match_ids), TeamSeasonEntry.team_id == team_id)
-        .order_by(Race.race_id)
-    )
-    statement = apply_analytics_race_filter(statement, session)
-    own_rows = session.execute(statement).all()
-    race_ids = [row.race_id for row in own_rows]
-    totals = defaultdict(int)
-    for row in session.execute(
-        select(
-            RacePlayerResult.race_id,
-            RacePlayerResult.match_team_id,
-            RacePlayerResult.score,
-        ).where(
-            RacePlayerResult.race_id.in_(race_ids),
-            RacePlayerResult.score.between(0, 15),
-        )
-    ).all():
-        totals[(row.race_id, row.match_team_id)] += int(row.score)
-    for row in session.execute(
-        select(RaceTeamResult.race_id, RaceTeamResult.match_team_id, RaceTeamResult.score).where(
-            RaceTeamResult.race_id.in_(race_ids)
+            TeamSeasonEntry.team_season_entry_id == totals.c.team_season_entry_id,
         )
-    ).all():
-        totals[(row.race_id, row.match_team_id)] += int(row.score)
-
-    match_teams_by_race = defaultdict(set)
-    race_match_teams = session.execute(
-        select(Race.race_id, MatchTeam.match_team_id)
-        .join(MatchTeam, MatchTeam.match_id == Race.match_id)
-        .where(Race.race_id.in_(race_ids))
+        .where(TeamSeasonEntry.team_id == team_id)
+        .group_by(Race.track_id, Track.canonical_name)
+        .having(func.count() >= min_races)
     ).all()
-    for row in race_match_teams:
-        match_teams_by_race[row.race_id].add(row.match_team_id)
-
-    tracks = defaultdict(lambda: {"name": "", "scores": [], "wins": 0, "ties": 0})
-    for row in own_rows:
-        own_score = totals[(row.race_id, row.match_team_id)]
-        opponent_scores = [
-            totals[(row.race_id, match_team_id)]
-            for match_team_id in match_teams_by_race[row.race_id]
-            if match_team_id != row.match_team_id
-        ]
-        opponent_score = max(opponent_scores, default=None)
-        track = tracks[row.track_id]
-        track["name"] = row.track_name
-        track["scores"].append(own_score)
-        if opponent_score is not None and own_score > opponent_score:
-            track["wins"] += 1
-        elif opponent_score is not None and own_score == opponent_score:
-            track["ties"] += 1
-
-    results = []
-    for track_id, track in tracks.items():
-        scores = track["scores"]
-        if len(scores) < min_races:
-            continue
-        results.append(
-            {
-                "track_id": track_id,
-                "name": track["name"],
-                "races": len(scores),
-                "average_score": _round(sum(scores) / len(scores)),
-                "wins": track["wins"],
-                "ties": track["ties"],
-                "win_rate": _round(track["wins"] / len(scores) * 100),
-            }
-        )
+
+    results = [
+        {
+            "track_id": track.track_id,
+            "name": track.canonical_name,
+            "races": track.races,
+            "average_score": _round(int(track.points) / track.races),
+            "wins": track.wins,
+            "ties": track.ties,
+            "win_rate": _round(track.wins / track.races * 100),
+        }
+        for track in tracks
+    ]
     results.sort(key=lambda row: (-row["average_score"], -row["races"], row["name"].lower()))
     return {
         "team_id": team_id,
@@ -1,3 +1,4 @@
+from match_detail_snapshots import invalidate_match_detail_snapshots
 from models import Division, Season, Team, TeamAlias, TeamLeagueIdentity, TeamSeasonEntry
 from sqlalchemy import desc, func, select
 
@@ -168,4 +169,5 @@ def update_season_identity(session, team_id, entry_id, payload):
     entry.display_name = display_name
     entry.clan_tag = clan_tag
     session.flush()
+    invalidate_match_detail_snapshots(session, team_season_entry_ids=[entry_id])
     return get_team_identity(session, team_id), previous
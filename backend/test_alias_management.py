@@ -1,6 +1,6 @@
 import os
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from test_support import PostgreSQLTestDatabase, configure_test_environment
 
@@ -8,7 +8,9 @@ configure_test_environment()
 
 import admin_auth  # noqa: E402
 import alias_management  # noqa: E402
+import entity_search  # noqa: E402
 from app import app  # noqa: E402
+from entity_search import TrigramIndex  # noqa: E402
 from import_json_to_db import (  # noqa: E402
     detect_new_entries,
     load_database_team_aliases,
@@ -384,5 +386,41 @@ class AliasManagementTests(unittest.TestCase):
             )
 
 
+class TrigramIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = TrigramIndex.build(
+            [
+                (1, "Luigi Circuit"),
+                (2, "Mario Circuit"),
+                (3, "Circuit"),
+                (3, "rMC"),
+                (4, "DK Summit"),
+                (5, None),
+            ],
+            leagues={1: "ctc", 2: "ctc", 3: "gsc", 4: "ctc"},
+        )
+
+    def test_ranks_exact_prefix_substring_then_similar_names(self):
+        self.assertEqual(self.index.search("circuit", 10), [3, 1, 2])
+        self.assertEqual(self.index.search("luigi circut", 10), [1, 3])
+        self.assertEqual(self.index.search("rm", 10), [3])
+        self.assertEqual(self.index.search("circuit", 10, league_code="ctc"), [1, 2])
+        self.assertEqual(self.index.search("circuit", 1), [3])
+        self.assertEqual(self.index.search("100%", 10), [])
+
+    def test_trigram_support_is_checked_again_after_the_interval(self):
+        session = MagicMock()
+        session.get_bind.return_value = MagicMock()
+        session.scalar.side_effect = [0, 1]
+
+        with patch("entity_search.time.monotonic", side_effect=[100.0, 200.0, 401.0, 402.0]):
+            self.assertFalse(entity_search._trigram_available(session))
+            self.assertFalse(entity_search._trigram_available(session))
+            self.assertTrue(entity_search._trigram_available(session))
+            self.assertTrue(entity_search._trigram_available(session))
+
+        self.assertEqual(session.scalar.call_count, 2)
+
+
 if __name__ == "__main__":
     unittest.main()
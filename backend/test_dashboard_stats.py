@@ -1,20 +1,30 @@
 # ruff: noqa: E402
 
+import json
+import tempfile
+import threading
 import unittest
 from contextlib import nullcontext
-from unittest.mock import patch
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 from test_support import configure_test_environment
 
 configure_test_environment()
 
+import analytics_eligibility
 import app as app_module
 import dashboard_stats as dashboard_module
+import player_display_names
+import scope_catalog
 import stats_db
 import stats_queries
-from analytics_eligibility import analytics_excluded_race_ids
+from alias_management import add_alias, update_player_canonical_name
+from analytics_eligibility import analytics_excluded_race_ids, apply_analytics_race_filter
 from dashboard_stats import (
     DashboardError,
+    get_player_dashboard,
+    get_player_leaderboard,
     get_player_overview,
     get_player_performance,
     get_player_tracks,
@@ -23,17 +33,24 @@ from dashboard_stats import (
     get_team_tracks,
     get_track_player_rankings,
 )
+from data_version import RESULTS_DATA_VERSION, bump_data_version, current_data_version
+from database import forget_session_pins
+from engine_cache import EngineCache
 from import_json_to_db import backfill_inferred_roles
+from match_detail_snapshots import save_match_detail_snapshot
 from models import (
     Division,
     Match,
+    MatchDetailSnapshot,
     MatchPlayer,
     MatchTeam,
     Player,
     PlayerAlias,
     PlayerFriendCode,
     PlayerSeasonEntry,
+    PlayerTrackRollup,
     Race,
+    RaceClassification,
     RacePlayerResult,
     RaceTeamResult,
     Season,
@@ -43,6 +60,24 @@ from models import (
     TeamSeasonEntry,
     Track,
 )
+from player_display_names import (
+    _display_names_for_players,
+    rebuild_player_display_names,
+    refresh_player_display_names,
+)
+from player_role_analytics import (
+    ROLE_TOTAL_FIELDS,
+    confirmed_5v5_race_ids,
+    role_coverage,
+    role_totals,
+    sql_classified_role,
+    sql_confirmed_5v5,
+    sql_role_totals,
+)
+from player_track_rollups import rebuild_player_track_rollups
+from race_team_totals import rebuild_race_team_totals
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql
 from test_support import PostgreSQLTestDatabase
 
 
@@ -379,6 +414,24 @@ class DashboardRoleContractTests(unittest.TestCase):
         self.assertEqual(summary["teams"], "b vs a")
         self.assertEqual(summary["scores"], "40 - 22")
 
+        # Keyset pages walk the same listing, and the team filter runs in SQL.
+        with patch.object(stats_queries, "SessionLocal", return_value=nullcontext(self.session)):
+            paged, cursor = [], None
+            while True:
+                page = stats_queries.list_match_page(
+                    season="s2", division="d1", limit=1, cursor=cursor
+                )
+                paged.extend(page["matches"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            team_page = stats_queries.list_match_page(season="s2", division="d1", team=" B ")
+        self.assertEqual(paged, summaries)
+        self.assertEqual(
+            team_page["matches"], [row for row in summaries if "b" in row["teams"].split(" vs ")]
+        )
+        self.assertIsNone(team_page["next_cursor"])
+
         # Differential values use the same winner-first orientation as both tables.
         first_race_totals = [
             sum((player["scores"][0] or 0) for player in team["players"])
@@ -387,6 +440,45 @@ class DashboardRoleContractTests(unittest.TestCase):
         ]
         self.assertEqual(detail["differential"][0], first_race_totals[0] - first_race_totals[1])
 
+    def test_match_detail_snapshot_is_served_until_a_rename_touches_the_match(self):
+        match = (
+            self.session.query(Match)
+            .join(Season, Season.season_id == Match.season_id)
+            .filter(Season.season_code == "s2", Match.week_number == 2)
+            .one()
+        )
+        player = self.session.get(Player, self.player_id)
+
+        with patch.object(stats_queries, "SessionLocal", return_value=nullcontext(self.session)):
+            rendered = stats_queries.get_match_detail(match.match_id)
+            # A direct write that skips the admin services keeps serving the stored payload.
+            player.canonical_name = "Renamed Directly"
+            self.session.commit()
+            cached = stats_queries.get_match_detail(match.match_id)
+            update_player_canonical_name(
+                self.session, self.player_id, {"canonical_name": "Renamed Player"}
+            )
+            self.session.commit()
+            refreshed = stats_queries.get_match_detail(match.match_id)
+
+        def names(detail):
+            return {
+                entry["name"]
+                for team in detail["teams"]
+                for entry in team["players"]
+                if entry["player_id"] == self.player_id
+            }
+
+        self.assertEqual(cached, rendered)
+        self.assertEqual(names(refreshed), {"Renamed Player"})
+        self.assertEqual(
+            refreshed, stats_queries.get_match_detail(match.match_id, session=self.session)
+        )
+        self.assertEqual(
+            json.loads(self.session.get(MatchDetailSnapshot, match.match_id).payload_json),
+            refreshed,
+        )
+
     def _selected_result(self, week, race_number):
         return (
             self.session.query(RacePlayerResult)
@@ -573,6 +665,8 @@ class DashboardRoleContractTests(unittest.TestCase):
         manual_zero.role = "runner"
         manual_zero.role_source = "manual"
         self.session.flush()
+        target_match_id = self.session.get(Race, target.race_id).match_id
+        save_match_detail_snapshot(self.session, target_match_id, {"roles": "before"})
 
         before_runner = get_player_overview(self.player_id, role="runner", session=self.session)
         before_bagger = get_player_overview(self.player_id, role="bagger", session=self.session)
@@ -580,6 +674,7 @@ class DashboardRoleContractTests(unittest.TestCase):
         self.assertEqual(before_bagger["metrics"]["races"], 4)
 
         self.assertEqual(backfill_inferred_roles(self.session), 4)
+        self.assertIsNone(self.session.get(MatchDetailSnapshot, target_match_id))
         self.assertEqual(backfill_inferred_roles(self.session), 0)
         self.session.refresh(target)
         self.session.refresh(wrong_bagger)
@@ -660,6 +755,69 @@ class DashboardRoleContractTests(unittest.TestCase):
             [],
         )
 
+    def test_player_track_rollups_match_live_rows_and_subtract_exclusions(self):
+        scopes = (
+            {"role": "runner", "min_races": 0},
+            {"role": "bagger", "min_races": 0},
+            {"role": "runner", "min_races": 0, "season": "s2", "division": "d1"},
+            {"role": "runner", "min_races": 0, "team_id": self.alpha_id, "match_set": "all"},
+        )
+        live = [
+            get_player_tracks(self.player_id, session=self.session, **kwargs) for kwargs in scopes
+        ]
+        self.assertGreater(rebuild_player_track_rollups(self.session), 0)
+        self.assertIsNotNone(
+            self.session.scalar(
+                select(PlayerTrackRollup).where(PlayerTrackRollup.player_id == self.player_id)
+            )
+        )
+        for kwargs, expected in zip(scopes, live, strict=True):
+            with self.subTest(**kwargs):
+                self.assertEqual(
+                    get_player_tracks(self.player_id, session=self.session, **kwargs), expected
+                )
+
+        exclusion = (
+            {
+                "source_path": "JSON/ctc/s2/d1/w3.json",
+                "match_index": 0,
+                "blocks": frozenset({1}),
+                "reason": "Test collapsed aggregate block.",
+            },
+        )
+        with patch("analytics_eligibility._load_default_exclusions", return_value=exclusion):
+            rolled_up = get_player_tracks(self.player_id, min_races=0, session=self.session)
+            self.session.execute(delete(PlayerTrackRollup))
+            self.assertEqual(
+                get_player_tracks(self.player_id, min_races=0, session=self.session), rolled_up
+            )
+
+    def test_player_dashboard_matches_the_separate_payloads(self):
+        scopes = (
+            {"role": "runner", "min_races": 0},
+            {"role": "bagger", "min_races": 4},
+            {"role": "runner", "min_races": 0, "season": "s2", "division": "d1"},
+            {"role": "bagger", "min_races": 0, "team_id": self.alpha_id, "match_set": "all"},
+        )
+        for kwargs in scopes:
+            with self.subTest(**kwargs):
+                performance_kwargs = {k: v for k, v in kwargs.items() if k != "min_races"}
+                self.assertEqual(
+                    get_player_dashboard(self.player_id, session=self.session, **kwargs),
+                    {
+                        "overview": get_player_overview(
+                            self.player_id, session=self.session, **kwargs
+                        ),
+                        "performance": get_player_performance(
+                            self.player_id, session=self.session, **performance_kwargs
+                        ),
+                        "tracks": get_player_tracks(self.player_id, session=self.session, **kwargs),
+                    },
+                )
+
+        with self.assertRaisesRegex(DashboardError, "Player not found"):
+            get_player_dashboard(999999, session=self.session)
+
     def test_track_player_rankings_keep_roles_separate_and_preserve_bagger_points(self):
         runner = get_track_player_rankings(
             self.track.track_id,
@@ -763,6 +921,45 @@ class DashboardRoleContractTests(unittest.TestCase):
             self.assertEqual(ranking_names[player_id], name)
             self.assertEqual(roster_names[player_id], name)
 
+    def test_stored_display_names_match_live_alias_ranking_and_follow_alias_edits(self):
+        player_ids = [player.player_id for player in self.players[:4]]
+        for player in self.players[:4]:
+            player.canonical_name = None
+        self.session.add_all(
+            [
+                PlayerAlias(
+                    player_id=player_ids[0],
+                    alias_type="lounge_name",
+                    alias_value="Older Lounge",
+                    last_seen_match_id=1,
+                ),
+                PlayerAlias(
+                    player_id=player_ids[0],
+                    alias_type="lounge_name",
+                    alias_value="Recent Lounge",
+                    last_seen_match_id=3,
+                ),
+                PlayerAlias(player_id=player_ids[1], alias_type="table_name", alias_value="Table"),
+                PlayerAlias(player_id=player_ids[2], alias_type="mii_name", alias_value=" "),
+            ]
+        )
+        self.session.flush()
+        live = _display_names_for_players(self.session, player_ids)
+
+        rebuild_player_display_names(self.session)
+        with patch.object(player_display_names, "_live_alias_names", side_effect=AssertionError):
+            stored = _display_names_for_players(self.session, player_ids)
+        self.assertEqual(stored, live)
+        self.assertEqual(live[player_ids[0]], "Recent Lounge")
+        self.assertEqual(live[player_ids[2]], "")
+
+        add_alias(self.session, "players", player_ids[2], {"type": "mii_name", "value": "New Mii"})
+        self.assertEqual(
+            _display_names_for_players(self.session, [player_ids[2]]),
+            {player_ids[2]: "New Mii"},
+        )
+        self.assertEqual(refresh_player_display_names(self.session, player_ids), set())
+
     def test_top_tracks_route_integrates_flat_schema_aliases_and_role_math(self):
         self.session.add(
             PlayerAlias(
@@ -921,6 +1118,53 @@ class DashboardRoleContractTests(unittest.TestCase):
         self.assertEqual(selected["last_appearance"]["week"], 3)
         self.assertEqual(bagger["role"], "bagger")
 
+    def test_sql_role_classification_and_totals_match_the_python_reducers(self):
+        rows = self.session.execute(
+            select(
+                RacePlayerResult.race_id,
+                RacePlayerResult.player_id,
+                RacePlayerResult.match_team_id,
+                RacePlayerResult.score,
+                RacePlayerResult.position,
+                RacePlayerResult.role,
+                RacePlayerResult.role_source,
+            )
+        ).all()
+        _coverage, classified = role_coverage(rows, confirmed_5v5_race_ids(self.session, rows))
+        expected_totals = {}
+        for row, role, source in classified:
+            expected_totals.setdefault((row.player_id, role, source), []).append(row)
+
+        role, source = sql_classified_role(
+            sql_confirmed_5v5(self.session, select(RacePlayerResult.race_id))
+        )
+        totals = self.session.execute(
+            select(
+                RacePlayerResult.player_id,
+                role.label("role"),
+                source.label("source"),
+                *sql_role_totals(RacePlayerResult.score, RacePlayerResult.position),
+            )
+            .outerjoin(RaceClassification, RaceClassification.race_id == RacePlayerResult.race_id)
+            .group_by(RacePlayerResult.player_id, role, source)
+        ).all()
+        self.assertEqual(
+            {
+                (row.player_id, row.role, row.source): {
+                    field: getattr(row, field) for field in ROLE_TOTAL_FIELDS
+                }
+                for row in totals
+            },
+            {key: role_totals(group) for key, group in expected_totals.items()},
+        )
+
+    def test_stored_race_team_totals_match_the_live_totals(self):
+        live = get_team_tracks(self.alpha_id, min_races=1, session=self.session)
+        self.assertGreater(rebuild_race_team_totals(self.session), 0)
+        with patch("race_team_totals._live_totals", side_effect=AssertionError):
+            stored = get_team_tracks(self.alpha_id, min_races=1, session=self.session)
+        self.assertEqual(stored, live)
+
     def test_team_result_contracts_remain_role_independent(self):
         career = get_team_overview(self.alpha_id, session=self.session)
         self.assertEqual(career["record"], {"wins": 2, "losses": 1, "ties": 0, "unknown": 0})
@@ -1013,6 +1257,53 @@ class DashboardRoleContractTests(unittest.TestCase):
         self.assertEqual(filtered["population"], 3)
         self.assertTrue(filtered["eligible"])
 
+    def test_data_version_bumps_inside_the_writing_transaction(self):
+        self.assertEqual(current_data_version(self.session), 0)
+        self.assertEqual(bump_data_version(self.session), 1)
+        self.assertEqual(bump_data_version(self.session), 2)
+        self.assertEqual(current_data_version(self.session, RESULTS_DATA_VERSION), 0)
+        self.assertEqual(bump_data_version(self.session, results=True), 3)
+        self.assertEqual(current_data_version(self.session, RESULTS_DATA_VERSION), 1)
+        self.session.rollback()
+        self.assertEqual(current_data_version(self.session), 0)
+
+    def test_leaderboard_pages_agree_with_overview_rankings_and_are_cached(self):
+        first_page = get_player_leaderboard(
+            "s2", "d1", role="runner", min_races=1, per_page=3, session=self.session
+        )
+        second_page = get_player_leaderboard(
+            "s2", "d1", role="runner", min_races=1, page=2, per_page=3, session=self.session
+        )
+        players = get_player_leaderboard(
+            "s2", "d1", role="runner", min_races=1, per_page=100, session=self.session
+        )["players"]
+
+        self.assertEqual(first_page["population"], len(players))
+        self.assertEqual(first_page["pages"], -(-len(players) // 3))
+        self.assertEqual(first_page["players"] + second_page["players"], players[:6])
+        self.assertEqual([row["rank"] for row in players], sorted(row["rank"] for row in players))
+        for row in players:
+            ranking = get_player_overview(
+                row["player_id"],
+                season="s2",
+                division="d1",
+                role="runner",
+                min_races=1,
+                session=self.session,
+            )["ranking"]
+            self.assertEqual(
+                (ranking["rank"], ranking["population"], ranking["value"]),
+                (row["rank"], first_page["population"], row["value"]),
+            )
+            self.assertTrue(row["name"])
+
+        with patch("leaderboards._build_leaderboard") as rebuild:
+            get_player_leaderboard("s2", "d1", role="runner", min_races=1, session=self.session)
+        rebuild.assert_not_called()
+
+        with self.assertRaisesRegex(DashboardError, "require season and division"):
+            get_player_leaderboard("s2", None, session=self.session)
+
     def test_roster_rejects_self_opponent_but_allows_empty_existing_opponent(self):
         with self.assertRaisesRegex(DashboardError, "A team cannot be its own opponent filter"):
             get_team_roster(
@@ -1153,5 +1444,250 @@ class DashboardRoleContractTests(unittest.TestCase):
         )
 
 
+class EngineCacheTests(unittest.TestCase):
+    def session(self, engine):
+        session = MagicMock()
+        session.get_bind.return_value = engine
+        session.info = {}
+        return session
+
+    def test_values_are_kept_per_engine_and_evicted_least_recently_used_first(self):
+        cache = EngineCache(2)
+        first, second = self.session(MagicMock()), self.session(MagicMock())
+
+        self.assertEqual(cache.get_or_build(first, "a", lambda: 1), 1)
+        self.assertEqual(cache.get_or_build(second, "a", lambda: 2), 2)
+        self.assertEqual(cache.get_or_build(first, "b", lambda: 3), 3)
+        self.assertEqual(cache.get_or_build(first, "a", lambda: 4), 1)
+        self.assertEqual(cache.get_or_build(first, "c", lambda: 5), 5)
+
+        self.assertEqual(cache.get_or_build(first, "a", lambda: 6), 1)
+        self.assertEqual(cache.get_or_build(first, "b", lambda: 7), 7)
+        self.assertEqual(cache.get_or_build(second, "a", lambda: 8), 2)
+
+    def test_concurrent_misses_wait_for_one_build(self):
+        cache = EngineCache(2)
+        session = self.session(MagicMock())
+        started = threading.Event()
+        release = threading.Event()
+        builds = []
+
+        def build():
+            builds.append(threading.current_thread().name)
+            started.set()
+            release.wait(5)
+            return "facts"
+
+        results = []
+        builder = threading.Thread(
+            target=lambda: results.append(cache.get_or_build(session, "v1", build))
+        )
+        builder.start()
+        started.wait(5)
+        waiters = [
+            threading.Thread(
+                target=lambda: results.append(cache.get_or_build(session, "v1", build))
+            )
+            for _ in range(3)
+        ]
+        for waiter in waiters:
+            waiter.start()
+        release.set()
+        for thread in (builder, *waiters):
+            thread.join(5)
+
+        self.assertEqual(results, ["facts"] * 4)
+        self.assertEqual(len(builds), 1)
+
+    def test_a_failed_build_is_not_cached(self):
+        cache = EngineCache(2)
+        session = self.session(MagicMock())
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_build(session, "v1", MagicMock(side_effect=RuntimeError("down")))
+
+        self.assertEqual(cache.get_or_build(session, "v1", lambda: "facts"), "facts")
+
+    def test_a_session_with_uncommitted_writes_builds_its_own_value(self):
+        cache = EngineCache(2)
+        session = self.session(MagicMock())
+        forget_session_pins(session)
+
+        self.assertEqual(cache.get_or_build(session, "v1", lambda: "uncommitted"), "uncommitted")
+        session.info.clear()
+        self.assertEqual(cache.get_or_build(session, "v1", lambda: "committed"), "committed")
+
+
+class AnalyticsExclusionCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.exclusion = (
+            {
+                "source_path": "JSON/ctc/s2/d1/w3.json",
+                "match_index": 0,
+                "blocks": frozenset({1}),
+                "reason": "Test collapsed aggregate block.",
+            },
+        )
+        self.session = MagicMock()
+        self.session.info = {}
+        self.session.get_bind.return_value = MagicMock()
+        self.session.scalar.return_value = 2
+
+    def test_excluded_ids_are_reused_until_the_data_version_changes(self):
+        with (
+            patch("analytics_eligibility._load_default_exclusions", return_value=self.exclusion),
+            patch(
+                "analytics_eligibility._compute_excluded_race_ids",
+                side_effect=[{5, 6}, {5, 6, 7}],
+            ) as compute,
+        ):
+            first = analytics_excluded_race_ids(self.session)
+            second = analytics_excluded_race_ids(self.session)
+            self.session.scalar.return_value = 3
+            pinned = analytics_excluded_race_ids(self.session)
+            forget_session_pins(self.session)
+            third = analytics_excluded_race_ids(self.session)
+
+        self.assertEqual(first, frozenset({5, 6}))
+        self.assertIs(second, first)
+        # The version is read once per session, not once per call.
+        self.assertIs(pinned, first)
+        self.assertEqual(third, frozenset({5, 6, 7}))
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(self.session.scalar.call_count, 2)
+
+    def test_exclusion_file_is_parsed_again_only_after_it_changes(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "exclusions.json"
+        path.write_text('{"exclusions": []}', encoding="utf-8")
+        analytics_eligibility._load_exclusions_version.cache_clear()
+        self.addCleanup(analytics_eligibility._load_exclusions_version.cache_clear)
+
+        with patch("analytics_eligibility.DEFAULT_EXCLUSION_PATH", path):
+            first = analytics_eligibility._load_default_exclusions()
+            self.assertIs(analytics_eligibility._load_default_exclusions(), first)
+            path.write_text(
+                '{"exclusions": [{"source_path": "a.json", "blocks": [2]}]}', encoding="utf-8"
+            )
+            changed = analytics_eligibility._load_default_exclusions()
+
+        self.assertEqual(first, ())
+        self.assertEqual([entry["blocks"] for entry in changed], [frozenset({2})])
+
+    def test_filter_binds_excluded_ids_as_one_array_parameter(self):
+        statement = analytics_eligibility.select(analytics_eligibility.Race.race_id)
+        with patch(
+            "analytics_eligibility.analytics_excluded_race_ids",
+            return_value=frozenset({9, 3, 5}),
+        ):
+            filtered = apply_analytics_race_filter(statement, self.session)
+
+        compiled = filtered.compile(dialect=postgresql.dialect())
+        self.assertIn("!= ALL", str(compiled))
+        self.assertEqual(list(compiled.params.values()), [[3, 5, 9]])
+
+
+class PlayerNameIndexCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.scope = stats_queries.Scope(1, 2, "s1", "d1")
+        self.session = MagicMock()
+        self.session.get_bind.return_value = MagicMock()
+        self.session.info = {}
+        rows = tuple(
+            stats_queries.PlayerLookupRow(player_id, name, None, None, None, team_id, "a", name)
+            for player_id, name, team_id in ((7, "Runner", 1), (8, "Bagger", 1), (8, "Bagger", 2))
+        )
+        self.index = stats_queries.PlayerNameIndex(
+            rows=rows,
+            by_name={"runner": (0,), "bagger": (1, 2)},
+            by_alias={"shared": (0, 1, 2), "bag": (1, 2)},
+        )
+
+    def test_index_is_reused_until_the_data_version_changes(self):
+        with (
+            patch(
+                "stats_queries.analytics_data_version", side_effect=[(1, 0, 0)] * 3 + [(2, 0, 0)]
+            ),
+            patch("stats_queries._build_player_name_index", return_value=self.index) as build,
+        ):
+            runner = stats_queries._resolve_player(self.session, " RUNNER ", self.scope)
+            bagger = stats_queries._resolve_player(self.session, "bag", self.scope)
+            with self.assertRaises(stats_queries.AmbiguousPlayerError):
+                stats_queries._resolve_player(self.session, "Shared", self.scope)
+            with self.assertRaisesRegex(stats_queries.AnalyticsError, "Bagger"):
+                stats_queries._resolve_player(self.session, "nobody", self.scope)
+
+        self.assertEqual(runner.player_id, 7)
+        self.assertEqual((bagger.player_id, bagger.team_id), (8, 2))
+        self.assertEqual(build.call_count, 2)
+
+
+class ScopeCatalogTests(unittest.TestCase):
+    def setUp(self):
+        seasons = (
+            scope_catalog.CatalogSeason(2, "s2", 2, "Season 2", "active"),
+            scope_catalog.CatalogSeason(1, "s1", 1, "Season 1", "complete"),
+        )
+        self.catalog = scope_catalog.ScopeCatalog(
+            league_code="ctc",
+            seasons=seasons,
+            seasons_by_code={season.season_code: season for season in seasons},
+            divisions={
+                1: (
+                    scope_catalog.CatalogDivision(10, 1, "d1", "Division 1"),
+                    scope_catalog.CatalogDivision(11, 1, "d2", "Division 2"),
+                ),
+                2: (scope_catalog.CatalogDivision(20, 2, "d1", "Division 1"),),
+            },
+            teams={(1, 11): (scope_catalog.CatalogTeam(5, 50, "AB", None, "Alpha"),)},
+            teams_by_tag={(1, 11, "ab"): scope_catalog.CatalogTeam(5, 50, "AB", None, "Alpha")},
+            tracks_by_name={},
+        )
+        self.engine = MagicMock()
+
+    def session(self):
+        session = MagicMock()
+        session.info = {}
+        session.get_bind.return_value = self.engine
+        return session
+
+    def test_catalog_resolves_scopes_once_per_session_and_data_version(self):
+        first, second = self.session(), self.session()
+        with (
+            patch("scope_catalog.analytics_data_version", side_effect=[(1, 0, 0), (2, 0, 0)]),
+            patch("scope_catalog._build_scope_catalog", return_value=self.catalog) as build,
+        ):
+            latest = stats_queries._get_scope(first)
+            default_d2 = stats_queries._get_scope(first, division="2")
+            team = stats_queries._resolve_team(first, " ab ", default_d2)
+            with self.assertRaisesRegex(stats_queries.AnalyticsError, "Invalid season"):
+                stats_queries._get_scope(first, season="s9")
+            stats_queries._get_scope(second, season="1", division="d1")
+
+        self.assertEqual((latest.season_code, latest.division_id), ("s2", 20))
+        self.assertEqual((default_d2.season_code, default_d2.division_id), ("s1", 11))
+        self.assertEqual(team.team_season_entry_id, 50)
+        self.assertEqual(build.call_count, 2)
+        first.execute.assert_not_called()
+
+
+class MatchCursorTests(unittest.TestCase):
+    def test_cursor_round_trips_the_sort_key_and_rejects_tampering(self):
+        values = ["playoff", True, 0, False, "finals", False, 1, False, 2, "Finals G2", 41]
+        row = {f"sort_key_{index}": value for index, value in enumerate(values)}
+
+        cursor = stats_queries._encode_match_cursor(row)
+
+        self.assertEqual(stats_queries._decode_match_cursor(cursor), values)
+        for invalid in (
+            "not-a-cursor",
+            cursor[:-2],
+            stats_queries._encode_match_cursor({**row, "sort_key_1": 1}),
+        ):
+            with self.subTest(cursor=invalid), self.assertRaises(stats_queries.AnalyticsError):
+                stats_queries._decode_match_cursor(invalid)
+
+
 if __name__ == "__main__":
     unittest.main()
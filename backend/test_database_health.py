@@ -1,10 +1,12 @@
 # ruff: noqa: E402
 
+import hashlib
+import os
 import unittest
 from contextlib import nullcontext
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from test_support import configure_test_environment
 
@@ -13,9 +15,12 @@ configure_test_environment()
 import admin_auth
 import app as app_module
 import routes.admin as admin_routes
+from archive_storage import GcsArchiveStorage, LocalArchiveStorage, ObjectStat
 from database_health import build_database_health
 from database_health_reviews import set_issue_review
+from match_upload import reconcile_archive
 from models import (
+    ArchiveManifestEntry,
     Division,
     Match,
     MatchPlayer,
@@ -246,6 +251,68 @@ class DatabaseHealthTests(unittest.TestCase):
             {(1, "Canonical One"), (2, "Canonical Two")},
         )
 
+    def test_archive_reconciliation_rehashes_only_changed_files(self):
+        with TemporaryDirectory() as directory:
+            root = Path(directory)
+            orphan = root / "s3" / "d1" / "orphan.json"
+            orphan.parent.mkdir(parents=True)
+            orphan.write_text('{"matches": []}', encoding="utf-8")
+
+            def reconcile(**options):
+                with patch("archive_manifest.hashlib.sha256", wraps=hashlib.sha256) as hashed:
+                    report = reconcile_archive(self.session, root, **options)
+                self.session.commit()
+                return report, hashed.call_count
+
+            first, first_hashes = reconcile()
+            repeat, repeat_hashes = reconcile()
+            verified, verified_hashes = reconcile(full_verify=True)
+            orphan.write_text('{"matches": [{}]}', encoding="utf-8")
+            stat = orphan.stat()
+            os.utime(orphan, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            _, changed_hashes = reconcile()
+            orphan.unlink()
+            emptied, _ = reconcile()
+
+        self.assertEqual(first["orphan_files"], [{"path": "s3/d1/orphan.json"}])
+        self.assertEqual(repeat, first)
+        self.assertEqual(verified, first)
+        self.assertEqual(
+            (first_hashes, repeat_hashes, verified_hashes, changed_hashes), (1, 0, 1, 1)
+        )
+        self.assertEqual(emptied["orphan_files"], [])
+        self.assertEqual(self.session.query(ArchiveManifestEntry).count(), 0)
+
+
+class ArchiveStorageListingTests(unittest.TestCase):
+    def test_local_listing_stats_every_object_under_the_prefix(self):
+        with TemporaryDirectory() as directory:
+            storage = LocalArchiveStorage(Path(directory))
+            storage.put_temporary("accepted/s3/d1/match.json", b"{}")
+            storage.put_temporary("queue/pending.json", b"[]")
+            objects = storage.list_objects("accepted")
+            stamp = str((Path(directory) / "accepted/s3/d1/match.json").stat().st_mtime_ns)
+
+        self.assertEqual(
+            objects,
+            {"accepted/s3/d1/match.json": ObjectStat("accepted/s3/d1/match.json", stamp, 2)},
+        )
+        self.assertEqual(storage.list_objects("missing"), {})
+
+    def test_gcs_listing_makes_one_paged_request(self):
+        blob = MagicMock(generation=7, size=2)
+        blob.name = "accepted/match.json"
+        storage = GcsArchiveStorage.__new__(GcsArchiveStorage)
+        storage.bucket = MagicMock()
+        storage.bucket.list_blobs.return_value = iter([blob])
+
+        self.assertEqual(
+            storage.list_objects("accepted"),
+            {"accepted/match.json": ObjectStat("accepted/match.json", "7", 2)},
+        )
+        storage.bucket.list_blobs.assert_called_once_with(prefix="accepted/")
+        storage.bucket.get_blob.assert_not_called()
+
 
 class DatabaseHealthApiTests(unittest.TestCase):
     def setUp(self):
@@ -1,6 +1,20 @@
+import json
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
 
-from import_json_to_db import infer_role, resolve_role
+import import_json_to_db
+from import_json_to_db import (
+    JSON_ROOT,
+    infer_role,
+    parse_archive_file,
+    parse_archive_files,
+    resolve_role,
+)
+
+CANONICAL_MATCH_PATH = JSON_ROOT / "ctc" / "s3" / "d2" / "W11 [M11] sts 366 - 356 CS.json"
 
 
 class ImportRoleInferenceTests(unittest.TestCase):
@@ -43,3 +57,74 @@ class ImportRoleInferenceTests(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+class ArchiveParsingTests(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.root = Path(self.temporary_directory.name)
+
+    def _write(self, name, content):
+        path = self.root / name
+        path.write_text(content, encoding="utf-8")
+        return path
+
+    def test_parallel_parsing_keeps_input_order_and_matches_serial_results(self):
+        match_data = json.loads(CANONICAL_MATCH_PATH.read_text(encoding="utf-8"))
+        paths = [
+            self._write(f"W{index} match.json", json.dumps({**match_data, "week": index}))
+            for index in range(1, 6)
+        ]
+
+        serial = list(parse_archive_files(paths))
+        parallel = list(parse_archive_files(paths, workers=2))
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual([parsed.path for parsed in parallel], paths)
+        self.assertEqual([parsed.matches[0]["week"] for parsed in parallel], [1, 2, 3, 4, 5])
+        self.assertTrue(all(parsed.error is None for parsed in parallel))
+        self.assertEqual(len({parsed.file_sha256 for parsed in parallel}), 5)
+
+    def test_parallel_parsing_bounds_work_ahead_and_cancels_on_close(self):
+        paths = [self._write(f"W{index} match.json", "[]") for index in range(1, 7)]
+        submitted = []
+        shutdowns = []
+
+        class RecordingExecutor(ThreadPoolExecutor):
+            def submit(self, function, *args):
+                submitted.append(args[0])
+                return super().submit(function, *args)
+
+            def shutdown(self, wait=True, *, cancel_futures=False):
+                shutdowns.append(cancel_futures)
+                super().shutdown(wait, cancel_futures=cancel_futures)
+
+        with (
+            patch.object(import_json_to_db, "ProcessPoolExecutor", RecordingExecutor),
+            patch.object(import_json_to_db, "PARSE_AHEAD_PER_WORKER", 1),
+        ):
+            parsed_files = parse_archive_files(paths, workers=2)
+            self.assertEqual(submitted, paths[:2])
+            self.assertEqual(next(parsed_files).path, paths[0])
+            self.assertEqual(submitted, paths[:3])
+            parsed_files.close()
+
+        self.assertEqual(shutdowns, [True])
+
+    def test_parse_errors_are_reported_instead_of_raised(self):
+        match_data = json.loads(CANONICAL_MATCH_PATH.read_text(encoding="utf-8"))
+        broken = parse_archive_file(self._write("W1 broken.json", "{not json"))
+        invalid = parse_archive_file(
+            self._write("W2 invalid.json", json.dumps({**match_data, "races_played": 3}))
+        )
+        legacy = {key: value for key, value in match_data.items() if key != "league"}
+        legacy_parsed = parse_archive_file(
+            self._write("W3 legacy.json", json.dumps({**legacy, "races_played": 3}))
+        )
+
+        self.assertEqual(broken.matches, ())
+        self.assertIsNotNone(broken.error)
+        self.assertIn("Races played must equal the number of tracks.", invalid.error)
+        self.assertIsNone(legacy_parsed.error)
+        self.assertEqual(legacy_parsed.json_shape, "single_match")
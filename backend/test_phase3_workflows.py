@@ -1,6 +1,7 @@
 # ruff: noqa: E402
 
 import json
+import shutil
 import tempfile
 import unittest
 from pathlib import Path
@@ -11,6 +12,7 @@ from test_support import configure_test_environment
 configure_test_environment()
 
 import acceptance_service
+import bulk_import
 import import_json_to_db
 from admin_auth import AdminActor
 from archive_storage import LocalArchiveStorage
@@ -19,9 +21,32 @@ from bootstrap_archive import (
     archive_imported_sources,
     local_path_for_source,
 )
+from data_version import RESULTS_DATA_VERSION, current_data_version
 from import_json_to_db import detect_new_entries
 from match_upload import prepare_upload_document
-from models import AdminAuditLog, Match, ReviewSubmission, SourceFile
+from models import (
+    AdminAuditLog,
+    Division,
+    Match,
+    MatchPlayer,
+    MatchTeam,
+    Penalty,
+    Player,
+    PlayerAlias,
+    PlayerFriendCode,
+    PlayerSeasonEntry,
+    PlayerTrackRollup,
+    Race,
+    RaceClassification,
+    RacePlayerResult,
+    RaceTeamResult,
+    ReviewSubmission,
+    Season,
+    SourceFile,
+    TeamSeasonEntry,
+    Track,
+    TrackAlias,
+)
 from phase3_maintenance import repair_accepted_archives
 from review_queue import create_submission
 from sqlalchemy import func, select
@@ -37,6 +62,165 @@ SAMPLE_MATCH_PATH = (
 )
 
 
+def import_snapshot(session):
+    """Describe imported rows by natural keys so two databases can be compared."""
+    matches = {
+        row.match_id: (row.source_path, row.match_index_in_source)
+        for row in session.execute(
+            select(Match.match_id, Match.match_index_in_source, SourceFile.source_path).join(
+                SourceFile, SourceFile.source_file_id == Match.source_file_id
+            )
+        )
+    }
+    players = dict(session.execute(select(Player.player_id, Player.primary_friend_code)).all())
+    races = {
+        row.race_id: (matches[row.match_id], row.race_number)
+        for row in session.execute(select(Race.race_id, Race.match_id, Race.race_number))
+    }
+    match_teams = {
+        row.match_team_id: (matches[row.match_id], row.raw_team_key)
+        for row in session.execute(
+            select(MatchTeam.match_team_id, MatchTeam.match_id, MatchTeam.raw_team_key)
+        )
+    }
+    match_players = {
+        row.match_player_id: (match_teams[row.match_team_id], row.friend_code_raw)
+        for row in session.execute(
+            select(
+                MatchPlayer.match_player_id, MatchPlayer.match_team_id, MatchPlayer.friend_code_raw
+            )
+        )
+    }
+    team_entries = {
+        row.team_season_entry_id: (row.season_code, row.division_code, row.clan_tag)
+        for row in session.execute(
+            select(
+                TeamSeasonEntry.team_season_entry_id,
+                TeamSeasonEntry.clan_tag,
+                Season.season_code,
+                Division.division_code,
+            )
+            .join(Season, Season.season_id == TeamSeasonEntry.season_id)
+            .join(Division, Division.division_id == TeamSeasonEntry.division_id)
+        )
+    }
+
+    def rows(model, describe):
+        return sorted((describe(row) for row in session.scalars(select(model))), key=repr)
+
+    return {
+        "matches": rows(
+            Match,
+            lambda row: (
+                matches[row.match_id],
+                row.match_label,
+                row.week_number,
+                row.match_type,
+                row.races_played,
+                row.import_status,
+                row.review_notes,
+            ),
+        ),
+        "players": rows(Player, lambda row: (row.canonical_name, row.primary_friend_code)),
+        "friend_codes": rows(
+            PlayerFriendCode,
+            lambda row: (
+                row.friend_code,
+                players[row.player_id],
+                matches.get(row.first_seen_match_id),
+                matches.get(row.last_seen_match_id),
+            ),
+        ),
+        "aliases": rows(
+            PlayerAlias,
+            lambda row: (
+                players[row.player_id],
+                row.alias_type,
+                row.alias_value,
+                matches.get(row.first_seen_match_id),
+                matches.get(row.last_seen_match_id),
+            ),
+        ),
+        "player_entries": rows(
+            PlayerSeasonEntry,
+            lambda row: (
+                players[row.player_id],
+                team_entries[row.team_season_entry_id],
+                row.primary_lounge_name,
+                row.primary_mii_name,
+                row.flag,
+                matches.get(row.first_seen_match_id),
+                matches.get(row.last_seen_match_id),
+            ),
+        ),
+        "team_entries": rows(
+            TeamSeasonEntry,
+            lambda row: (team_entries[row.team_season_entry_id], row.display_name, row.hex_color),
+        ),
+        "tracks": rows(Track, lambda row: (row.league_code, row.canonical_name)),
+        "track_aliases": rows(TrackAlias, lambda row: row.alias_value),
+        "races": rows(Race, lambda row: (races[row.race_id], row.track_name_raw)),
+        "match_teams": rows(
+            MatchTeam,
+            lambda row: (
+                match_teams[row.match_team_id],
+                team_entries[row.team_season_entry_id],
+                row.raw_total_score,
+                row.team_penalty_points,
+                row.final_score,
+            ),
+        ),
+        "match_players": rows(
+            MatchPlayer,
+            lambda row: (
+                match_players[row.match_player_id],
+                players[row.player_id],
+                row.raw_total_score,
+                row.player_penalty_points,
+                row.gp_scores_json,
+            ),
+        ),
+        "penalties": rows(
+            Penalty,
+            lambda row: (
+                matches[row.match_id],
+                match_teams.get(row.match_team_id),
+                match_players.get(row.match_player_id),
+                row.penalty_scope,
+                row.penalty_points,
+                row.raw_penalty_text,
+            ),
+        ),
+        "race_team_results": rows(
+            RaceTeamResult,
+            lambda row: (
+                races[row.race_id],
+                match_teams[row.match_team_id],
+                row.score,
+                row.reason,
+            ),
+        ),
+        "race_player_results": rows(
+            RacePlayerResult,
+            lambda row: (
+                races[row.race_id],
+                match_players[row.match_player_id],
+                players[row.player_id],
+                row.score,
+                row.position,
+                row.role,
+                row.role_source,
+                row.is_subbed_out_result,
+            ),
+        ),
+        "classifications": rows(
+            RaceClassification,
+            lambda row: (races[row.race_id], row.is_confirmed_5v5, row.result_count),
+        ),
+        "rollups": session.scalar(select(func.count()).select_from(PlayerTrackRollup)),
+    }
+
+
 class FailingPromotionStorage(LocalArchiveStorage):
     def promote(self, temporary_key: str, accepted_key: str, fingerprint: str):
         raise OSError("simulated storage outage")
@@ -97,6 +281,43 @@ class Phase3WorkflowTests(unittest.TestCase):
                 f"JSON/ctc/s3/d2/{SAMPLE_MATCH_PATH.name}",
             )
 
+    def test_tree_import_refreshes_derived_rows_once_per_run(self):
+        json_root = Path(self.temporary_directory.name) / "JSON"
+        shutil.copytree(SAMPLE_MATCH_PATH.parent, json_root / "ctc" / "s3" / "d2")
+
+        with patch.object(import_json_to_db, "get_session_factory", return_value=self.SessionLocal):
+            imported = import_json_to_db.import_json_tree(None, json_root)
+
+        self.assertGreater(imported, 1)
+        with self.SessionLocal() as session:
+            self.assertEqual(current_data_version(session), 1)
+            self.assertEqual(current_data_version(session, RESULTS_DATA_VERSION), 1)
+            self.assertEqual(
+                session.scalar(select(func.count()).select_from(RaceClassification)),
+                session.scalar(select(func.count()).select_from(Race)),
+            )
+            self.assertGreater(
+                session.scalar(select(func.count()).select_from(PlayerTrackRollup)), 0
+            )
+
+    def test_bulk_import_writes_the_same_rows_as_the_row_by_row_importer(self):
+        json_root = Path(self.temporary_directory.name) / "JSON"
+        shutil.copytree(SAMPLE_MATCH_PATH.parent, json_root / "ctc" / "s3" / "d2")
+        bulk_database = PostgreSQLTestDatabase()
+        self.addCleanup(bulk_database.close)
+
+        with patch.object(import_json_to_db, "get_session_factory", return_value=self.SessionLocal):
+            expected = import_json_to_db.import_json_tree(None, json_root)
+        with patch.object(
+            bulk_import, "get_session_factory", return_value=bulk_database.SessionLocal
+        ):
+            imported = import_json_to_db.import_json_tree(None, json_root, bulk=True)
+            self.assertEqual(import_json_to_db.import_json_tree(None, json_root, bulk=True), 0)
+
+        self.assertEqual(imported, expected)
+        with self.SessionLocal() as row_session, bulk_database.SessionLocal() as bulk_session:
+            self.assertEqual(import_snapshot(bulk_session), import_snapshot(row_session))
+
     def test_public_submission_stays_out_of_analytics(self):
         with self.SessionLocal.begin() as session:
             submission = create_submission(
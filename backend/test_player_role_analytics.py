@@ -1,18 +1,36 @@
+import random
 import unittest
+from dataclasses import fields
 from decimal import Decimal
 from types import SimpleNamespace
 
-from models import RacePlayerResult
+import numpy as np
+from models import RaceClassification, RacePlayerResult
 from player_role_analytics import (
+    ClassifiedResult,
+    _confirmed_5v5_ids_from_results,
     bagger_counterpart_summary,
+    classify_results,
     classify_role,
     confirmed_5v5_race_ids,
     normalize_role,
+    refresh_race_classifications,
     role_coverage,
+    role_coverage_key,
+    role_coverage_payload,
+    role_totals,
     summarize_role_rows,
+    summarize_role_totals,
     valid_placement,
     valid_race_score,
 )
+from race_facts import (
+    build_race_facts,
+    group_rows,
+    group_totals,
+    role_coverage_by_group,
+    role_totals_by_group,
+)
 from test_support import PostgreSQLTestDatabase
 
 
@@ -37,6 +55,42 @@ def result(
     )
 
 
+def reference_role_totals(rows):
+    """The row-at-a-time reducer the column kernel replaced."""
+    totals = {
+        "races": 0,
+        "scored_races": 0,
+        "total_points": 0,
+        "excluded_score_rows": 0,
+        "placement_sum": 0,
+        "placement_count": 0,
+        "wins": 0,
+        "podiums": 0,
+        "bag_points": 0,
+        "zero_points": 0,
+    }
+    for row in rows:
+        totals["races"] += 1
+        if valid_race_score(row.score):
+            totals["scored_races"] += 1
+            totals["total_points"] += row.score
+            if row.score > 0:
+                totals["bag_points"] += 1
+            elif row.score == 0:
+                totals["zero_points"] += 1
+        elif row.score is not None:
+            totals["excluded_score_rows"] += 1
+        if valid_placement(row.position):
+            placement = int(row.position)
+            totals["placement_sum"] += placement
+            totals["placement_count"] += 1
+            if placement == 1:
+                totals["wins"] += 1
+            if placement <= 3:
+                totals["podiums"] += 1
+    return totals
+
+
 class RoleAnalyticsTests(unittest.TestCase):
     def test_normalize_role_defaults_and_validates(self):
         self.assertEqual(normalize_role(None), "runner")
@@ -144,6 +198,55 @@ class RoleAnalyticsTests(unittest.TestCase):
         )
         self.assertEqual(classified[-1], (rows[-1], "unknown", "unknown"))
 
+    def test_classified_results_match_role_coverage(self):
+        rows = [
+            result(role="runner", role_source="manual", player_id=1, score=12, position=2),
+            result(role="bagger", role_source="inferred", player_id=2, score=3, position=9),
+            result(position=10, race_id=1, player_id=3, score=1),
+            result(position=4, race_id=2, player_id=4, score=9),
+        ]
+        columns = [
+            (
+                row.race_id,
+                row.player_id,
+                row.match_team_id,
+                row.score,
+                row.position,
+                row.role,
+                row.role_source,
+                40 + index,
+                index + 1,
+                7,
+            )
+            for index, row in enumerate(rows)
+        ]
+
+        coverage, classified = classify_results(columns, {1})
+        expected_coverage, expected = role_coverage(rows, {1})
+
+        self.assertEqual(coverage, expected_coverage)
+        for item, (row, role, source) in zip(classified, expected, strict=True):
+            self.assertIsInstance(item, ClassifiedResult)
+            self.assertFalse(hasattr(item, "__dict__"))
+            self.assertEqual((item.role, item.source), (role, source))
+            self.assertEqual(
+                (item.race_id, item.player_id, item.score, item.position),
+                (row.race_id, row.player_id, row.score, row.position),
+            )
+            with self.assertRaises(TypeError):
+                iter(item)
+        self.assertEqual(
+            [(item.match_id, item.race_number, item.track_id) for item in classified],
+            [(40, 1, 7), (41, 2, 7), (42, 3, 7), (43, 4, 7)],
+        )
+        for role in ("runner", "bagger"):
+            self.assertEqual(
+                summarize_role_rows(classified, role), summarize_role_rows(expected, role)
+            )
+
+        _coverage, short = classify_results([columns[0][:7]], set())
+        self.assertIsNone(short[0].match_id)
+
     def test_runner_summary_excludes_baggers_and_invalid_scores(self):
         rows = [
             (result(score=15, position=1, role="runner"), "runner", "explicit"),
@@ -226,6 +329,115 @@ class RoleAnalyticsTests(unittest.TestCase):
 
         self.assertEqual(summarize_role_rows(rows, "runner")["twelve_race_pace"], 4.0)
 
+    def test_column_kernels_match_the_row_reducers(self):
+        generator = random.Random(11)
+        values = (None, -1, 0, 1, 3, 8, 9, 10, 12, 15, 16, 4.5, 8.0, True)
+        values += (float("nan"), float("inf"), "7")
+        rows = [
+            result(
+                race_id=generator.choice((1, 2, 3)),
+                score=generator.choice(values),
+                position=generator.choice((*values, Decimal("2"), Decimal("9"))),
+                role=generator.choice(("unknown", "runner", "bagger", "sub")),
+                role_source=generator.choice(("explicit", "inferred", "unknown")),
+            )
+            for _ in range(500)
+        ]
+        confirmed = {1, 3}
+
+        coverage, classified = role_coverage(rows, confirmed)
+        expected_counts = {}
+        for row, (_row, role, source) in zip(rows, classified, strict=True):
+            self.assertEqual((role, source), classify_role(row, confirmed))
+            key = role_coverage_key(role, source)
+            expected_counts[key] = expected_counts.get(key, 0) + 1
+        self.assertEqual(coverage, role_coverage_payload(expected_counts))
+        self.assertEqual(role_totals(rows), reference_role_totals(rows))
+        for role in ("runner", "bagger"):
+            with self.subTest(role=role):
+                selected = [
+                    row for row, classified_role, _ in classified if classified_role == role
+                ]
+                self.assertEqual(
+                    summarize_role_rows(classified, role),
+                    summarize_role_totals(reference_role_totals(selected), role),
+                )
+
+    def test_columnar_facts_match_the_row_classification_and_summaries(self):
+        generator = random.Random(7)
+        rows = []
+        for race_id in range(1, 41):
+            # Every other race is a clean 5v5; the rest break one confirmation rule.
+            players = generator.sample(range(1, 30), 10)
+            teams = [race_id * 10 + 1] * 5 + [race_id * 10 + 2] * 5
+            if race_id % 2:
+                defect = race_id % 6
+                if defect == 1:
+                    players, teams = players[:9], teams[:9]
+                elif defect == 3:
+                    players[9] = players[0]
+                else:
+                    teams[9] = race_id * 10 + 3
+            for player_id, match_team_id in zip(players, teams, strict=True):
+                rows.append(
+                    result(
+                        race_id=race_id,
+                        player_id=player_id,
+                        match_team_id=match_team_id,
+                        score=generator.choice((None, -1, 0, 0, 3, 7, 15, 16)),
+                        position=generator.choice((None, 0, 1, 2, 3, 5, 8, 9, 10, 11)),
+                        role=generator.choice(("unknown", "unknown", "runner", "bagger")),
+                        role_source=generator.choice(("explicit", "inferred")),
+                    )
+                )
+        fact_rows = [
+            (
+                row.race_id,
+                row.player_id,
+                row.match_team_id,
+                1,
+                row.score,
+                row.position,
+                row.role,
+                row.role_source,
+                1,
+                1,
+                1,
+                "regular",
+            )
+            for row in rows
+        ]
+        facts = build_race_facts(iter(fact_rows))
+        # Loading in partitions that split races yields the same arrays as one pass.
+        partitioned = build_race_facts(iter(fact_rows), partition_rows=7)
+        for field in fields(facts):
+            np.testing.assert_array_equal(
+                getattr(partitioned, field.name), getattr(facts, field.name)
+            )
+        empty = build_race_facts([])
+        self.assertEqual((len(empty.race_id), empty.role.dtype), (0, facts.role.dtype))
+        indexes = facts.scope_rows(1, 1)
+        player_ids, groups = group_rows(facts, indexes)
+        coverage = role_coverage_by_group(facts, indexes, groups, len(player_ids))
+        _, classified = role_coverage(rows, _confirmed_5v5_ids_from_results(rows))
+
+        for role in ("runner", "bagger"):
+            totals = role_totals_by_group(facts, indexes, groups, len(player_ids), role)
+            for group, player_id in enumerate(player_ids):
+                player_rows = [item for item in classified if item[0].player_id == player_id]
+                with self.subTest(role=role, player_id=player_id):
+                    self.assertEqual(
+                        summarize_role_totals(group_totals(totals, group), role),
+                        summarize_role_rows(player_rows, role),
+                    )
+                    self.assertEqual(
+                        coverage[group],
+                        role_coverage(
+                            [item[0] for item in player_rows],
+                            _confirmed_5v5_ids_from_results(rows),
+                        )[0],
+                    )
+
 
 class DatabaseRoleAnalyticsTests(unittest.TestCase):
     def setUp(self):
@@ -298,6 +510,23 @@ class DatabaseRoleAnalyticsTests(unittest.TestCase):
         self.session.flush()
         self.assertEqual(confirmed_5v5_race_ids(self.session, valid_rows), set())
 
+    def test_persisted_classification_is_used_until_refreshed(self):
+        self.database.drop_foreign_keys(RaceClassification.__tablename__)
+        rows = self.add_race(1)
+        self.add_race(2, team_sizes=(5, 4))
+
+        self.assertEqual(refresh_race_classifications(self.session, {1, 2}), {1})
+        stored = self.session.get(RaceClassification, 2)
+        self.assertFalse(stored.is_confirmed_5v5)
+        self.assertEqual(stored.result_count, 9)
+
+        self.session.delete(rows[-1])
+        self.session.flush()
+        self.assertEqual(confirmed_5v5_race_ids(self.session, rows[:-1]), {1})
+
+        refresh_race_classifications(self.session, {1})
+        self.assertEqual(confirmed_5v5_race_ids(self.session, rows[:-1]), set())
+
     def counterpart_summary(self, rows, selected_player_id, *, omit_player_id=False):
         selected_rows = [row for row in rows if row.player_id == selected_player_id]
         _, classified = role_coverage(selected_rows, set())
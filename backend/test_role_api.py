@@ -23,6 +23,7 @@ class RoleApiTests(unittest.TestCase):
             ("/api/players/7/overview", "get_player_overview"),
             ("/api/players/7/performance", "get_player_performance"),
             ("/api/players/7/tracks", "get_player_tracks"),
+            ("/api/players/7/dashboard", "get_player_dashboard"),
             ("/api/teams/4/roster", "get_team_roster"),
         )
         for path, function_name in cases:
@@ -43,6 +44,81 @@ class RoleApiTests(unittest.TestCase):
             self.assertEqual(response.status_code, 200)
             self.assertEqual(mocked.call_args.kwargs["role"], "runner")
 
+    def test_leaderboard_forwards_scope_and_validates_paging(self):
+        with patch.object(
+            app_module.dashboards, "get_player_leaderboard", return_value={"ok": True}
+        ) as mocked:
+            response = self.client.get(
+                "/api/leaderboard?season=s2&division=d1&role=bagger&page=3&per_page=25"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mocked.call_args.args, ("s2", "d1"))
+        self.assertEqual(mocked.call_args.kwargs["role"], "bagger")
+        self.assertEqual(mocked.call_args.kwargs["min_races"], 12)
+        self.assertEqual(
+            (mocked.call_args.kwargs["page"], mocked.call_args.kwargs["per_page"]), (3, 25)
+        )
+
+        for query in ("page=0", "per_page=0", "per_page=201", "page=first"):
+            with (
+                self.subTest(query=query),
+                patch.object(app_module.dashboards, "get_player_leaderboard") as mocked,
+            ):
+                response = self.client.get(f"/api/leaderboard?season=s2&division=d1&{query}")
+                self.assertEqual(response.status_code, 400)
+                mocked.assert_not_called()
+
+    def test_response_cache_serves_normalized_repeats_until_data_version_changes(self):
+        app_module.app.config.update(RESPONSE_CACHE_ENABLED=True)
+        self.addCleanup(app_module.app.config.update, RESPONSE_CACHE_ENABLED=False)
+        with (
+            patch("routes.response_cache.cached_data_version", return_value=4) as version,
+            patch.object(
+                app_module.dashboards, "get_player_overview", return_value={"ok": True}
+            ) as mocked,
+        ):
+            first = self.client.get("/api/players/7/overview?season=S2&min_races=08")
+            repeated = self.client.get(
+                "/api/players/7/overview?min_races=8&role=RUNNER&season=s2&league=ctc"
+            )
+            revalidated = self.client.get(
+                "/api/players/7/overview?season=s2&min_races=8",
+                headers={"If-None-Match": first.headers["ETag"]},
+            )
+            self.assertEqual(mocked.call_count, 1)
+
+            version.return_value = 5
+            refreshed = self.client.get(
+                "/api/players/7/overview?season=s2&min_races=8",
+                headers={"If-None-Match": first.headers["ETag"]},
+            )
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(repeated.get_json(), {"ok": True})
+        self.assertEqual(repeated.headers["ETag"], first.headers["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertNotEqual(refreshed.headers["ETag"], first.headers["ETag"])
+        self.assertEqual(mocked.call_count, 2)
+
+    def test_response_cache_does_not_store_errors(self):
+        app_module.app.config.update(RESPONSE_CACHE_ENABLED=True)
+        self.addCleanup(app_module.app.config.update, RESPONSE_CACHE_ENABLED=False)
+        with (
+            patch("routes.response_cache.cached_data_version", return_value=4),
+            patch.object(
+                app_module.dashboards,
+                "get_player_overview",
+                side_effect=[app_module.dashboards.DashboardNotFound("Player not found."), {}],
+            ) as mocked,
+        ):
+            missing = self.client.get("/api/players/7/overview")
+            retried = self.client.get("/api/players/7/overview")
+        self.assertEqual(missing.status_code, 404)
+        self.assertNotIn("ETag", missing.headers)
+        self.assertEqual(retried.status_code, 200)
+        self.assertEqual(mocked.call_count, 2)
+
     def test_league_scope_is_forwarded_to_public_analytics(self):
         cases = (
             ("/api/seasons?league=gsc", app_module.stats, "list_seasons", "league_code"),
@@ -85,6 +161,11 @@ class RoleApiTests(unittest.TestCase):
                 "get_player_performance",
             ),
             ("/api/players/7/tracks?role=bagger", app_module.dashboards, "get_player_tracks"),
+            (
+                "/api/players/7/dashboard?role=bagger",
+                app_module.dashboards,
+                "get_player_dashboard",
+            ),
             ("/api/teams/4/roster?role=bagger", app_module.dashboards, "get_team_roster"),
             ("/api/top-team-players?team=a&role=bagger", app_module.stats, "findtopteamplayers"),
             ("/api/top-tracks?track=Test+Track&role=bagger", app_module.stats, "findtoptracks"),
@@ -125,6 +206,7 @@ class RoleApiTests(unittest.TestCase):
                 "get_player_performance",
             ),
             ("/api/players/7/tracks?role=all", app_module.dashboards, "get_player_tracks"),
+            ("/api/players/7/dashboard?role=all", app_module.dashboards, "get_player_dashboard"),
             ("/api/teams/4/roster?role=all", app_module.dashboards, "get_team_roster"),
             ("/api/top-team-players?team=a&role=all", app_module.stats, "findtopteamplayers"),
             ("/api/top-tracks?track=Test+Track&role=all", app_module.stats, "findtoptracks"),
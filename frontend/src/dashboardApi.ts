@@ -259,6 +259,12 @@ export interface PlayerTracks {
   tracks: PlayerTrackRow[];
 }
 
+export interface PlayerDashboardBundle {
+  overview: PlayerOverview;
+  performance: PlayerPerformance;
+  tracks: PlayerTracks;
+}
+
 export interface TeamRosterPlayer {
   player_id: number;
   name: string;
@@ -352,11 +358,19 @@ export interface LegacyTrackTeamRow {
   races: number;
 }
 
+// One cached request serves the overview and both tabs for the same query.
+export function fetchPlayerDashboard(
+  playerId: number,
+  query: DashboardQuery
+): Promise<PlayerDashboardBundle> {
+  return fetchCachedJson(`/api/players/${playerId}/dashboard`, query);
+}
+
 export function fetchPlayerOverview(
   playerId: number,
   query: DashboardQuery
 ): Promise<PlayerOverview> {
-  return fetchCachedJson(`/api/players/${playerId}/overview`, query);
+  return fetchPlayerDashboard(playerId, query).then((dashboard) => dashboard.overview);
 }
 
 export function fetchTeamOverview(teamId: number, query: DashboardQuery): Promise<TeamOverview> {
@@ -367,11 +381,11 @@ export function fetchPlayerPerformance(
   playerId: number,
   query: DashboardQuery
 ): Promise<PlayerPerformance> {
-  return fetchCachedJson(`/api/players/${playerId}/performance`, query);
+  return fetchPlayerDashboard(playerId, query).then((dashboard) => dashboard.performance);
 }
 
 export function fetchPlayerTracks(playerId: number, query: DashboardQuery): Promise<PlayerTracks> {
-  return fetchCachedJson(`/api/players/${playerId}/tracks`, query);
+  return fetchPlayerDashboard(playerId, query).then((dashboard) => dashboard.tracks);
 }
 
 export function fetchTeamRoster(teamId: number, query: DashboardQuery): Promise<TeamRoster> {
@@ -388,11 +402,7 @@ export function prefetchPlayerDashboardMatchSets(playerId: number, query: Dashbo
   for (const matchSet of MATCH_SETS) {
     if (matchSet === query.match_set) continue;
     const scopedQuery = { ...query, match_set: matchSet };
-    void Promise.allSettled([
-      fetchPlayerOverview(playerId, scopedQuery),
-      fetchPlayerPerformance(playerId, scopedQuery),
-      fetchPlayerTracks(playerId, scopedQuery),
-    ]);
+    void Promise.allSettled([fetchPlayerDashboard(playerId, scopedQuery)]);
   }
 }
 